@@ -0,0 +1,38 @@
+from agents import Agent
+from models.combined import CombinedExtractionResult
+from config import DEFAULT_MODEL
+from aml_agents.article_metadata_agent import article_metadata_agent
+from aml_agents.person_agent import person_extraction_agent
+from aml_agents.context_agent import context_extraction_agent
+from aml_agents.name_agent import name_match_agent
+from aml_agents.dob_agent import dob_age_agent
+from aml_agents.sentiment_agent import sentiment_agent
+
+# Each section reuses the specialist's own instructions so the two pipeline
+# modes cannot drift apart.
+SECTIONS = (
+    ("metadata", article_metadata_agent),
+    ("people", person_extraction_agent),
+    ("context", context_extraction_agent),
+    ("name_match", name_match_agent),
+    ("dob_age", dob_age_agent),
+    ("sentiment", sentiment_agent),
+)
+
+combined_extraction_agent = Agent(
+    name="combined_extraction_agent",
+    model=DEFAULT_MODEL,
+    instructions=(
+        "You perform six AML adverse media screening analyses of the same article in one pass.\n"
+        "Each section below is the full brief for one analysis. Apply every brief independently; "
+        "do not let one section's conclusion override another section's rules.\n\n"
+        + "\n\n".join(
+            f"## Section '{field}'\n{agent.instructions}" for field, agent in SECTIONS
+        )
+        + "\n\n## Output\n"
+        "Return a single strict CombinedExtractionResult JSON object with the keys "
+        + ", ".join(f"'{field}'" for field, _ in SECTIONS)
+        + ". Each key holds the JSON object that its section asks for. Do NOT include extra fields."
+    ),
+    output_type=CombinedExtractionResult,
+)
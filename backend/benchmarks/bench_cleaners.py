@@ -0,0 +1,93 @@
+"""
+pytest-benchmark suite for the HTML cleaning engines.
+
+Measures pages/sec for each engine on the fixture corpus
+(tests/fixtures/html) and on one large synthetic page, and the peak RSS
+growth of each engine in a fresh interpreter (lxml allocates outside the
+Python heap, so tracemalloc would under-report it).
+
+    cd backend
+    python -m pytest benchmarks/bench_cleaners.py --benchmark-columns=mean,ops,rounds
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from scraping.cleaners import clean_html_to_text_bs4, clean_html_to_text_lxml
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FIXTURE_DIR = BACKEND_DIR / "tests" / "fixtures" / "html"
+ENGINES = {"bs4": clean_html_to_text_bs4, "lxml": clean_html_to_text_lxml}
+
+
+def load_corpus():
+    return [path.read_text(encoding="utf-8") for path in sorted(FIXTURE_DIR.glob("*.html"))]
+
+
+def build_large_page(corpus, copies: int = 8) -> str:
+    """Every fixture body repeated inside one page: a long live page with heavy chrome."""
+    bodies = [page.split("<body", 1)[1].split(">", 1)[1].rsplit("</body>", 1)[0] for page in corpus]
+    inner = "\n".join(f'<section class="entry-{i}">{body}</section>' for i in range(copies) for body in bodies)
+    return f"<!DOCTYPE html><html><head><title>Live</title></head><body><div class=\"live\">{inner}</div></body></html>"
+
+
+CORPUS = load_corpus()
+LARGE_PAGE = build_large_page(CORPUS)
+
+MEMORY_PROBE = """
+import json, resource, sys
+from pathlib import Path
+from scraping import cleaners
+from benchmarks.bench_cleaners import CORPUS, LARGE_PAGE
+clean = getattr(cleaners, sys.argv[1])
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+for page in CORPUS + [LARGE_PAGE]:
+    clean(page, None)
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({"peak_rss_growth_kib": after - before}))
+"""
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_corpus_throughput(benchmark, engine):
+    clean = ENGINES[engine]
+
+    def run():
+        for page in CORPUS:
+            clean(page, None)
+
+    benchmark(run)
+    benchmark.extra_info["pages_per_sec"] = round(len(CORPUS) / benchmark.stats.stats.mean, 1)
+    benchmark.extra_info["corpus_bytes"] = sum(len(page) for page in CORPUS)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_large_page_throughput(benchmark, engine):
+    clean = ENGINES[engine]
+
+    text = benchmark(clean, LARGE_PAGE, None)
+
+    assert text == clean_html_to_text_bs4(LARGE_PAGE, None)
+    benchmark.extra_info["pages_per_sec"] = round(1 / benchmark.stats.stats.mean, 2)
+    benchmark.extra_info["page_bytes"] = len(LARGE_PAGE)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_peak_memory(benchmark, engine):
+    function = ENGINES[engine].__name__
+
+    def probe():
+        output = subprocess.run(
+            [sys.executable, "-c", MEMORY_PROBE, function],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return json.loads(output)
+
+    result = benchmark.pedantic(probe, rounds=1, iterations=1)
+    benchmark.extra_info.update(result)
@@ -0,0 +1,176 @@
+"""
+API cold start to first response, and resident memory per process.
+
+Starts `python main.py` with API_WORKERS=N for each requested worker
+count, polls /api/health until the first 200 (the lifespan has opened and
+warmed everything by then), times the first /api/tests and /api/cache/stats
+responses, waits for every worker to finish starting, then reads RSS and PSS for the
+server and every process under it (uvicorn workers and their HTML-cleaning
+pools) before shutting it down.
+Caches start empty in a temporary AML_CACHE_ROOT unless --cache-root is
+given, so the result-store import of the legacy snapshots is included.
+
+    cd backend
+    python -m benchmarks.bench_cold_start [--workers 1 2 4] [--cache-root DIR]
+"""
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import CLEAN_WORKERS
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(url: str) -> Tuple[int, float]:
+    started = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=30) as resp:
+        resp.read()
+        return resp.status, (time.perf_counter() - started) * 1000
+
+
+def wait_ready(url: str, server: subprocess.Popen, timeout: float) -> float:
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with {server.returncode} before answering")
+        try:
+            if get(url)[0] == 200:
+                return time.perf_counter() - started
+        except OSError:
+            time.sleep(0.01)
+    raise TimeoutError(f"No response from {url} within {timeout:g}s")
+
+
+def process_tree(root: int) -> List[Tuple[int, int, str]]:
+    """(pid, depth, command line) for root and all its descendants, from /proc."""
+    children: Dict[int, List[int]] = {}
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(")", 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry.name))
+    tree, stack = [], [(root, 0)]
+    while stack:
+        pid, depth = stack.pop()
+        try:
+            cmdline = (Path("/proc") / str(pid) / "cmdline").read_bytes().replace(b"\0", b" ").decode().strip()
+        except OSError:
+            continue
+        tree.append((pid, depth, cmdline))
+        stack.extend((child, depth + 1) for child in sorted(children.get(pid, []), reverse=True))
+    return tree
+
+
+def memory_mb(pid: int) -> Optional[Tuple[float, float]]:
+    """(RSS, PSS) in MB. Forked cleaning workers share most pages with their parent; PSS splits those."""
+    values = {}
+    try:
+        for line in (Path("/proc") / str(pid) / "smaps_rollup").read_text().splitlines():
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key] = int(rest.split()[0]) / 1024
+    except OSError:
+        return None
+    return values.get("Rss", 0.0), values.get("Pss", 0.0)
+
+
+def role(depth: int, cmdline: str, workers: int) -> str:
+    if depth == 0:
+        return "server" if workers == 1 else "supervisor"
+    if "multiprocessing" in cmdline and "resource_tracker" in cmdline:
+        return "resource tracker"
+    if depth == 1 and workers > 1 and "spawn_main" in cmdline:
+        return "api worker"
+    return "clean worker"
+
+
+def wait_all_workers(root: int, workers: int, timeout: float) -> None:
+    """Until every API worker has finished its lifespan startup, i.e. started its cleaning pool."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        roles = [role(depth, cmdline, workers) for _, depth, cmdline in process_tree(root)]
+        if roles.count("clean worker") >= workers * CLEAN_WORKERS:
+            return
+        time.sleep(0.05)
+    raise TimeoutError(f"{workers} workers not all started within {timeout:g}s")
+
+
+def run(workers: int, cache_root: Path, timeout: float) -> None:
+    port = free_port()
+    env = {**os.environ, "PORT": str(port), "API_WORKERS": str(workers), "AML_CACHE_ROOT": str(cache_root)}
+    server = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}/api"
+    try:
+        started = time.perf_counter()
+        ready = wait_ready(f"{base}/health", server, timeout)
+        _, tests_ms = get(f"{base}/tests?limit=5")
+        _, stats_ms = get(f"{base}/cache/stats")
+        wait_all_workers(server.pid, workers, timeout)
+        all_ready = time.perf_counter() - started
+        memory = [(depth, cmdline, memory_mb(pid)) for pid, depth, cmdline in process_tree(server.pid)]
+    finally:
+        stop_started = time.perf_counter()
+        server.send_signal(signal.SIGINT)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+        shutdown = time.perf_counter() - stop_started
+
+    print(f"\nAPI_WORKERS={workers}")
+    print(f"  cold start -> first response   {ready:.2f} s")
+    print(f"  cold start -> all workers up   {all_ready:.2f} s")
+    print(f"  first /api/tests               {tests_ms:.1f} ms")
+    print(f"  first /api/cache/stats         {stats_ms:.1f} ms")
+    print(f"  shutdown                       {shutdown:.2f} s")
+    totals: Dict[str, List[Tuple[float, float]]] = {}
+    for depth, cmdline, sizes in memory:
+        if sizes is not None:
+            totals.setdefault(role(depth, cmdline, workers), []).append(sizes)
+    print("  memory per process             RSS / PSS")
+    for name, values in totals.items():
+        rss = sum(v[0] for v in values) / len(values)
+        pss = sum(v[1] for v in values) / len(values)
+        print(f"    {name:<18} {len(values):>2} x   {rss:.0f} / {pss:.0f} MB")
+    total_pss = sum(v[1] for values in totals.values() for v in values)
+    print(f"  total PSS                      {total_pss:.0f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--cache-root", type=Path, default=None)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    for workers in args.workers:
+        if args.cache_root is not None:
+            run(workers, args.cache_root, args.timeout)
+        else:
+            with tempfile.TemporaryDirectory() as cache_root:
+                run(workers, Path(cache_root), args.timeout)
+
+
+if __name__ == "__main__":
+    main()
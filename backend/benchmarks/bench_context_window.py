@@ -0,0 +1,68 @@
+"""
+Prompt size and subject-mention recall: fixed 16k-character prefix vs the
+relevance-selected context window.
+
+Uses the stored snapshot articles under tests/results (no network). Each
+case is measured on its own article and on a synthetic long page where the
+article is buried after the other snapshot articles, as happens on live
+blogs, comment-heavy pages and round-ups.
+
+    cd backend
+    python -m benchmarks.bench_context_window [--budget 2000]
+"""
+import argparse
+import statistics
+import time
+
+from config import ARTICLE_CONTEXT_TOKEN_BUDGET
+from pipeline.name_prefilter import find_name_presence
+from pipeline.windowing import estimate_tokens, select_context
+from utils.test_results import load_all_test_results
+
+LEGACY_MAX_CHARS = 16000
+
+
+def load_cases():
+    cases = {}
+    for record in load_all_test_results():
+        details = record["output"].get("details", {})
+        name_match = details.get("name_match", {})
+        if details.get("article_text") and name_match.get("is_name_potential_match"):
+            cases[record["input"]["subject_names"][0]] = (record["input"].get("dob_value"), details["article_text"])
+    return cases
+
+
+def mentioned(name: str, text: str) -> bool:
+    return find_name_presence(name, text).plausible
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget", type=int, default=ARTICLE_CONTEXT_TOKEN_BUDGET, help="token budget")
+    args = parser.parse_args()
+
+    cases = load_cases()
+    texts = {text for _, text in cases.values()}
+    for label in ("own article", "buried in long page"):
+        before, after, legacy_hits, window_hits, timings = [], [], 0, 0, []
+        for name, (dob, text) in cases.items():
+            if label != "own article":
+                others = " ".join(t for t in sorted(texts) if t != text)
+                text = f"{others} {others} {text} {others}"
+            legacy = text[:LEGACY_MAX_CHARS]
+            started = time.perf_counter()
+            window = select_context(text, name, dob, token_budget=args.budget)
+            timings.append((time.perf_counter() - started) * 1000)
+            before.append(estimate_tokens(legacy))
+            after.append(estimate_tokens(window.text))
+            legacy_hits += mentioned(name, legacy)
+            window_hits += mentioned(name, window.text)
+
+        print(f"== {label} ({len(cases)} matched subjects, budget {args.budget} tokens)")
+        print(f"tokens / prompt   16k prefix {statistics.mean(before):,.0f}   window {statistics.mean(after):,.0f}")
+        print(f"subject kept      16k prefix {legacy_hits}/{len(cases)}   window {window_hits}/{len(cases)}")
+        print(f"selection time    p50 {statistics.median(timings):.2f} ms   max {max(timings):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Agreement / local-share / speed of the local DOB/age extractor.
+
+Article texts and the dob_age agent's outputs come from the stored
+snapshots under tests/results. For every stored (subject, article) the
+local pass either decides or defers; decided results are compared with the
+agent's age, birth date and consistency verdict. The snapshots carry no
+subject DOBs, so each locally decided age is also checked against a
+synthetic DOB that fits it and one that is five years off.
+
+    cd backend
+    python -m benchmarks.bench_dob_age [--repeat 20]
+"""
+import argparse
+import statistics
+import time
+from datetime import date
+
+from pipeline.dob_age_extractor import extract_dob_age
+from utils.test_results import load_all_test_results
+
+COMPARED = ("age_in_article", "dob_in_article", "is_dob_or_age_consistent")
+
+
+def load_cases() -> list:
+    """(subject, subject DOB, article text, agent dob_age output), once per subject and URL."""
+    cases, seen = [], set()
+    for record in load_all_test_results():
+        details = record["output"].get("details", {})
+        subject = record["input"]["subject_names"][0]
+        key = (subject, record["input"]["article_link"])
+        if key in seen or not details.get("article_text") or not details.get("dob_age"):
+            continue
+        seen.add(key)
+        cases.append((subject, record["input"].get("dob_value"), details["article_text"], details["dob_age"]))
+    return cases
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    cases = load_cases()
+    local, agreed, disagreed, deferred, timings = 0, 0, [], [], []
+    synthetic, synthetic_ok = 0, 0
+    for subject, dob, text, llm in cases:
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            extraction = extract_dob_age(subject, dob, text)
+            timings.append((time.perf_counter() - started) * 1000)
+        if extraction.result is None:
+            deferred.append(f"{subject}: {extraction.reason}")
+            continue
+        local += 1
+        ours = extraction.result.model_dump()
+        if all(ours[field] == llm.get(field) for field in COMPARED):
+            agreed += 1
+        else:
+            disagreed.append(
+                f"{subject}: local {[ours[f] for f in COMPARED]} vs agent {[llm.get(f) for f in COMPARED]}"
+            )
+
+        age, published = extraction.result.age_in_article, extraction.published
+        if age is not None and published is not None:
+            # A birthday on or just before the publication day makes the age exact.
+            fits = date(published.year - age, published.month, min(published.day, 28))
+            for born, expected in ((fits, True), (fits.replace(year=fits.year - 5), False)):
+                synthetic += 1
+                check = extract_dob_age(subject, born.isoformat(), text).result
+                synthetic_ok += check is not None and check.is_dob_or_age_consistent is expected
+
+    print(f"stored cases         {len(cases)}")
+    print(f"decided locally      {local} ({local / max(len(cases), 1):.0%} of dob_age agent calls avoided)")
+    print(f"agreement with agent {agreed}/{local}")
+    print(f"deferred to agent    {len(deferred)}")
+    print(f"synthetic DOB checks {synthetic_ok}/{synthetic}")
+    print(f"latency p50 / max    {statistics.median(timings):.2f} / {max(timings):.2f} ms")
+    for line in disagreed:
+        print(f"DISAGREE  {line}")
+    for line in deferred:
+        print(f"DEFER     {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Event-loop responsiveness while many screenings fetch articles at once.
+
+Starts a local HTTP server that answers every request after a delay, then
+runs N concurrent "screenings" (fetch + clean + a simulated agent wait)
+through either the blocking fetcher or the pooled async one, while a probe
+coroutine measures how late the event loop wakes it up.
+
+    cd backend
+    python -m benchmarks.bench_fetch_event_loop --screenings 50 --delay 0.25
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scraping.fetcher import (
+    close_http_client,
+    fetch_article_text,
+    fetch_article_text_async,
+    get_http_client,
+    warm_clean_executor,
+)
+
+PROBE_INTERVAL = 0.01
+
+
+def build_article_html(paragraphs: int = 400) -> bytes:
+    body = "\n".join(
+        f"<p>Paragraph {i}: the defendant appeared at court charged with fraud "
+        f"totalling £{i * 1000:,} according to prosecutors.</p>"
+        for i in range(paragraphs)
+    )
+    page = (
+        "<html><head><title>Bench article</title><script>var x = 1;</script></head>"
+        "<body><header>Site header</header><nav>Home | News</nav>"
+        f"<main><article><h1>Bench article</h1>{body}</article></main>"
+        "<aside class='related'>Related stories</aside><footer>Footer</footer></body></html>"
+    )
+    return page.encode("utf-8")
+
+
+def start_slow_server(delay: float, payload: bytes) -> ThreadingHTTPServer:
+    class SlowHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def probe_loop_lag(samples: list, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        scheduled = loop.time()
+        await asyncio.sleep(PROBE_INTERVAL)
+        samples.append(loop.time() - scheduled - PROBE_INTERVAL)
+
+
+async def run_mode(mode: str, url: str, screenings: int, agent_latency: float) -> dict:
+    async def screening() -> int:
+        if mode == "sync":
+            text = fetch_article_text(url)
+        else:
+            text = await fetch_article_text_async(url)
+        await asyncio.sleep(agent_latency)
+        return len(text)
+
+    if mode == "async":
+        # The app does both in its lifespan hook, before serving traffic.
+        get_http_client()
+        await warm_clean_executor()
+
+    lags: list = []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(screening() for _ in range(screenings)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+    await close_http_client()
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    return {
+        "mode": mode,
+        "wall_s": elapsed,
+        "lag_p50_ms": statistics.median(lags_ms),
+        "lag_p99_ms": lags_ms[int(len(lags_ms) * 0.99) - 1] if len(lags_ms) > 1 else lags_ms[0],
+        "lag_max_ms": lags_ms[-1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--screenings", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.25, help="server response delay (s)")
+    parser.add_argument("--agent-latency", type=float, default=0.5, help="simulated agent stage (s)")
+    parser.add_argument("--modes", default="sync,async")
+    args = parser.parse_args()
+
+    server = start_slow_server(args.delay, build_article_html())
+    url = f"http://127.0.0.1:{server.server_port}/article"
+    try:
+        print(f"{'mode':<6} {'wall (s)':>9} {'lag p50 (ms)':>13} {'lag p99 (ms)':>13} {'lag max (ms)':>13}")
+        for mode in args.modes.split(","):
+            row = asyncio.run(run_mode(mode, url, args.screenings, args.agent_latency))
+            print(
+                f"{row['mode']:<6} {row['wall_s']:>9.2f} {row['lag_p50_ms']:>13.1f} "
+                f"{row['lag_p99_ms']:>13.1f} {row['lag_max_ms']:>13.1f}"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Recall / skip-rate / speed of the local name pre-filter.
+
+Article texts come from the stored snapshots under tests/results (the live
+pages are not fetched). Every case in tests/test_dataset.json is screened
+against its own article; recall must stay at 1.0 because a missed mention
+turns into a silent false negative. Each dataset subject is also screened
+against every other stored article to show how many agent runs a sweep
+would skip.
+
+    cd backend
+    python -m benchmarks.bench_name_prefilter [--threshold 0.7]
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from config import NAME_PREFILTER_SIMILARITY_THRESHOLD
+from pipeline.name_prefilter import find_name_presence
+from utils.test_results import load_all_test_results
+
+DATASET_PATH = Path(__file__).resolve().parent.parent / "tests" / "test_dataset.json"
+
+
+def load_articles() -> dict:
+    """Stored article text by URL, plus the subjects the LLM judged a name match."""
+    articles: dict = {}
+    for record in load_all_test_results():
+        url = record["input"]["article_link"]
+        details = record["output"].get("details", {})
+        if not details.get("article_text"):
+            continue
+        entry = articles.setdefault(url, {"text": details["article_text"], "llm_matches": set()})
+        if details.get("name_match", {}).get("is_name_potential_match"):
+            entry["llm_matches"].add(record["input"]["subject_names"][0].lower())
+    return articles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threshold", type=float, default=NAME_PREFILTER_SIMILARITY_THRESHOLD)
+    args = parser.parse_args()
+
+    with DATASET_PATH.open("r") as f:
+        cases = json.load(f)
+    articles = load_articles()
+
+    positives, missed, timings = 0, [], []
+    negatives, skipped = 0, 0
+    for case in cases:
+        subject, aliases = case["subject_names"][0], case["subject_names"][1:]
+        for url, article in articles.items():
+            started = time.perf_counter()
+            presence = find_name_presence(subject, article["text"], aliases, threshold=args.threshold)
+            timings.append(time.perf_counter() - started)
+
+            if url == case["article_link"] or subject.lower() in article["llm_matches"]:
+                positives += 1
+                if not presence.plausible:
+                    missed.append(f"{subject} @ {url}: {presence.reason}")
+            else:
+                negatives += 1
+                skipped += not presence.plausible
+
+    timings_ms = sorted(t * 1000 for t in timings)
+    print(f"threshold            {args.threshold:.2f}")
+    print(f"articles             {len(articles)}")
+    print(f"positive pairs       {positives}")
+    print(f"recall               {(positives - len(missed)) / positives:.3f}")
+    print(f"negative pairs       {negatives}")
+    print(f"skipped negatives    {skipped} ({skipped / max(negatives, 1):.1%} of agent runs avoided)")
+    print(f"latency p50 / max    {statistics.median(timings_ms):.2f} / {timings_ms[-1]:.2f} ms")
+    for line in missed:
+        print(f"MISSED  {line}")
+
+
+if __name__ == "__main__":
+    main()
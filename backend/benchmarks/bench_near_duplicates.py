@@ -0,0 +1,119 @@
+"""
+Near-duplicate index build time, memory and lookup latency at scale.
+
+Random MinHash signatures stand in for stored articles (lookups cost the
+same whatever the text was). Hit probes are stored signatures with a few
+bins changed so they sit just above the similarity threshold; miss probes
+are fresh random signatures. Also reports the cost of fingerprinting one
+article with minhash().
+
+    cd backend
+    python -m benchmarks.bench_near_duplicates [--size 1000000] [--queries 2000] [--changed-bins 8]
+"""
+import argparse
+import math
+import random
+import resource
+import time
+from array import array
+from typing import Iterator, List
+
+from config import NEAR_DUPLICATE_MIN_SIMILARITY, NEAR_DUPLICATE_PERMUTATIONS
+from pipeline.near_duplicates import MinHashIndex, minhash
+
+ARTICLE = " ".join(
+    f"Paragraph {n}: the defendant was convicted of fraud after moving funds through accounts opened "
+    f"with forged documents, the court heard on day {n} of the trial."
+    for n in range(40)
+)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def random_signatures(rng: random.Random, count: int) -> Iterator[tuple]:
+    # Generated in blocks from raw bytes: a million 64-value tuples at once would not fit comfortably.
+    width = NEAR_DUPLICATE_PERMUTATIONS
+    block = 10_000
+    for first in range(0, count, block):
+        size = min(block, count - first)
+        values = array("Q", rng.randbytes(8 * width * size))
+        for i in range(size):
+            yield tuple(values[i * width : (i + 1) * width])
+
+
+def timed_queries(index: MinHashIndex, probes: List[tuple]) -> List[float]:
+    timings = []
+    for probe in probes:
+        started = time.perf_counter()
+        index.query(probe)
+        timings.append((time.perf_counter() - started) * 1e6)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument(
+        "--changed-bins",
+        type=int,
+        default=math.floor(NEAR_DUPLICATE_PERMUTATIONS * (1 - NEAR_DUPLICATE_MIN_SIMILARITY)),
+    )
+    args = parser.parse_args()
+    rng = random.Random(21)
+
+    index = MinHashIndex()
+    rss_before = peak_rss_mb()
+    started = time.perf_counter()
+    sample_every = max(1, args.size // args.queries)
+    stored_sample: List[tuple] = []
+
+    def keep_sample(signatures: Iterator[tuple]) -> Iterator[tuple]:
+        for n, signature in enumerate(signatures):
+            if n % sample_every == 0 and len(stored_sample) < args.queries:
+                stored_sample.append(signature)
+            yield signature
+
+    index.add_many(keep_sample(random_signatures(rng, args.size)))
+    build_seconds = time.perf_counter() - started
+    memory_mb = peak_rss_mb() - rss_before
+
+    hits = []
+    for signature in stored_sample:
+        probe = list(signature)
+        for slot in rng.sample(range(len(probe)), args.changed_bins):
+            probe[slot] = rng.getrandbits(64)
+        hits.append(tuple(probe))
+    misses = list(random_signatures(rng, args.queries))
+
+    hit_us = timed_queries(index, hits)
+    miss_us = timed_queries(index, misses)
+    found = sum(1 for probe in hits if index.query(probe))
+
+    started = time.perf_counter()
+    for _ in range(100):
+        minhash(ARTICLE)
+    minhash_us = (time.perf_counter() - started) / 100 * 1e6
+
+    print(f"signatures           {len(index):,} x {NEAR_DUPLICATE_PERMUTATIONS} bins, {index.bands} bands")
+    print(f"build (bulk)         {build_seconds:.1f} s")
+    print(f"peak RSS growth      {memory_mb:.0f} MB (build included)")
+    print(f"threshold            {NEAR_DUPLICATE_MIN_SIMILARITY:.2f}, hits change {args.changed_bins} bins")
+    print(f"hit recall           {found}/{len(hits)}")
+    for label, timings in (("hit", hit_us), ("miss", miss_us)):
+        print(
+            f"{label:<5} query p50/p99    {percentile(timings, 50):.1f} / {percentile(timings, 99):.1f} us"
+        )
+    print(f"minhash ({len(ARTICLE.split())} words)  {minhash_us:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
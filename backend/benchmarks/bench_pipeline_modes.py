@@ -0,0 +1,122 @@
+"""
+Input tokens and latency: six specialist calls vs one combined call.
+
+By default this is an offline estimate over the stored snapshots under
+tests/results: it builds the exact prompts each mode would send, over the
+same context window the pipeline gives the agents, and counts input tokens
+the way the rate governor does (the decision step is identical in both modes
+and left out). With --live it screens the first N snapshot articles in both
+modes against the real provider (OPENAI_API_KEY required), with the agent,
+article-stage and near-duplicate caches disabled, and reports the provider's
+token usage and wall-clock latency per screening.
+
+    cd backend
+    python -m benchmarks.bench_pipeline_modes
+    python -m benchmarks.bench_pipeline_modes --live 3
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from dataclasses import replace
+from unittest import mock
+
+from aml_agents.combined_agent import combined_extraction_agent
+from models.inputs import ScreeningInput
+from pipeline import agent_runner, article_stage, orchestrator
+from pipeline.agent_runner import estimate_prompt_tokens
+from utils.test_results import load_all_test_results
+
+
+def load_inputs():
+    inputs = []
+    for record in load_all_test_results():
+        details = record["output"].get("details", {})
+        if details.get("article_text"):
+            inputs.append(
+                ScreeningInput(
+                    record["input"]["subject_names"][0],
+                    record["input"].get("dob_value"),
+                    record["input"]["article_link"],
+                    details["article_text"],
+                )
+            )
+    return inputs
+
+
+def estimate(inputs) -> None:
+    multi, combined = [], []
+    for screening_input in inputs:
+        window = orchestrator.build_context_window(
+            screening_input.article_text, screening_input.subject_name, screening_input.subject_date_of_birth
+        )
+        subject_prompt = orchestrator.build_base_prompt(replace(screening_input, article_text=window.text))
+        article_prompt = orchestrator.build_article_prompt(
+            screening_input.article_url, orchestrator.build_context_window(screening_input.article_text).text
+        )
+        multi.append(
+            sum(estimate_prompt_tokens(agent, subject_prompt) for agent in orchestrator.SUBJECT_AGENTS.values())
+            + sum(estimate_prompt_tokens(agent, article_prompt) for agent in orchestrator.ARTICLE_AGENTS.values())
+        )
+        combined.append(estimate_prompt_tokens(combined_extraction_agent, subject_prompt))
+
+    print(f"articles                     {len(inputs)}")
+    print(f"multi_agent input tokens     mean {statistics.mean(multi):,.0f}  (6 requests / screening)")
+    print(f"combined input tokens        mean {statistics.mean(combined):,.0f}  (1 request / screening)")
+    print(f"saving                       {1 - sum(combined) / sum(multi):.1%}")
+
+
+async def live(inputs) -> None:
+    original_run = agent_runner.Runner.run
+    usage = defaultdict(lambda: [0, 0, 0])
+
+    async def counting_run(agent, prompt, **kwargs):
+        result = await original_run(agent, prompt, **kwargs)
+        totals = usage[current_mode]
+        totals[0] += result.context_wrapper.usage.input_tokens
+        totals[1] += result.context_wrapper.usage.output_tokens
+        totals[2] += 1
+        return result
+
+    with ExitStack() as patches:
+        # Every screening pays for its own model calls: no cached, shared or near-duplicate results.
+        patches.enter_context(mock.patch.object(agent_runner, "get_agent_cache", lambda: None))
+        patches.enter_context(mock.patch.object(orchestrator, "get_near_duplicate_index", lambda: None))
+        patches.enter_context(
+            mock.patch.object(orchestrator, "get_article_stage_cache", lambda: article_stage.ArticleStageCache())
+        )
+        patches.enter_context(mock.patch.object(agent_runner.Runner, "run", counting_run))
+        agent_runner.open_model_client()
+        try:
+            for current_mode in ("multi_agent", "combined"):
+                latencies = []
+                for screening_input in inputs:
+                    started = time.perf_counter()
+                    await orchestrator.screen_article(screening_input, current_mode)
+                    latencies.append(time.perf_counter() - started)
+                input_tokens, output_tokens, requests = usage[current_mode]
+                print(
+                    f"{current_mode:12} screenings {len(inputs)}  requests {requests}  "
+                    f"input {input_tokens / len(inputs):,.0f}  "
+                    f"output {output_tokens / len(inputs):,.0f} tokens/screening  "
+                    f"latency p50 {statistics.median(latencies):.1f}s max {max(latencies):.1f}s"
+                )
+        finally:
+            await agent_runner.close_model_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--live", type=int, default=0, metavar="N", help="screen N snapshot articles per mode")
+    args = parser.parse_args()
+
+    inputs = load_inputs()
+    estimate(inputs)
+    if args.live:
+        asyncio.run(live(inputs[: args.live]))
+
+
+if __name__ == "__main__":
+    main()
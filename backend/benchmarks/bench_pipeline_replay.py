@@ -0,0 +1,163 @@
+"""
+Offline pipeline throughput and latency, via the replay harness.
+
+Every dataset case is screened through run_screening end to end (fetch,
+clean, pre-filter, windowing, agents, decision) against the recorded pages
+under tests/fixtures/replay and the replay model provider, with the
+article, agent and article-stage caches disabled. Each concurrency level
+screens the same number of cases and reports screenings/sec plus p50/p95
+for each stage:
+
+    fetch     request -> cleaned article text
+    agents    article text -> last specialist result
+    decision  last specialist result -> final response
+    total     end to end
+
+plus the simulated model time per agent call.
+
+With --provider-rpm / --provider-tpm the fake provider refuses calls over
+those per-minute limits with 429s, and the rate governor is sized to the
+same limits (pass --no-governor to see the ungoverned 429 storm).
+
+    cd backend
+    python -m benchmarks.bench_pipeline_replay [--concurrency 1,4,16] [--screenings 48]
+        [--latency 0.3] [--per-1k-tokens 0.05] [--jitter 0.1] [--mode multi_agent|combined]
+        [--provider-rpm 600] [--provider-tpm 400000] [--no-governor]
+"""
+import argparse
+import asyncio
+import math
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks import replay
+from config import PIPELINE_MODES
+from pipeline import agent_runner, article_stage, governor, orchestrator
+from scraping import fetcher
+
+STAGES = ("fetch", "agents", "decision", "total")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+async def timed_screening(case: Dict, mode: str) -> Dict[str, float]:
+    started = time.perf_counter()
+    marks: Dict[str, float] = {}
+
+    def on_event(event: str, data: Dict) -> None:
+        now = time.perf_counter() - started
+        if event == "article":
+            marks["fetch"] = now
+        elif event == "agent":
+            marks["agents_done"] = now
+
+    await orchestrator.run_screening(
+        case["subject_names"][0], case["dob_value"], case["article_link"], mode, on_event
+    )
+    total = time.perf_counter() - started
+    fetched = marks["fetch"]
+    agents_done = marks.get("agents_done", fetched)
+    return {"fetch": fetched, "agents": agents_done - fetched, "decision": total - agents_done, "total": total}
+
+
+async def run_level(cases: List[Dict], concurrency: int, mode: str) -> Dict[str, List[float]]:
+    # A fresh article-stage cache per level so no level inherits another's work.
+    stage_cache = article_stage.ArticleStageCache()
+    orchestrator.get_article_stage_cache = lambda: stage_cache
+    slots = asyncio.Semaphore(concurrency)
+
+    async def bounded(case):
+        async with slots:
+            return await timed_screening(case, mode)
+
+    try:
+        await fetcher.warm_clean_executor()
+        started = time.perf_counter()
+        timings = await asyncio.gather(*(bounded(case) for case in cases))
+        elapsed = time.perf_counter() - started
+    finally:
+        await fetcher.close_http_client()
+
+    stages: Dict[str, List[float]] = defaultdict(list)
+    for timing in timings:
+        for stage, seconds in timing.items():
+            stages[stage].append(seconds)
+    stages["elapsed"] = [elapsed]
+    return stages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--screenings", type=int, default=48, help="Screenings per level (dataset cases repeated)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Simulated seconds per model call")
+    parser.add_argument("--per-1k-tokens", type=float, default=0.05, help="Extra seconds per 1k input tokens")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Up to this many extra seconds per call")
+    parser.add_argument("--mode", choices=PIPELINE_MODES, default="multi_agent")
+    parser.add_argument("--provider-rpm", type=int, help="Fake provider requests-per-minute limit")
+    parser.add_argument("--provider-tpm", type=int, help="Fake provider input-tokens-per-minute limit")
+    parser.add_argument("--no-governor", action="store_true", help="Call the provider without the rate governor")
+    args = parser.parse_args()
+
+    corpus = replay.PageCorpus()
+    if not len(corpus):
+        raise SystemExit("No recorded pages; run `python -m benchmarks.replay record` first")
+    dataset = [case for case in replay.load_dataset() if corpus.body(case["article_link"]) is not None]
+    cases = [dataset[i % len(dataset)] for i in range(args.screenings)]
+
+    limits = None
+    if args.provider_rpm or args.provider_tpm:
+        limits = replay.ProviderLimits(requests=args.provider_rpm, tokens=args.provider_tpm)
+    provider = replay.ReplayModelProvider(
+        latency_seconds=args.latency,
+        seconds_per_1k_tokens=args.per_1k_tokens,
+        jitter_seconds=args.jitter,
+        limits=limits,
+    )
+    replay.install(corpus, provider)
+    if args.no_governor:
+        agent_runner.get_governor = lambda: None
+    elif limits is not None:
+        governor.set_governor(
+            governor.RateGovernor(request_limit=args.provider_rpm or 10**9, token_limit=args.provider_tpm or 10**12)
+        )
+    agent_runner.get_agent_cache = lambda: None
+    fetcher.get_article_cache = lambda: None
+
+    print(
+        f"mode={args.mode} screenings/level={args.screenings} pages={len(corpus)} "
+        f"latency={args.latency}s +{args.per_1k_tokens}s/1k tokens jitter<={args.jitter}s "
+        f"limits={limits} governor={'off' if args.no_governor else 'on'}"
+    )
+    header = f"{'conc':>5} {'scr/s':>7} " + " ".join(f"{stage + ' p50/p95':>19}" for stage in STAGES)
+    print(header)
+    print("-" * len(header))
+    try:
+        for concurrency in (int(level) for level in args.concurrency.split(",")):
+            provider.calls.clear()
+            stages = asyncio.run(run_level(cases, concurrency, args.mode))
+            rate = len(cases) / stages["elapsed"][0]
+            cells = " ".join(
+                f"{percentile(stages[s], 50) * 1000:>8.0f}/{percentile(stages[s], 95) * 1000:<6.0f}ms" for s in STAGES
+            )
+            print(f"{concurrency:>5} {rate:>7.2f} {cells}")
+            if provider.rejections:
+                print(f"      provider 429s so far: {provider.rejections}")
+    finally:
+        replay.uninstall()
+
+    per_type: Dict[str, List[float]] = defaultdict(list)
+    for call in provider.calls:
+        per_type[call.output_type].append(call.seconds)
+    print("\nmodel calls in the last level (simulated seconds):")
+    for type_name, seconds in sorted(per_type.items()):
+        print(f"  {type_name:<26} n={len(seconds):<4} p50={percentile(seconds, 50):.3f} p95={percentile(seconds, 95):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,406 @@
+"""
+Offline record/replay harness for the screening pipeline.
+
+Two stand-ins make a full run_screening call repeatable without the
+network or an API key:
+
+- PageCorpus serves recorded article HTML (tests/fixtures/replay) through
+  an httpx mock transport installed on the shared fetcher client.
+- ReplayModelProvider is a model provider for the agents SDK. It answers
+  each agent with the structured output recorded in the stored snapshots
+  for that article and subject, after a configurable simulated latency.
+  Prompts it has no recording for get a valid, non-committal placeholder.
+  Given ProviderLimits it also refuses calls over a requests/tokens budget
+  with a 429 and Retry-After, like the real API.
+
+Pages are recorded once:
+
+    cd backend
+    python -m benchmarks.replay record          # rebuild pages from stored snapshot text
+    python -m benchmarks.replay record --live   # capture the real pages (network required)
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from html import escape
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import httpx
+import openai
+from agents import ModelProvider
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+from pydantic import ValidationError
+
+from config import CHARS_PER_TOKEN
+from models.combined import CombinedExtractionResult
+from models.decision import FinalScreeningDecision
+from models.name_match import NameMatchResult
+from pipeline import agent_runner, orchestrator
+from scraping import fetcher
+from scraping.cache import normalize_url
+from utils.test_results import load_all_test_results
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+REPLAY_DIR = BACKEND_DIR / "tests" / "fixtures" / "replay"
+DATASET_PATH = BACKEND_DIR / "tests" / "test_dataset.json"
+
+URL_RE = re.compile(r"Article URL:\s*-\s*(\S+)")
+SUBJECT_RE = re.compile(r"Full name:\s*(.+)")
+
+# Output type name -> specialist key, e.g. "SentimentResult" -> "sentiment".
+SPECIALIST_KEYS = {agent.output_type.__name__: key for key, agent in orchestrator.SPECIALIST_AGENTS.items()}
+COMBINED = CombinedExtractionResult.__name__
+DECISION = FinalScreeningDecision.__name__
+
+
+def load_dataset() -> List[Dict[str, Any]]:
+    with DATASET_PATH.open("r") as f:
+        return json.load(f)
+
+
+# ---------------------------------------------------------------------------
+# Recorded pages
+
+
+class PageCorpus:
+    """Recorded pages by normalized URL, served through an httpx mock transport."""
+
+    def __init__(self, root: Path = REPLAY_DIR):
+        self.root = Path(root)
+        self.pages: Dict[str, Dict[str, str]] = {}
+        manifest = self.root / "manifest.json"
+        if manifest.exists():
+            with manifest.open("r") as f:
+                for entry in json.load(f):
+                    self.pages[normalize_url(entry["url"])] = entry
+        self.requests: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+    def body(self, url: str) -> Optional[Tuple[bytes, str]]:
+        entry = self.pages.get(normalize_url(url))
+        if entry is None:
+            return None
+        return (self.root / entry["file"]).read_bytes(), entry["content_type"]
+
+    def _handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404, headers={"Content-Type": "text/plain"}, content=b"not recorded")
+        self.requests.append(str(request.url))
+        page = self.body(str(request.url))
+        if page is None:
+            return httpx.Response(404, headers={"Content-Type": "text/plain"}, content=b"not recorded")
+        content, content_type = page
+        return httpx.Response(200, headers={"Content-Type": content_type}, content=content)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self._handle)
+
+
+def snapshot_page(title: str, article_text: str) -> str:
+    """A news-site-shaped page around stored article text: chrome the cleaner must strip, then the article."""
+    sentences = re.split(r"(?<=[.!?])\s+", article_text)
+    paragraphs = [" ".join(sentences[i : i + 3]) for i in range(0, len(sentences), 3)]
+    body = "\n".join(f"<p>{escape(p)}</p>" for p in paragraphs if p)
+    return (
+        '<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8">'
+        f"<title>{escape(title)}</title><script>window.analytics = {{}};</script></head>\n"
+        '<body><header class="site-header"><nav>Home | News | Sport</nav></header>\n'
+        f"<main><article>\n{body}\n</article></main>\n"
+        '<aside class="related">Related stories</aside><footer>Recorded for offline replay</footer>'
+        "</body></html>\n"
+    )
+
+
+def record_pages(root: Path = REPLAY_DIR, live: bool = False) -> List[Dict[str, str]]:
+    """Write one page per dataset URL plus manifest.json; returns the manifest."""
+    texts: Dict[str, Tuple[str, str]] = {}
+    for record in load_all_test_results():
+        details = record.get("output", {}).get("details", {})
+        if details.get("article_text"):
+            title = details.get("metadata", {}).get("title") or record.get("title", "")
+            texts[normalize_url(record["input"]["article_link"])] = (title, details["article_text"])
+
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = []
+    for case in load_dataset():
+        url = case["article_link"]
+        name = hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()[:16] + ".html"
+        if live:
+            response = httpx.get(url, follow_redirects=True, timeout=30)
+            response.raise_for_status()
+            content = response.content
+            content_type = response.headers.get("Content-Type", "text/html")
+            source = "live"
+        elif normalize_url(url) in texts:
+            content = snapshot_page(*texts[normalize_url(url)]).encode("utf-8")
+            content_type = "text/html; charset=utf-8"
+            source = "snapshot"
+        else:
+            print(f"no stored text for {url}; skipped")
+            continue
+        (root / name).write_bytes(content)
+        manifest.append({"url": url, "file": name, "content_type": content_type, "source": source})
+
+    with (root / "manifest.json").open("w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Recorded agent outputs
+
+
+def _prompt_text(model_input: Any) -> str:
+    if isinstance(model_input, str):
+        return model_input
+    return "\n".join(str(item.get("content", "")) if isinstance(item, dict) else str(item) for item in model_input)
+
+
+@dataclass
+class RecordedOutputs:
+    """Specialist and decision outputs from stored snapshots, keyed by article and subject."""
+
+    by_case: Dict[Tuple[str, str], Dict[str, Any]] = field(default_factory=dict)
+    by_article: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    @classmethod
+    def from_snapshots(cls, records: Optional[List[Dict[str, Any]]] = None) -> "RecordedOutputs":
+        recorded = cls()
+        for record in load_all_test_results() if records is None else records:
+            output = record.get("output", {})
+            details = output.get("details", {})
+            if not all(key in details for key in orchestrator.SPECIALIST_AGENTS):
+                continue
+            try:
+                for key, agent in orchestrator.SPECIALIST_AGENTS.items():
+                    agent.output_type.model_validate(details[key])
+                decision = FinalScreeningDecision.model_validate(output)
+            except ValidationError:
+                continue
+            outputs = {key: details[key] for key in orchestrator.SPECIALIST_AGENTS}
+            outputs["decision"] = decision.model_dump(mode="json")
+            url = normalize_url(record["input"]["article_link"])
+            subject = record["input"]["subject_names"][0].strip().lower()
+            recorded.by_case[(url, subject)] = outputs
+            recorded.by_article.setdefault(url, outputs)
+        return recorded
+
+    def respond(self, type_name: str, prompt: str) -> Dict[str, Any]:
+        url_match, subject_match = URL_RE.search(prompt), SUBJECT_RE.search(prompt)
+        url = normalize_url(url_match.group(1)) if url_match else None
+        subject = subject_match.group(1).strip().lower() if subject_match else None
+        case = self.by_case.get((url, subject)) if subject else self.by_article.get(url)
+
+        if type_name == DECISION:
+            return self._decision(prompt)
+        if type_name == COMBINED:
+            return {key: self._specialist(key, case, subject) for key in orchestrator.SPECIALIST_AGENTS}
+        return self._specialist(SPECIALIST_KEYS[type_name], case, subject)
+
+    def _specialist(self, key: str, case: Optional[Dict[str, Any]], subject: Optional[str]) -> Dict[str, Any]:
+        if case is not None:
+            return case[key]
+        note = "Replay: no recorded output for this prompt."
+        if key == "name_match":
+            return NameMatchResult(
+                subject_name_normalized=subject or "",
+                article_primary_names=[],
+                is_name_potential_match=False,
+                confidence=0.5,
+                reasoning=note,
+            ).model_dump(mode="json")
+        return orchestrator._placeholder_output(key, note).model_dump(mode="json")
+
+    def _decision(self, prompt: str) -> Dict[str, Any]:
+        # The decision prompt embeds the name-match result, which came from the same recording.
+        for outputs in self.by_case.values():
+            if json.dumps(outputs["name_match"]["reasoning"]) in prompt:
+                return outputs["decision"]
+        return FinalScreeningDecision(
+            is_subject_match=False,
+            match_confidence=0.5,
+            overall_risk_label="medium",
+            decision="needs_manual_review",
+            human_readable_summary="Replay: no recorded decision for this case.",
+            audit_notes="- Replay placeholder decision.",
+        ).model_dump(mode="json")
+
+
+# ---------------------------------------------------------------------------
+# Fake model provider
+
+
+@dataclass
+class ModelCall:
+    output_type: str
+    input_tokens: int
+    seconds: float
+
+
+@dataclass
+class ProviderLimits:
+    """At most `requests` calls and `tokens` input tokens per sliding window."""
+
+    requests: Optional[int] = None
+    tokens: Optional[int] = None
+    window_seconds: float = 60.0
+
+
+class LimitWindow:
+    def __init__(self, limits: ProviderLimits):
+        self.limits = limits
+        self.admitted: Deque[Tuple[float, int]] = deque()
+        self.rejections = 0
+
+    def admit(self, input_tokens: int) -> None:
+        """Count one call, or raise a 429 RateLimitError carrying retry-after-ms."""
+        now = time.monotonic()
+        while self.admitted and self.admitted[0][0] <= now - self.limits.window_seconds:
+            self.admitted.popleft()
+        over_requests = self.limits.requests is not None and len(self.admitted) + 1 > self.limits.requests
+        used = sum(tokens for _, tokens in self.admitted)
+        over_tokens = self.limits.tokens is not None and used + input_tokens > self.limits.tokens
+        if (over_requests or over_tokens) and self.admitted:
+            self.rejections += 1
+            retry_after = self.admitted[0][0] + self.limits.window_seconds - now
+            response = httpx.Response(
+                429,
+                headers={"retry-after-ms": str(max(1, int(retry_after * 1000)))},
+                request=httpx.Request("POST", "https://replay.invalid/v1/responses"),
+            )
+            raise openai.RateLimitError("Replay rate limit exceeded", response=response, body=None)
+        self.admitted.append((now, input_tokens))
+
+
+class ReplayModel(Model):
+    def __init__(self, provider: "ReplayModelProvider"):
+        self.provider = provider
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        *,
+        previous_response_id=None,
+        conversation_id=None,
+        prompt=None,
+    ) -> ModelResponse:
+        text = _prompt_text(input)
+        type_name = output_schema.name() if output_schema is not None else "str"
+        input_tokens = (len(system_instructions or "") + len(text)) // CHARS_PER_TOKEN
+        if self.provider.window is not None:
+            self.provider.window.admit(input_tokens)
+        seconds = self.provider.latency_for(type_name, text, input_tokens)
+        await asyncio.sleep(seconds)
+
+        output = json.dumps(self.provider.outputs.respond(type_name, text))
+        self.provider.calls.append(ModelCall(type_name, input_tokens, seconds))
+        output_tokens = len(output) // CHARS_PER_TOKEN
+        message = ResponseOutputMessage(
+            id="msg_replay",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[ResponseOutputText(type="output_text", text=output, annotations=[])],
+        )
+        usage = Usage(
+            requests=1,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+        )
+        return ModelResponse(output=[message], usage=usage, response_id=None)
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError("The replay model does not stream")
+
+
+class ReplayModelProvider(ModelProvider):
+    """
+    Deterministic stand-in for the OpenAI provider.
+
+    Simulated latency per call is latency_seconds (or the per-output-type
+    override) plus seconds_per_1k_tokens of input, plus up to
+    jitter_seconds chosen from a hash of the prompt, so the same prompt
+    always takes the same time. With `limits`, calls over the budget are
+    refused with a 429 (counted in `rejections`) instead of answered.
+    """
+
+    def __init__(
+        self,
+        outputs: Optional[RecordedOutputs] = None,
+        latency_seconds: float = 0.0,
+        seconds_per_1k_tokens: float = 0.0,
+        jitter_seconds: float = 0.0,
+        latency_overrides: Optional[Dict[str, float]] = None,
+        seed: int = 0,
+        limits: Optional[ProviderLimits] = None,
+    ):
+        self.outputs = outputs if outputs is not None else RecordedOutputs.from_snapshots()
+        self.latency_seconds = latency_seconds
+        self.seconds_per_1k_tokens = seconds_per_1k_tokens
+        self.jitter_seconds = jitter_seconds
+        self.latency_overrides = latency_overrides or {}
+        self.seed = seed
+        self.window = LimitWindow(limits) if limits is not None else None
+        self.calls: List[ModelCall] = []
+
+    @property
+    def rejections(self) -> int:
+        return self.window.rejections if self.window is not None else 0
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        return ReplayModel(self)
+
+    def latency_for(self, type_name: str, prompt: str, input_tokens: int) -> float:
+        base = self.latency_overrides.get(type_name, self.latency_seconds)
+        seconds = base + self.seconds_per_1k_tokens * input_tokens / 1000
+        if self.jitter_seconds:
+            digest = hashlib.sha256(f"{self.seed}:{type_name}:{prompt}".encode("utf-8")).hexdigest()
+            seconds += random.Random(digest).uniform(0, self.jitter_seconds)
+        return seconds
+
+
+def install(corpus: PageCorpus, provider: ReplayModelProvider) -> None:
+    """Route article fetches to the recorded pages and agent calls to the replay provider."""
+    fetcher.set_http_transport(corpus.transport())
+    agent_runner.set_model_provider(provider)
+
+
+def uninstall() -> None:
+    fetcher.set_http_transport(None)
+    agent_runner.set_model_provider(None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record pages for the offline replay harness.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    recorder = subcommands.add_parser("record", help="Write tests/fixtures/replay pages and manifest.")
+    recorder.add_argument("--live", action="store_true", help="Fetch the real pages instead of rebuilding them.")
+    recorder.add_argument("--dir", type=Path, default=REPLAY_DIR)
+    args = parser.parse_args()
+
+    manifest = record_pages(args.dir, live=args.live)
+    print(f"recorded {len(manifest)} pages into {args.dir}")
+
+
+if __name__ == "__main__":
+    main()
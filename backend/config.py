@@ -1,2 +1,201 @@
+import os
+from pathlib import Path
+
 DEFAULT_MODEL = "gpt-4.1-mini"
-MAX_ARTICLE_CHARS = 16000
+# Hard cap on cleaned article text kept per page. What the agents actually
+# see is chosen by the context window below, not by slicing this.
+MAX_ARTICLE_CHARS = 200_000
+# Article text returned in a screening's details (API, SSE, result store,
+# bulk output) is cut to this many characters.
+DETAILS_ARTICLE_CHARS = 16000
+
+# Root for local on-disk caches and stores.
+CACHE_ROOT = Path(os.getenv("AML_CACHE_ROOT", Path(__file__).resolve().parent / ".cache"))
+
+# Specialist pipeline: "multi_agent" runs the six specialists as separate
+# calls; "combined" sends the article once to a single combined agent.
+# Requests may override this per call.
+PIPELINE_MODES = ("multi_agent", "combined")
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "multi_agent")
+
+# Per-agent wall-clock budget for a single Runner.run call, in seconds.
+AGENT_TIMEOUT_SECONDS = 60.0
+
+# Completed article-level stage results (metadata/people/context) kept in memory.
+ARTICLE_STAGE_CACHE_SIZE = 512
+
+# Article fetching: shared async connection pool used by scraping.fetcher.
+FETCH_TIMEOUT_SECONDS = 15.0
+FETCH_MAX_CONNECTIONS = 100
+FETCH_KEEPALIVE_EXPIRY_SECONDS = 30.0
+FETCH_USER_AGENT = os.getenv("FETCH_USER_AGENT", "aml-screening-bot/1.0")
+# Per-host politeness (scraping.politeness): downloads in flight overall and
+# per host, and the minimum gap between request starts to one host (raised
+# to the site's robots.txt Crawl-delay, up to FETCH_MAX_CRAWL_DELAY_SECONDS).
+FETCH_MAX_CONCURRENCY = 64
+FETCH_MAX_CONNECTIONS_PER_HOST = 4
+FETCH_HOST_MIN_INTERVAL_SECONDS = 0.25
+FETCH_MAX_CRAWL_DELAY_SECONDS = 10.0
+# A 429/503 or timeout backs the host off, doubling from the base up to the
+# max (or the Retry-After, if longer); throttled downloads are retried this
+# many times.
+FETCH_HOST_BACKOFF_BASE_SECONDS = 1.0
+FETCH_HOST_BACKOFF_MAX_SECONDS = 120.0
+FETCH_THROTTLE_RETRIES = 2
+FETCH_RESPECT_ROBOTS = os.getenv("FETCH_RESPECT_ROBOTS", "true").lower() == "true"
+FETCH_ROBOTS_TTL_SECONDS = 3600
+# robots.txt that could not be fetched (network error, 5xx) is treated as
+# allow-all and retried after this long.
+FETCH_ROBOTS_ERROR_TTL_SECONDS = 300
+# Response bodies are streamed and cut off at FETCH_MAX_BYTES, or earlier
+# once there is enough raw HTML for the requested text budget (max_chars
+# times FETCH_BYTES_PER_TEXT_CHAR, never below FETCH_MIN_BYTES).
+FETCH_MAX_BYTES = 8 * 1024 * 1024
+FETCH_BYTES_PER_TEXT_CHAR = 20
+FETCH_MIN_BYTES = 512 * 1024
+FETCH_CHUNK_BYTES = 64 * 1024
+# Media types accepted as articles; anything else is rejected before the body is read.
+FETCH_HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+# Leading bytes searched for a <meta charset> declaration.
+FETCH_CHARSET_PRESCAN_BYTES = 4096
+# Worker processes used to run HTML cleaning off the event loop.
+CLEAN_WORKERS = 4
+# HTML cleaning engine (scraping.cleaners): "lxml" (single pass) or "bs4".
+CLEANER_ENGINE = os.getenv("CLEANER_ENGINE", "lxml")
+
+# Article cache (scraping.cache): in-memory LRU in front of an on-disk tier.
+ARTICLE_CACHE_ENABLED = os.getenv("ARTICLE_CACHE_ENABLED", "true").lower() == "true"
+ARTICLE_CACHE_DIR = os.getenv("ARTICLE_CACHE_DIR", str(CACHE_ROOT / "articles"))
+ARTICLE_CACHE_MEMORY_MAX_BYTES = 64 * 1024 * 1024
+ARTICLE_CACHE_DISK_MAX_BYTES = 1024 * 1024 * 1024
+# Served without contacting the origin while younger than the TTL, then
+# revalidated with ETag / If-Modified-Since; dropped entirely after max age.
+ARTICLE_CACHE_TTL_SECONDS = 15 * 60
+ARTICLE_CACHE_MAX_AGE_SECONDS = 7 * 24 * 3600
+
+# Agent result cache (pipeline.agent_cache): memoized validated outputs in SQLite.
+AGENT_CACHE_ENABLED = os.getenv("AGENT_CACHE_ENABLED", "true").lower() == "true"
+AGENT_CACHE_PATH = os.getenv("AGENT_CACHE_PATH", str(CACHE_ROOT / "agent_results.sqlite3"))
+AGENT_CACHE_TTL_SECONDS = 30 * 24 * 3600
+AGENT_CACHE_MAX_ENTRIES = 100_000
+
+# Near-duplicate reuse (pipeline.near_duplicates): an article whose MinHash
+# signature is within the similarity threshold of one already screened for
+# the same subject reuses that screening's specialist results (metadata is
+# re-run, as it depends on the URL).
+NEAR_DUPLICATE_ENABLED = os.getenv("NEAR_DUPLICATE_ENABLED", "true").lower() == "true"
+NEAR_DUPLICATE_DB_PATH = os.getenv("NEAR_DUPLICATE_DB_PATH", str(CACHE_ROOT / "near_duplicates.sqlite3"))
+# Minimum estimated Jaccard similarity of the two articles' word shingles.
+NEAR_DUPLICATE_MIN_SIMILARITY = float(os.getenv("NEAR_DUPLICATE_MIN_SIMILARITY", "0.8"))
+NEAR_DUPLICATE_SHINGLE_WORDS = 3
+# Signature length, and LSH bands it is split into (rows = permutations / bands).
+# 16 bands of 4 rows surface pairs at 0.8 similarity with over 99.9% probability.
+NEAR_DUPLICATE_PERMUTATIONS = 64
+NEAR_DUPLICATE_BANDS = 16
+# Shorter texts are not fingerprinted: too few shingles to tell copies apart.
+NEAR_DUPLICATE_MIN_WORDS = 50
+
+# Batch screening (POST /api/run_screening/batch).
+BATCH_MAX_PAIRS = 100_000
+BATCH_MAX_CONCURRENCY = 16
+
+# Offline bulk screening (pipeline.bulk): screenings in flight at once, and
+# how often progress is printed.
+BULK_MAX_CONCURRENCY = int(os.getenv("BULK_MAX_CONCURRENCY", "8"))
+BULK_PROGRESS_INTERVAL_SECONDS = 10.0
+
+# Incremental monitoring (pipeline.monitoring): known subject x URL pairs
+# rescreened only when the article's cleaned text changed.
+MONITOR_DB_PATH = os.getenv("MONITOR_DB_PATH", str(CACHE_ROOT / "monitoring.sqlite3"))
+# Articles checked at once (each screens all of its subjects together).
+MONITOR_MAX_CONCURRENCY = 8
+
+# Screening result snapshots (utils.result_store): append-only SQLite store
+# seeded once from the legacy tests/results/*.json files.
+RESULTS_DB_PATH = os.getenv("RESULTS_DB_PATH", str(CACHE_ROOT / "results.sqlite3"))
+# GET /api/tests pagination over the stored snapshots.
+RESULTS_PAGE_SIZE = 50
+RESULTS_MAX_PAGE_SIZE = 500
+
+# Screening jobs (pipeline.jobs): durable SQLite queue drained by an
+# in-process worker pool behind POST /api/jobs.
+JOBS_ENABLED = os.getenv("JOBS_ENABLED", "true").lower() == "true"
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", str(CACHE_ROOT / "jobs.sqlite3"))
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# New jobs are refused with 429 + Retry-After beyond this many queued jobs.
+JOBS_MAX_QUEUE_DEPTH = 1000
+# Workers renew a running job's lease every third of this; a job whose lease
+# lapses (worker crashed / restarted) is picked up again, up to
+# JOB_MAX_ATTEMPTS claims in total.
+JOB_LEASE_SECONDS = 120
+JOB_MAX_ATTEMPTS = 3
+# Idle workers re-check the queue this often (jobs enqueued by other processes).
+JOB_POLL_INTERVAL_SECONDS = 1.0
+# Initial guess for a job's duration, used for Retry-After until measured.
+JOB_ESTIMATED_SECONDS = 30.0
+# Finished jobs are deleted after this long.
+JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+# Local name pre-filter (pipeline.name_prefilter): skip the agents when the
+# article has no plausible mention of the subject.
+NAME_PREFILTER_ENABLED = os.getenv("NAME_PREFILTER_ENABLED", "true").lower() == "true"
+# Minimum token similarity (trigram Jaccard, boosted by Soundex agreement).
+NAME_PREFILTER_SIMILARITY_THRESHOLD = 0.7
+NAME_PREFILTER_PHONETIC = True
+# Tokens either side of a family-name hit searched for the given name/initial.
+NAME_PREFILTER_GIVEN_NAME_WINDOW = 3
+
+# Local DOB/age extraction (pipeline.dob_age_extractor): fill the dob_age
+# result without the agent when the article's evidence is absent or unambiguous.
+DOB_AGE_LOCAL_ENABLED = os.getenv("DOB_AGE_LOCAL_ENABLED", "true").lower() == "true"
+# Age/birth-date phrases count for the subject within this many characters
+# after a mention of them; "the N-year-old" may refer back further.
+DOB_AGE_SUBJECT_WINDOW_CHARS = 200
+DOB_AGE_ANAPHORA_CHARS = 1000
+# The publication date is read from a dateline within the text's first characters.
+DOB_AGE_DATELINE_CHARS = 600
+
+# Local decision rules (pipeline.decision_rules): decide unambiguous cases
+# without the decision agent; the ambiguous band still goes to the LLM.
+DECISION_RULES_ENABLED = os.getenv("DECISION_RULES_ENABLED", "true").lower() == "true"
+# A "not the subject" name result at or above this confidence is discarded.
+DECISION_NO_MATCH_MIN_CONFIDENCE = 0.8
+# A potential name match at or above this confidence (with no DOB/age
+# conflict) counts as a clear match.
+DECISION_CLEAR_MATCH_MIN_CONFIDENCE = 0.8
+
+# LLM rate governor (pipeline.governor): every agent call is admitted
+# against request and prompt-token buckets sized to the provider account's
+# limits, with interactive screenings ahead of batch work.
+LLM_GOVERNOR_ENABLED = os.getenv("LLM_GOVERNOR_ENABLED", "true").lower() == "true"
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+# Buckets hold this many seconds' worth of refill; the refill rate is scaled
+# so a full burst plus a minute of refill still fits the per-minute limits.
+LLM_BUCKET_BURST_SECONDS = 5.0
+# Rate-limited (429) and overloaded responses are retried with full-jitter
+# exponential backoff, or after the provider's Retry-After when given.
+LLM_MAX_RETRIES = 4
+LLM_BACKOFF_BASE_SECONDS = 1.0
+LLM_BACKOFF_MAX_SECONDS = 30.0
+LLM_RETRY_STATUS_CODES = (429, 500, 502, 503, 504, 529)
+
+# Article context windowing (pipeline.windowing): agents get the lead plus
+# the passages that mention the subject, age/DOB or adverse terms, within a
+# token budget, instead of the first N characters of the page.
+ARTICLE_WINDOWING_ENABLED = os.getenv("ARTICLE_WINDOWING_ENABLED", "true").lower() == "true"
+ARTICLE_CONTEXT_TOKEN_BUDGET = 2000
+# Rough chars-per-token ratio used for budgeting and reporting.
+CHARS_PER_TOKEN = 4
+# Sentences are grouped into passages of about this many characters.
+ARTICLE_PASSAGE_CHARS = 400
+# Leading passages always kept (headline, standfirst, opening paragraph).
+ARTICLE_LEAD_PASSAGES = 2
+# With windowing disabled the agents get this plain prefix of the article.
+ARTICLE_PREFIX_CHARS = 16000
+
+# API serving (main.py): uvicorn worker processes. Workers share the on-disk
+# caches under CACHE_ROOT; each gets 1/API_WORKERS of the LLM rate limits
+# and in-flight cap, so together they stay within the provider account's.
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
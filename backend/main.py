@@ -1,25 +1,47 @@
+import asyncio
 import os
-from typing import Any, Dict, List, Optional
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Literal, Optional
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
 
-from logging_config import setup_logging
+from config import API_WORKERS, BATCH_MAX_CONCURRENCY, BATCH_MAX_PAIRS, RESULTS_MAX_PAGE_SIZE, RESULTS_PAGE_SIZE
+from pipeline.agent_cache import get_agent_cache
+from pipeline.article_stage import get_article_stage_cache
+from pipeline.batch import run_batch_screening
+from pipeline.governor import get_governor
+from pipeline.jobs import QueueFullError, get_job_pool
 from pipeline.orchestrator import run_screening
-from utils.test_results import load_all_test_results
+from pipeline.streaming import format_sse, stream_screening
+from resources import close_resources, open_resources
+from scraping.cache import get_article_cache
+from utils.metrics import REGISTRY
+from utils.result_store import get_result_store
 
 load_dotenv()
-setup_logging()
 
 APP_NAME = "Adverse Media Agent Service"
 API_PREFIX = "/api"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await open_resources()
+    try:
+        yield
+    finally:
+        await close_resources()
+
+
 app = FastAPI(
     title=APP_NAME,
     description="Multi-agent AML adverse media screening API.",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 allowed_origins = os.environ.get("API_CORS_ORIGINS", "*")
@@ -37,10 +59,28 @@ app.add_middleware(
 )
 
 
+PipelineMode = Literal["multi_agent", "combined"]
+
+
 class ScreeningPayload(BaseModel):
     name: str
     url: str
     dob: Optional[str] = None
+    mode: Optional[PipelineMode] = None
+    include_timings: bool = False
+
+
+class BatchSubject(BaseModel):
+    name: str
+    dob: Optional[str] = None
+
+
+class BatchScreeningPayload(BaseModel):
+    subjects: List[BatchSubject] = Field(..., min_length=1)
+    urls: List[str] = Field(..., min_length=1)
+    max_concurrency: int = Field(BATCH_MAX_CONCURRENCY, ge=1, le=256)
+    include_article_text: bool = False
+    mode: Optional[PipelineMode] = None
 
 
 @app.get(f"{API_PREFIX}/health")
@@ -51,15 +91,172 @@ async def healthcheck() -> Dict[str, str]:
 @app.post(f"{API_PREFIX}/run_screening")
 async def run_screening_endpoint(payload: ScreeningPayload) -> Dict[str, Any]:
     try:
-        result = await run_screening(payload.name, payload.dob, payload.url)
+        result = await run_screening(
+            payload.name, payload.dob, payload.url, payload.mode, include_timings=payload.include_timings
+        )
     except Exception as exc:  # pragma: no cover - FastAPI handles propagation
         raise HTTPException(status_code=500, detail=f"Screening failed: {exc}") from exc
     return result
 
 
+@app.post(f"{API_PREFIX}/run_screening/stream")
+async def run_screening_stream_endpoint(payload: ScreeningPayload) -> StreamingResponse:
+    """Server-Sent Events: article, each specialist result as it lands, then the result."""
+
+    async def events():
+        async for event, data in stream_screening(payload.name, payload.dob, payload.url, payload.mode):
+            yield format_sse(event, data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post(f"{API_PREFIX}/run_screening/batch")
+async def run_batch_screening_endpoint(payload: BatchScreeningPayload) -> Dict[str, Any]:
+    pairs = len(payload.subjects) * len(payload.urls)
+    if pairs > BATCH_MAX_PAIRS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {pairs} pairs exceeds the limit of {BATCH_MAX_PAIRS}.",
+        )
+    return await run_batch_screening(
+        [(subject.name, subject.dob) for subject in payload.subjects],
+        payload.urls,
+        max_concurrency=payload.max_concurrency,
+        include_article_text=payload.include_article_text,
+        mode=payload.mode,
+    )
+
+
+def _require_job_pool():
+    job_pool = get_job_pool()
+    if job_pool is None:
+        raise HTTPException(status_code=503, detail="Screening jobs are disabled.")
+    return job_pool
+
+
+@app.post(f"{API_PREFIX}/jobs", status_code=202)
+async def create_job_endpoint(payload: ScreeningPayload) -> JSONResponse:
+    job_pool = _require_job_pool()
+    try:
+        job = await asyncio.to_thread(job_pool.store.enqueue, payload.model_dump())
+    except QueueFullError as exc:
+        raise HTTPException(
+            status_code=429,
+            detail=str(exc),
+            headers={"Retry-After": str(job_pool.retry_after(exc.depth))},
+        ) from exc
+    job_pool.notify()
+    status_url = f"{API_PREFIX}/jobs/{job['id']}"
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job["id"], "status": job["status"], "status_url": status_url},
+        headers={"Location": status_url},
+    )
+
+
+@app.get(f"{API_PREFIX}/jobs")
+async def job_stats_endpoint() -> Dict[str, Any]:
+    job_pool = _require_job_pool()
+    counts = await asyncio.to_thread(job_pool.store.stats)
+    return {
+        **counts,
+        "workers": job_pool.workers,
+        "max_queue_depth": job_pool.store.max_depth,
+        "avg_job_seconds": round(job_pool.avg_seconds, 2),
+    }
+
+
+@app.get(f"{API_PREFIX}/jobs/{{job_id}}")
+async def get_job_endpoint(job_id: str) -> Dict[str, Any]:
+    job_pool = _require_job_pool()
+    job = await asyncio.to_thread(job_pool.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+
+@app.get(f"{API_PREFIX}/cache/stats")
+async def cache_stats() -> Dict[str, Any]:
+    article_cache = get_article_cache()
+    agent_cache = get_agent_cache()
+    return {
+        "article_cache": article_cache.stats() if article_cache else None,
+        "agent_cache": agent_cache.stats() if agent_cache else None,
+        "article_stage": get_article_stage_cache().stats(),
+    }
+
+
+def _service_samples():
+    """Cache, job queue and rate governor counters for /api/metrics, read at scrape time."""
+    caches = {
+        "article": get_article_cache(),
+        "agent": get_agent_cache(),
+        "article_stage": get_article_stage_cache(),
+    }
+    cache_samples = [
+        ({"cache": name, "stat": stat}, value)
+        for name, cache in caches.items()
+        if cache is not None
+        for stat, value in cache.stats().items()
+        if isinstance(value, (int, float))
+    ]
+    job_pool = get_job_pool()
+    job_samples = [({"status": status}, count) for status, count in job_pool.store.stats().items()] if job_pool else []
+    governor = get_governor()
+    governor_samples = [({"stat": stat}, value) for stat, value in governor.stats().items()] if governor else []
+    return [
+        ("aml_cache_stat", "gauge", "Cache counters and sizes, as reported by /api/cache/stats.", cache_samples),
+        ("aml_jobs", "gauge", "Screening jobs by status.", job_samples),
+        ("aml_llm_governor", "gauge", "LLM rate governor state (bucket levels, in flight, waiting).", governor_samples),
+    ]
+
+
+REGISTRY.add_collector(_service_samples)
+
+
+@app.get(f"{API_PREFIX}/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint() -> PlainTextResponse:
+    """Prometheus text exposition of stage latencies, agent calls/tokens and cache counters."""
+    body = await asyncio.to_thread(REGISTRY.render)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get(f"{API_PREFIX}/tests")
-async def list_test_results() -> Dict[str, List[Dict[str, Any]]]:
-    return {"results": load_all_test_results()}
+async def list_test_results(
+    decision: Optional[str] = None,
+    overall_risk_label: Optional[str] = None,
+    subject: Optional[str] = Query(None, description="Subject slug, e.g. joseph_mason"),
+    since: Optional[float] = Query(None, description="Only results stored at or after this Unix time"),
+    is_subject_match: Optional[bool] = None,
+    search: Optional[str] = Query(None, description="Case-insensitive text in the title or subject names"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(RESULTS_PAGE_SIZE, ge=1, le=RESULTS_MAX_PAGE_SIZE),
+    include_article_text: bool = False,
+) -> Dict[str, Any]:
+    return await asyncio.to_thread(
+        get_result_store().query,
+        decision=decision,
+        overall_risk_label=overall_risk_label,
+        subject=subject,
+        since=since,
+        is_subject_match=is_subject_match,
+        search=search,
+        offset=offset,
+        limit=limit,
+        include_article_text=include_article_text,
+    )
+
+
+@app.get(f"{API_PREFIX}/tests/{{subject_slug}}/{{record_index}}")
+async def get_test_result(subject_slug: str, record_index: int) -> Dict[str, Any]:
+    record = await asyncio.to_thread(get_result_store().get, subject_slug, record_index)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown test result {subject_slug}/{record_index}")
+    return record
 
 
 if __name__ == "__main__":
@@ -67,4 +264,5 @@ if __name__ == "__main__":
 
     port = int(os.environ.get("PORT", "8000"))
     reload = os.environ.get("API_RELOAD", "false").lower() == "true"
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=reload)
+    # Reload mode is single-process; uvicorn ignores workers there.
+    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=reload, workers=1 if reload else API_WORKERS)
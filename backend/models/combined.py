@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+
+from models.article_metadata import ArticleMetadataResult
+from models.context import ContextExtractionResult
+from models.dob_age import DobAgeMatchResult
+from models.name_match import NameMatchResult
+from models.person import PersonExtractionResult
+from models.sentiment import SentimentResult
+
+
+class CombinedExtractionResult(BaseModel):
+    """
+    All six specialist results from one call. Field names match the keys of
+    the response "details" block.
+    """
+
+    metadata: ArticleMetadataResult
+    people: PersonExtractionResult
+    context: ContextExtractionResult
+    name_match: NameMatchResult
+    dob_age: DobAgeMatchResult
+    sentiment: SentimentResult
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+
+from pydantic import BaseModel
+
+from config import (
+    AGENT_CACHE_ENABLED,
+    AGENT_CACHE_MAX_ENTRIES,
+    AGENT_CACHE_PATH,
+    AGENT_CACHE_TTL_SECONDS,
+    DEFAULT_MODEL,
+)
+
+logger = logging.getLogger("aml.agent_cache")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agent_results (
+    cache_key TEXT PRIMARY KEY,
+    agent_name TEXT NOT NULL,
+    agent_fingerprint TEXT NOT NULL,
+    model TEXT NOT NULL,
+    output_json TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_agent_results_agent ON agent_results (agent_name, agent_fingerprint);
+CREATE INDEX IF NOT EXISTS idx_agent_results_last_used ON agent_results (last_used_at);
+"""
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def agent_model(agent) -> str:
+    return agent.model if isinstance(agent.model, str) else DEFAULT_MODEL
+
+
+@lru_cache(maxsize=None)
+def _definition_hash(instructions: Any, output_type: Any) -> str:
+    schema = output_type.model_json_schema() if output_type else None
+    return _sha256(json.dumps([instructions, schema], sort_keys=True, default=str))
+
+
+def agent_fingerprint(agent) -> str:
+    """Hash of everything about an agent definition that shapes its output."""
+    return _definition_hash(agent.instructions, agent.output_type)
+
+
+def cache_key(agent, prompt: str) -> str:
+    return _sha256(
+        json.dumps([agent.name, agent_model(agent), agent_fingerprint(agent), _sha256(prompt)])
+    )
+
+
+class AgentResultCache:
+    """
+    SQLite-backed memo of validated agent outputs.
+
+    Keys combine agent name, model, a fingerprint of the agent's instructions
+    and output schema, and the prompt hash, so editing one agent only misses
+    (and purges) that agent's rows. Rows expire after ttl_seconds and the
+    table is trimmed least-recently-used first beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_seconds: float = AGENT_CACHE_TTL_SECONDS,
+        max_entries: int = AGENT_CACHE_MAX_ENTRIES,
+    ):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._purged_agents: Set[str] = set()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "evictions": 0, "purged": 0}
+
+    def get(self, agent, prompt: str) -> Optional[BaseModel]:
+        if agent.output_type is None:
+            return None
+        self._purge_stale_definitions(agent)
+        key = cache_key(agent, prompt)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT output_json, created_at FROM agent_results WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            output_json, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM agent_results WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._conn.execute(
+                "UPDATE agent_results SET last_used_at = ? WHERE cache_key = ?", (now, key)
+            )
+            self._conn.commit()
+
+        try:
+            output = agent.output_type.model_validate_json(output_json)
+        except ValueError:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+        with self._lock:
+            self._counters["hits"] += 1
+        return output
+
+    def put(self, agent, prompt: str, output: Any) -> None:
+        if not isinstance(output, BaseModel):
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO agent_results "
+                "(cache_key, agent_name, agent_fingerprint, model, output_json, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    cache_key(agent, prompt),
+                    agent.name,
+                    agent_fingerprint(agent),
+                    agent_model(agent),
+                    output.model_dump_json(),
+                    now,
+                    now,
+                ),
+            )
+            self._counters["writes"] += 1
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM agent_results").fetchone()
+            if count > self.max_entries:
+                evict = count - int(self.max_entries * 0.9)
+                self._conn.execute(
+                    "DELETE FROM agent_results WHERE cache_key IN ("
+                    "SELECT cache_key FROM agent_results ORDER BY last_used_at LIMIT ?)",
+                    (evict,),
+                )
+                self._counters["evictions"] += evict
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM agent_results").fetchone()
+            return {**self._counters, "entries": entries}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _purge_stale_definitions(self, agent) -> None:
+        """Drop rows written by earlier versions of this agent (once per process)."""
+        if agent.name in self._purged_agents:
+            return
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM agent_results WHERE agent_name = ? AND agent_fingerprint != ?",
+                (agent.name, agent_fingerprint(agent)),
+            )
+            self._conn.commit()
+            self._purged_agents.add(agent.name)
+            if cursor.rowcount:
+                self._counters["purged"] += cursor.rowcount
+                logger.info(f"Purged {cursor.rowcount} cached results for edited agent {agent.name}")
+
+
+_agent_cache: Optional[AgentResultCache] = None
+
+
+def get_agent_cache() -> Optional[AgentResultCache]:
+    """Process-wide agent result cache, or None when disabled in config."""
+    global _agent_cache
+    if not AGENT_CACHE_ENABLED:
+        return None
+    if _agent_cache is None:
+        _agent_cache = AgentResultCache(Path(AGENT_CACHE_PATH))
+    return _agent_cache
+
+
+def close_agent_cache() -> None:
+    global _agent_cache
+    if _agent_cache is not None:
+        _agent_cache.close()
+        _agent_cache = None
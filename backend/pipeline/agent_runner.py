@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, List, Optional
+
+import httpx
+from agents import ModelProvider, RunConfig, Runner, set_default_openai_client
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from config import AGENT_TIMEOUT_SECONDS, LLM_GOVERNOR_ENABLED, LLM_MAX_CONCURRENCY
+from pipeline.agent_cache import agent_model, get_agent_cache
+from pipeline.governor import get_governor
+from pipeline.windowing import estimate_tokens
+from utils.metrics import IN_FLIGHT, record_agent_call
+
+logger = logging.getLogger("aml.agent_runner")
+
+_run_config: Optional[RunConfig] = None
+_model_client: Optional[AsyncOpenAI] = None
+
+
+def set_model_provider(provider: Optional[ModelProvider]) -> None:
+    """
+    Resolve agent models through a custom provider (e.g. the offline replay
+    harness's fake model); None restores the default OpenAI provider.
+    """
+    global _run_config
+    _run_config = None if provider is None else RunConfig(model_provider=provider, tracing_disabled=True)
+
+
+def substitute_provider_active() -> bool:
+    """True while agent models resolve through a provider set with set_model_provider."""
+    return _run_config is not None
+
+
+def open_model_client() -> Optional[AsyncOpenAI]:
+    """
+    One pooled OpenAI client for every agent call, registered as the SDK
+    default; without it each run builds a client (and connection pool) of
+    its own. Skipped without OPENAI_API_KEY, where calls fail as before.
+
+    With the rate governor on, the client does not retry by itself: a 429 or
+    5xx goes straight back to the governor, which charges the retry to its
+    buckets, pauses admissions and requeues it at the call's priority.
+    """
+    global _model_client
+    if _model_client is None and os.getenv("OPENAI_API_KEY"):
+        # The governor caps calls in flight, so that many connections are ever needed.
+        limits = httpx.Limits(max_connections=LLM_MAX_CONCURRENCY, max_keepalive_connections=LLM_MAX_CONCURRENCY)
+        retries = {"max_retries": 0} if LLM_GOVERNOR_ENABLED else {}
+        _model_client = AsyncOpenAI(http_client=DefaultAsyncHttpxClient(limits=limits), **retries)
+        set_default_openai_client(_model_client, use_for_tracing=False)
+        logger.info(f"Opened model client pool ({LLM_MAX_CONCURRENCY} connections)")
+    return _model_client
+
+
+async def close_model_client() -> None:
+    global _model_client
+    if _model_client is not None:
+        set_default_openai_client(None, use_for_tracing=False)
+        await _model_client.close()
+        _model_client = None
+        logger.info("Closed model client pool")
+
+
+def estimate_prompt_tokens(agent, prompt: str) -> int:
+    """Prompt tokens a call will be charged for: instructions plus the built prompt."""
+    instructions = agent.instructions if isinstance(agent.instructions, str) else ""
+    return estimate_tokens(instructions) + estimate_tokens(prompt)
+
+
+def _input_tokens(result) -> Optional[int]:
+    usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    return getattr(usage, "input_tokens", None) or None
+
+
+async def run_agent(agent, prompt: str, timeout: float = AGENT_TIMEOUT_SECONDS) -> Any:
+    """
+    Single entry point for agent calls: serve from the result cache when
+    possible, otherwise Runner.run under a timeout and remember the output.
+    Model calls are admitted by the rate governor; the timeout applies to
+    each attempt, not to time spent queued. Recorded latency is the time
+    spent in model calls (all attempts), without admission queueing or
+    retry back-off, which the governor reports itself.
+    """
+    # Outputs from a substitute provider must never land in the shared cache.
+    cache = get_agent_cache() if _run_config is None else None
+    model = agent_model(agent)
+    if cache is not None:
+        cached = await asyncio.to_thread(cache.get, agent, prompt)
+        if cached is not None:
+            logger.info("%s served from result cache", agent.name)
+            record_agent_call(agent.name, model, "cached")
+            return cached
+
+    logger.info("Running %s…", agent.name)
+    attempts: List[float] = []
+    try:
+        with IN_FLIGHT.track(stage="agent"):
+            result = await _governed_run(agent, prompt, timeout, attempts)
+    except asyncio.TimeoutError:
+        record_agent_call(agent.name, model, "timeout", sum(attempts))
+        raise
+    except Exception:
+        record_agent_call(agent.name, model, "error", sum(attempts))
+        raise
+    usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    record_agent_call(
+        agent.name,
+        model,
+        "ok",
+        sum(attempts),
+        input_tokens=getattr(usage, "input_tokens", 0),
+        output_tokens=getattr(usage, "output_tokens", 0),
+    )
+    logger.info("%s completed", agent.name)
+    output = result.final_output
+
+    if cache is not None:
+        await asyncio.to_thread(cache.put, agent, prompt, output)
+    return output
+
+
+async def _governed_run(agent, prompt: str, timeout: float, attempts: List[float]):
+    """Runner.run through the governor; the duration of each model attempt is appended to attempts."""
+
+    async def attempt():
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(Runner.run(agent, prompt, run_config=_run_config), timeout=timeout)
+        finally:
+            attempts.append(time.perf_counter() - started)
+
+    governor = get_governor()
+    if governor is None:
+        return await attempt()
+    return await governor.call(attempt, estimate_prompt_tokens(agent, prompt), used_tokens=_input_tokens)
\ No newline at end of file
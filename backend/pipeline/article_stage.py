@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config import ARTICLE_STAGE_CACHE_SIZE
+from utils.metrics import add_timings, collect_timings
+
+logger = logging.getLogger("aml.article_stage")
+
+# (outputs keyed by details field, degradation reasons by field)
+StageResult = Tuple[Dict[str, Any], Dict[str, str]]
+
+
+def article_key(url: str, article_text: str) -> str:
+    return hashlib.sha256(f"{url}\n{article_text}".encode("utf-8")).hexdigest()
+
+
+class ArticleStageCache:
+    """
+    Shares subject-independent agent work between screenings of one article.
+
+    Concurrent callers for the same article await a single in-flight task;
+    that task is cancelled only once every caller has gone away. Complete
+    (non-degraded) results are kept in a small LRU for later screenings.
+
+    The task collects its own stage and agent timings, and every caller
+    that waited on it gets them added to its screening's timings; callers
+    served from the LRU add none, since nothing ran for them.
+    """
+
+    def __init__(self, max_entries: int = ARTICLE_STAGE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._done: "OrderedDict[str, StageResult]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.hits = 0
+        self.shared = 0
+        self.runs = 0
+
+    async def get_or_run(self, key: str, factory: Callable[[], Awaitable[StageResult]]) -> StageResult:
+        if key in self._done:
+            self._done.move_to_end(key)
+            self.hits += 1
+            return self._done[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.runs += 1
+            task = asyncio.create_task(self._timed(factory))
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t, key=key: self._finished(key, t))
+        else:
+            self.shared += 1
+
+        self._waiters[key] += 1
+        try:
+            result, timings = await asyncio.shield(task)
+            add_timings(timings)
+            return result
+        finally:
+            if not task.done():
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0:
+                    logger.info("Cancelling article stage with no remaining waiters")
+                    task.cancel()
+
+    @staticmethod
+    async def _timed(factory: Callable[[], Awaitable[StageResult]]) -> Tuple[StageResult, Dict[str, Dict[str, float]]]:
+        # A fresh collector, so the timings do not land only in the screening that started the task.
+        with collect_timings() as timings:
+            result = await factory()
+        return result, timings
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        self._waiters.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        (outputs, degraded), _ = task.result()
+        if degraded:
+            return  # let the next screening retry the agents that failed
+        self._done[key] = (outputs, degraded)
+        while len(self._done) > self.max_entries:
+            self._done.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "shared_inflight": self.shared, "runs": self.runs, "entries": len(self._done)}
+
+
+_article_stage_cache: Optional[ArticleStageCache] = None
+
+
+def get_article_stage_cache() -> ArticleStageCache:
+    global _article_stage_cache
+    if _article_stage_cache is None:
+        _article_stage_cache = ArticleStageCache()
+    return _article_stage_cache
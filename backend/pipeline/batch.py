@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from config import BATCH_MAX_CONCURRENCY
+from models.inputs import ScreeningInput
+from pipeline.governor import llm_priority
+from pipeline.orchestrator import screen_article
+from scraping.fetcher import fetch_article_text_async
+
+logger = logging.getLogger("aml.batch")
+
+Subject = Tuple[str, Optional[str]]
+
+
+def pair_key(subject_index: int, url_index: int) -> str:
+    return f"{subject_index}:{url_index}"
+
+
+async def fetch_articles(urls: Sequence[str]) -> Dict[str, Union[str, BaseException]]:
+    """
+    Fetch and clean each distinct URL once; failures are returned, not raised.
+    Concurrency and per-host pacing are left to the fetcher's politeness
+    scheduler, which interleaves hosts fairly.
+    """
+
+    async def fetch(url: str) -> Union[str, BaseException]:
+        try:
+            return await fetch_article_text_async(url)
+        except Exception as exc:
+            logger.warning(f"Batch fetch failed for {url}: {exc}")
+            return exc
+
+    unique_urls = list(dict.fromkeys(urls))
+    texts = await asyncio.gather(*(fetch(url) for url in unique_urls))
+    return dict(zip(unique_urls, texts))
+
+
+async def run_batch_screening(
+    subjects: Sequence[Subject],
+    urls: Sequence[str],
+    max_concurrency: int = BATCH_MAX_CONCURRENCY,
+    include_article_text: bool = False,
+    mode: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Screen every subject against every URL.
+
+    Articles are fetched once each, then subject x article pairs run with at
+    most max_concurrency screenings in flight. A failing pair (or article)
+    is reported under its own key and never affects the other pairs.
+    """
+    logger.info(f"Starting batch screening: {len(subjects)} subjects x {len(urls)} urls")
+    articles = await fetch_articles(urls)
+
+    async def screen_pair(subject_index: int, subject: Subject, url_index: int, url: str):
+        name, dob = subject
+        entry: Dict[str, Any] = {
+            "subject_index": subject_index,
+            "url_index": url_index,
+            "name": name,
+            "dob": dob,
+            "url": url,
+        }
+        article = articles[url]
+        if isinstance(article, BaseException):
+            return {**entry, "status": "error", "error": f"Article fetch failed: {article}"}
+
+        try:
+            with llm_priority("batch"):
+                result = await screen_article(ScreeningInput(name, dob, url, article), mode)
+        except Exception as exc:
+            logger.warning(f"Batch pair {pair_key(subject_index, url_index)} failed: {exc}")
+            return {**entry, "status": "error", "error": f"Screening failed: {exc}"}
+
+        if not include_article_text:
+            result["details"].pop("article_text", None)
+        return {**entry, "status": "ok", "result": result}
+
+    # A fixed pool of workers drains one shared iterator, so only
+    # max_concurrency pairs are ever materialised as coroutines.
+    pairs = (
+        (subject_index, subject, url_index, url)
+        for subject_index, subject in enumerate(subjects)
+        for url_index, url in enumerate(urls)
+    )
+    entries: List[Dict[str, Any]] = []
+
+    async def worker() -> None:
+        for pair in pairs:
+            entries.append(await screen_pair(*pair))
+
+    total = len(subjects) * len(urls)
+    await asyncio.gather(*(worker() for _ in range(max(1, min(max_concurrency, total)))))
+    entries.sort(key=lambda e: (e["subject_index"], e["url_index"]))
+
+    failed = sum(1 for entry in entries if entry["status"] == "error")
+    summary = {
+        "pairs": len(entries),
+        "succeeded": len(entries) - failed,
+        "failed": failed,
+        "articles": len(articles),
+        "articles_failed": sum(1 for text in articles.values() if isinstance(text, BaseException)),
+    }
+    logger.info(f"Batch screening finished: {summary}")
+    return {
+        "results": {pair_key(e["subject_index"], e["url_index"]): e for e in entries},
+        "summary": summary,
+    }
@@ -0,0 +1,322 @@
+"""
+Offline bulk screening: subject x article rows from a file, results
+streamed to JSON lines, resumable after a crash.
+
+Input is a JSON array in the screening dataset format (subject_names,
+dob_value, article_link) or {"name", "dob", "url" | "urls"} objects, the
+same objects one per line (.jsonl), or a CSV with name, dob and url
+columns (dataset column names work too).
+
+Each distinct URL is fetched once through the politeness scheduler and
+article cache, HTML cleaning runs in the fetcher's process pool, and at
+most --concurrency screenings are in flight, at "batch" priority in the
+LLM rate governor. Every result is appended to the output file and
+flushed as it completes; the output doubles as the checkpoint: rerunning
+the same command skips rows already written with status "ok" (rows that
+failed, or were screened "degraded" because an agent timed out or errored,
+are retried, their new line superseding the old one) and drops a last
+line cut short by the crash. Progress and throughput go to stderr.
+
+    cd backend
+    python -m pipeline.bulk tests/test_dataset.json out.jsonl [--concurrency 8] [--mode combined]
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+from config import BULK_MAX_CONCURRENCY, BULK_PROGRESS_INTERVAL_SECONDS
+from logging_config import setup_logging
+from models.inputs import ScreeningInput
+from pipeline.agent_runner import close_model_client, open_model_client
+from pipeline.governor import llm_priority
+from pipeline.near_duplicates import subject_key
+from pipeline.orchestrator import screen_article
+from scraping.cache import normalize_url
+from scraping.fetcher import close_http_client, fetch_article_text_async, warm_clean_executor
+
+logger = logging.getLogger("aml.bulk")
+
+Pair = Tuple[str, Optional[str], str]
+
+# CSV headers accepted for each field, first match wins.
+CSV_COLUMNS = {
+    "name": ("name", "subject_name", "subject_names"),
+    "dob": ("dob", "dob_value", "date_of_birth"),
+    "url": ("url", "article_link"),
+}
+
+
+def entry_pairs(entry: Dict[str, Any]) -> List[Pair]:
+    """(name, dob, url) pairs from one {"name", "dob"?, "url" | "urls"} or dataset-format object."""
+    name = entry.get("name") or (entry.get("subject_names") or [None])[0]
+    dob = entry.get("dob", entry.get("dob_value"))
+    urls = entry.get("urls") or [entry.get("url") or entry.get("article_link")]
+    if not name or not all(urls):
+        raise ValueError(f"Pair entry needs a name and a url: {entry}")
+    return [(name, dob or None, url) for url in urls]
+
+
+def _csv_entries(f: TextIO) -> Iterator[Dict[str, Any]]:
+    for row in csv.DictReader(f):
+        row = {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+        yield {
+            field: next((row[column] for column in columns if row.get(column)), None)
+            for field, columns in CSV_COLUMNS.items()
+        }
+
+
+def load_pairs(path: Path) -> List[Pair]:
+    """Pairs from a .json array, .jsonl lines or .csv rows, in file order."""
+    path = Path(path)
+    with path.open("r", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            entries = list(_csv_entries(f))
+        elif path.suffix.lower() == ".jsonl":
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = json.load(f)
+    return [pair for entry in entries for pair in entry_pairs(entry)]
+
+
+def row_key(name: str, dob: Optional[str], url: str) -> str:
+    """Identity of a row across runs: input order may change, the pair does not."""
+    return f"{subject_key(name, dob)}|{normalize_url(url)}"
+
+
+def read_checkpoint(path: Path) -> Set[str]:
+    """
+    Keys of rows already screened successfully in an earlier run of this
+    output file. A trailing partial line (the process died mid-write) is
+    truncated so appends start on a fresh line; any other unreadable line
+    is logged and skipped, so its row is screened again.
+    """
+    if not path.exists():
+        return set()
+    with path.open("rb+") as f:
+        data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            logger.warning(f"Dropping a partial last line ({len(data) - complete} bytes) from {path}")
+            f.truncate(complete)
+    latest: Dict[str, str] = {}
+    for number, line in enumerate(data[:complete].splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            latest[record["key"]] = record["status"]
+        except (ValueError, TypeError, KeyError) as exc:
+            logger.warning(f"Skipping unreadable line {number} of {path}: {type(exc).__name__}: {exc}")
+    return {key for key, status in latest.items() if status == "ok"}
+
+
+class Progress:
+    """Counters behind the periodic progress line."""
+
+    def __init__(self, total: int, skipped: int):
+        self.total = total
+        self.skipped = skipped
+        self.ok = 0
+        self.errors = 0
+        self.degraded = 0
+        self.in_flight = 0
+        self.started = time.monotonic()
+
+    @property
+    def done(self) -> int:
+        return self.ok + self.errors + self.degraded
+
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def line(self) -> str:
+        remaining = self.total - self.skipped - self.done
+        rate = self.rate()
+        eta = f"{remaining / rate:.0f}s" if rate > 0 else "-"
+        return (
+            f"[bulk] {self.skipped + self.done}/{self.total} rows ({self.skipped} from checkpoint) "
+            f"ok={self.ok} degraded={self.degraded} error={self.errors} in_flight={self.in_flight} "
+            f"| {rate:.2f} rows/s | eta {eta}"
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "rows": self.total,
+            "skipped": self.skipped,
+            "ok": self.ok,
+            "errors": self.errors,
+            "degraded": self.degraded,
+            "seconds": round(time.monotonic() - self.started, 1),
+            "rows_per_second": round(self.rate(), 3),
+        }
+
+
+class BulkRun:
+    """Screens pending rows and appends one JSON line per finished row to out."""
+
+    def __init__(
+        self,
+        out: TextIO,
+        mode: Optional[str] = None,
+        max_concurrency: int = BULK_MAX_CONCURRENCY,
+        include_article_text: bool = False,
+    ):
+        self.out = out
+        self.mode = mode
+        self.max_concurrency = max_concurrency
+        self.include_article_text = include_article_text
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        # One complete line per write, flushed and synced: a crash loses at most the row being written.
+        self.out.write(json.dumps(record, default=str) + "\n")
+        self.out.flush()
+        os.fsync(self.out.fileno())
+
+    async def run(self, pairs: List[Pair], done: Set[str], progress: Progress) -> None:
+        by_url: Dict[str, List[Tuple[int, Pair]]] = defaultdict(list)
+        for row, pair in enumerate(pairs):
+            if row_key(*pair) not in done:
+                by_url[pair[2]].append((row, pair))
+        urls = iter(by_url.items())
+
+        # Each worker holds one article at a time, so at most max_concurrency texts are in memory.
+        async def worker() -> None:
+            for url, rows in urls:
+                await self.screen_article_rows(url, rows, progress)
+
+        with llm_priority("batch"):
+            await asyncio.gather(*(worker() for _ in range(max(1, min(self.max_concurrency, len(by_url))))))
+
+    async def screen_article_rows(self, url: str, rows: List[Tuple[int, Pair]], progress: Progress) -> None:
+        try:
+            text = await fetch_article_text_async(url)
+        except Exception as exc:
+            logger.warning(f"Bulk fetch failed for {url}: {exc}")
+            for row, pair in rows:
+                self.finish(row, pair, progress, error=f"Article fetch failed: {exc}")
+            return
+        await asyncio.gather(*(self.screen_row(row, pair, text, progress) for row, pair in rows))
+
+    async def screen_row(self, row: int, pair: Pair, text: str, progress: Progress) -> None:
+        name, dob, url = pair
+        async with self._slots:
+            progress.in_flight += 1
+            started = time.monotonic()
+            try:
+                result = await screen_article(ScreeningInput(name, dob, url, text), self.mode)
+            except Exception as exc:
+                logger.warning(f"Bulk screening failed for {name} @ {url}: {exc}")
+                self.finish(row, pair, progress, error=f"Screening failed: {exc}", started=started)
+                return
+            finally:
+                progress.in_flight -= 1
+        if not self.include_article_text:
+            result["details"].pop("article_text", None)
+        self.finish(row, pair, progress, result=result, started=started)
+
+    def finish(
+        self,
+        row: int,
+        pair: Pair,
+        progress: Progress,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+        started: Optional[float] = None,
+    ) -> None:
+        name, dob, url = pair
+        if error:
+            status = "error"
+        elif result["details"].get("degraded"):
+            # Placeholders stood in for failed agents; a rerun screens the row again.
+            status = "degraded"
+        else:
+            status = "ok"
+        record = {
+            "key": row_key(name, dob, url),
+            "row": row,
+            "name": name,
+            "dob": dob,
+            "url": url,
+            "status": status,
+            **({"error": error} if error else {"result": result}),
+            "seconds": round(time.monotonic() - started, 3) if started is not None else None,
+        }
+        self.write(record)
+        if status == "error":
+            progress.errors += 1
+        elif status == "degraded":
+            progress.degraded += 1
+        else:
+            progress.ok += 1
+
+
+async def run_bulk(
+    input_path: Path,
+    output_path: Path,
+    mode: Optional[str] = None,
+    max_concurrency: int = BULK_MAX_CONCURRENCY,
+    include_article_text: bool = False,
+    progress_interval: float = BULK_PROGRESS_INTERVAL_SECONDS,
+) -> Dict[str, Any]:
+    """Screen every row of input_path not already in output_path; returns the run summary."""
+    pairs = list({row_key(*pair): pair for pair in load_pairs(input_path)}.values())
+    done = await asyncio.to_thread(read_checkpoint, output_path)
+    progress = Progress(len(pairs), skipped=sum(1 for pair in pairs if row_key(*pair) in done))
+    logger.info(f"Bulk screening {len(pairs) - progress.skipped} of {len(pairs)} rows from {input_path}")
+
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(progress_interval)
+            print(progress.line(), file=sys.stderr, flush=True)
+
+    open_model_client()
+    await warm_clean_executor()
+    reporter = asyncio.create_task(report())
+    try:
+        with output_path.open("a", encoding="utf-8") as out:
+            await BulkRun(out, mode, max_concurrency, include_article_text).run(pairs, done, progress)
+    finally:
+        reporter.cancel()
+        await asyncio.gather(reporter, return_exceptions=True)
+        await close_http_client()
+        await close_model_client()
+    print(progress.line(), file=sys.stderr, flush=True)
+    return progress.summary()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resumable bulk screening of subject x article rows.")
+    parser.add_argument("input", type=Path, help=".json (dataset format), .jsonl or .csv")
+    parser.add_argument("output", type=Path, help="JSON lines, appended to; rerun to resume")
+    parser.add_argument("--mode", choices=("multi_agent", "combined"))
+    parser.add_argument("--concurrency", type=int, default=BULK_MAX_CONCURRENCY)
+    parser.add_argument("--include-article-text", action="store_true")
+    parser.add_argument("--progress-interval", type=float, default=BULK_PROGRESS_INTERVAL_SECONDS)
+    args = parser.parse_args()
+
+    setup_logging()
+    summary = asyncio.run(
+        run_bulk(
+            args.input,
+            args.output,
+            args.mode,
+            args.concurrency,
+            args.include_article_text,
+            args.progress_interval,
+        )
+    )
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from config import (
+    DECISION_CLEAR_MATCH_MIN_CONFIDENCE,
+    DECISION_NO_MATCH_MIN_CONFIDENCE,
+)
+from models.decision import FinalScreeningDecision, RiskDecision
+from models.dob_age import DobAgeMatchResult
+from models.name_match import NameMatchResult
+from models.sentiment import SentimentLabel, SentimentResult
+
+
+@dataclass(frozen=True)
+class DecisionPolicy:
+    """
+    Confidence cut-offs for deciding without the LLM adjudicator.
+
+    no_match_min_confidence: a "not the subject" name result at or above
+        this confidence is discarded outright.
+    clear_match_min_confidence: a potential name match at or above this
+        confidence, with no contradicting DOB/age, is a clear match.
+    """
+
+    no_match_min_confidence: float = DECISION_NO_MATCH_MIN_CONFIDENCE
+    clear_match_min_confidence: float = DECISION_CLEAR_MATCH_MIN_CONFIDENCE
+
+
+DEFAULT_POLICY = DecisionPolicy()
+
+
+def _clip(text: str, limit: int = 240) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def combined_match_confidence(name: NameMatchResult, dob: DobAgeMatchResult) -> float:
+    """Name confidence nudged up by consistent DOB/age evidence and down by contradicting evidence."""
+    confidence = name.confidence
+    if dob.is_dob_or_age_consistent is True:
+        confidence += (1 - confidence) * 0.5 * dob.confidence
+    elif dob.is_dob_or_age_consistent is False:
+        confidence *= 1 - 0.5 * dob.confidence
+    return round(min(max(confidence, 0.0), 1.0), 3)
+
+
+def _audit_notes(name: NameMatchResult, dob: DobAgeMatchResult, sentiment: SentimentResult, rule: str) -> str:
+    name_verdict = "potential match" if name.is_name_potential_match else "not the subject"
+    if dob.is_dob_or_age_consistent is None:
+        dob_verdict = "no usable DOB/age evidence"
+    else:
+        dob_verdict = "consistent" if dob.is_dob_or_age_consistent else "inconsistent"
+    adverse = "adverse" if sentiment.is_adverse_media else "not adverse"
+    categories = f" ({', '.join(sentiment.adverse_categories)})" if sentiment.adverse_categories else ""
+    return "\n".join(
+        [
+            f"- NameMatchResult: {name_verdict} (confidence {name.confidence:.2f}); {_clip(name.reasoning)}",
+            f"- DobAgeMatchResult: {dob_verdict} (confidence {dob.confidence:.2f}); {_clip(dob.reasoning)}",
+            f"- SentimentResult: {sentiment.overall_sentiment.value}, {adverse}{categories}; {_clip(sentiment.reasoning)}",
+            f"- Decided by local rule '{rule}' without the LLM adjudicator.",
+        ]
+    )
+
+
+def decide_locally(
+    name: NameMatchResult,
+    dob: DobAgeMatchResult,
+    sentiment: SentimentResult,
+    policy: DecisionPolicy = DEFAULT_POLICY,
+) -> Optional[Tuple[FinalScreeningDecision, str]]:
+    """
+    Apply the decision agent's rules to the specialist outputs.
+
+    Returns (decision, rule name) for unambiguous cases, or None when the
+    case falls in the ambiguous band and should go to the LLM adjudicator.
+    """
+    subject = name.subject_name_normalized or "the subject"
+    article_person = ", ".join(name.article_primary_names) or "someone else"
+    dob_conflict = dob.is_dob_or_age_consistent is False
+
+    if not name.is_name_potential_match and name.confidence >= policy.no_match_min_confidence:
+        rule = "name_mismatch"
+        decision = FinalScreeningDecision(
+            is_subject_match=False,
+            match_confidence=round(1 - name.confidence, 3),
+            overall_risk_label="no_match",
+            decision=RiskDecision.DISCARD,
+            human_readable_summary=(
+                f"The article is about {article_person}, not {subject}. "
+                "It is not relevant to this screening regardless of its tone."
+            ),
+            audit_notes=_audit_notes(name, dob, sentiment, rule),
+        )
+        return decision, rule
+
+    if not name.is_name_potential_match:
+        return None
+
+    match_confidence = combined_match_confidence(name, dob)
+    clear_match = name.confidence >= policy.clear_match_min_confidence and not dob_conflict
+
+    if clear_match and sentiment.is_adverse_media:
+        rule = "clear_match_adverse"
+        categories = ", ".join(sentiment.adverse_categories) or "adverse conduct"
+        decision = FinalScreeningDecision(
+            is_subject_match=True,
+            match_confidence=match_confidence,
+            overall_risk_label="high",
+            decision=RiskDecision.ESCALATE,
+            human_readable_summary=(
+                f"The article clearly refers to {subject} and reports adverse media ({categories}). "
+                "Escalate for high-risk review."
+            ),
+            audit_notes=_audit_notes(name, dob, sentiment, rule),
+        )
+        return decision, rule
+
+    if clear_match and sentiment.overall_sentiment in (SentimentLabel.POSITIVE, SentimentLabel.NEUTRAL):
+        rule = "clear_match_not_adverse"
+        decision = FinalScreeningDecision(
+            is_subject_match=True,
+            match_confidence=match_confidence,
+            overall_risk_label="clear",
+            decision=RiskDecision.DISCARD,
+            human_readable_summary=(
+                f"The article refers to {subject} but contains no adverse media; "
+                f"coverage is {sentiment.overall_sentiment.value}. No action needed."
+            ),
+            audit_notes=_audit_notes(name, dob, sentiment, rule),
+        )
+        return decision, rule
+
+    if not clear_match and sentiment.is_adverse_media:
+        rule = "uncertain_identity_adverse"
+        decision = FinalScreeningDecision(
+            is_subject_match=False,
+            match_confidence=match_confidence,
+            overall_risk_label="medium",
+            decision=RiskDecision.REVIEW,
+            human_readable_summary=(
+                f"The article is adverse but it is uncertain whether it refers to {subject}"
+                + (" (DOB/age evidence conflicts)." if dob_conflict else ".")
+                + " Manual review is needed to confirm identity."
+            ),
+            audit_notes=_audit_notes(name, dob, sentiment, rule),
+        )
+        return decision, rule
+
+    # Uncertain identity without adverse content, or a clear match with
+    # negative/mixed but non-adverse coverage: leave it to the adjudicator.
+    return None
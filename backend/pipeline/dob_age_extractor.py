@@ -0,0 +1,311 @@
+"""
+Local DOB/age extraction, so the dob_age agent only runs for the hard cases.
+
+One pass of a compiled pattern over the cleaned text finds the surface
+forms the agent's prompt lists: "38-year-old", "aged 52", "Joseph Mason,
+47,", "both 54", "born 2 March 1977", "born in 1977". Evidence counts for
+the subject when it follows a mention of them closely (or, for "the
+N-year-old", refers back to one). Consistency with the supplied DOB is
+computed against the article's publication date, read from its dateline.
+
+The result is filled locally when the evidence is absent or unambiguous.
+Anything else goes to the agent: several different ages, evidence that is
+not clearly about the subject, ages given for an earlier year, an
+off-by-one age, or no publication date to compare against.
+"""
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
+
+from config import DOB_AGE_ANAPHORA_CHARS, DOB_AGE_DATELINE_CHARS, DOB_AGE_SUBJECT_WINDOW_CHARS
+from models.dob_age import DobAgeMatchResult
+from pipeline.name_prefilter import name_tokens, name_variants
+
+MONTHS = {
+    name: number
+    for number, names in enumerate(
+        (
+            ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"),
+            ("may",), ("june", "jun"), ("july", "jul"), ("august", "aug"),
+            ("september", "sep", "sept"), ("october", "oct"), ("november", "nov"), ("december", "dec"),
+        ),
+        start=1,
+    )
+    for name in names
+}
+_MONTH = (
+    r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+)
+_DATE = rf"(?:\d{{1,2}}(?:st|nd|rd|th)?\s+{_MONTH}\.?,?\s+\d{{4}}|{_MONTH}\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}})"
+
+EVIDENCE_RE = re.compile(
+    # Case-insensitive except the name in "Mason, 47,"; the lookahead rejects
+    # most positions before the alternation is tried.
+    r"(?=[\dtabdTABD]|[A-Z][^\W\d_]*[’']?,)(?:"
+    + "|".join(
+        (
+            rf"(?i:(?P<anaphor>\bthe\s+)?\b(?P<hyphen_age>\d{{1,3}})[-\s]years?[-\s]old\b)",
+            r"(?i:\baged\s+(?:just\s+|only\s+|about\s+|around\s+)?(?P<aged>\d{1,3})\b)",
+            r"(?i:\bboth\s+(?P<both>\d{1,3})\b(?![.,]?\d|\s*(?:%|per\b|years?\b|months?\b|days?\b)))",
+            r"\b(?P<apposition_name>[A-Z][^\W\d_]+)[’']?,\s+(?P<apposition>\d{1,3}),",
+            rf"(?i:\bborn\s+(?:on\s+)?(?P<born_date>{_DATE}))",
+            r"(?i:\bborn\s+in\s+(?P<born_year>(?:19|20)\d{2})\b)",
+            rf"(?i:\b(?:date\s+of\s+birth|dob)[:\s]+"
+            rf"(?P<dob_date>{_DATE}|\d{{1,2}}/\d{{1,2}}/\d{{4}}|\d{{4}}-\d{{2}}-\d{{2}}))",
+        )
+    )
+    + ")",
+)
+PUBLISHED_RE = re.compile(rf"\b(?:published|updated|posted)\s*:?\s*(?:on\s+)?(?P<date>{_DATE})", re.IGNORECASE)
+DATE_RE = re.compile(_DATE, re.IGNORECASE)
+YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+SENTENCE_END_RE = re.compile(r"[.!?]\s")
+# Ages reported for another moment in time ("when he was 12", "in 1983 aged 28"),
+# looked for in the clause around the phrase.
+HISTORY_BEFORE_CHARS = 100
+HISTORY_AFTER_CHARS = 40
+HISTORICAL_RE = re.compile(r"\b(?:when|at the time|then|former|formerly|previously|until)\b", re.IGNORECASE)
+
+
+@dataclass
+class AgeEvidence:
+    kind: str  # "age" or "dob"
+    phrase: str
+    start: int
+    age: Optional[int] = None
+    dob: Optional[Tuple[int, Optional[int], Optional[int]]] = None  # (year, month, day)
+    about_subject: bool = False
+    historical: bool = False
+
+
+@dataclass
+class DobAgeExtraction:
+    """What the local pass found; result is None when the dob_age agent should decide."""
+
+    evidence: List[AgeEvidence] = field(default_factory=list)
+    published: Optional[date] = None
+    result: Optional[DobAgeMatchResult] = None
+    reason: str = ""
+
+    def report(self) -> dict:
+        return {
+            "engine": "local" if self.result is not None else "llm",
+            "reason": self.reason,
+            "published": self.published.isoformat() if self.published else None,
+            "evidence": [e.phrase for e in self.evidence if e.about_subject][:5],
+        }
+
+
+def parse_date(text: str) -> Optional[Tuple[int, Optional[int], Optional[int]]]:
+    """
+    (year, month, day) from "2 March 1977", "March 2, 1977", "02/03/1977"
+    (day first), ISO dates, or a month and year / bare year with the rest None.
+    """
+    text = text.strip().lower().replace(",", " ").replace(".", " ")
+    iso = re.fullmatch(r"(\d{4})-(\d{1,2})(?:-(\d{1,2}))?", text)
+    if iso:
+        return int(iso.group(1)), int(iso.group(2)), int(iso.group(3)) if iso.group(3) else None
+    slashed = re.fullmatch(r"(\d{1,2})/(\d{1,2})/(\d{4})", text)
+    if slashed:
+        return int(slashed.group(3)), int(slashed.group(2)), int(slashed.group(1))
+    if re.fullmatch(r"\d{4}", text):
+        return int(text), None, None
+    words = re.sub(r"(\d)(st|nd|rd|th)\b", r"\1", text).split()
+    numbers = [int(w) for w in words if w.isdigit()]
+    months = [MONTHS[w] for w in words if w in MONTHS]
+    if len(numbers) == 2 and len(months) == 1:
+        day, year = sorted(numbers)
+        return year, months[0], day
+    if len(numbers) == 1 and numbers[0] > 31 and len(months) == 1:
+        return numbers[0], months[0], None
+    return None
+
+
+def _as_date(parts: Optional[Tuple[int, Optional[int], Optional[int]]]) -> Optional[date]:
+    if parts is None or parts[1] is None or parts[2] is None:
+        return None
+    try:
+        return date(*parts)
+    except ValueError:
+        return None
+
+
+def find_published_date(article_text: str) -> Optional[date]:
+    """Publication date from the dateline near the top of the cleaned text ("Published 17 November 2025")."""
+    head = article_text[:DOB_AGE_DATELINE_CHARS]
+    published = PUBLISHED_RE.search(head)
+    if published is not None:
+        return _as_date(parse_date(published.group("date")))
+    first = DATE_RE.search(head)
+    return _as_date(parse_date(first.group())) if first else None
+
+
+def possible_ages(dob: Tuple[int, Optional[int], Optional[int]], on: date) -> Set[int]:
+    """Ages someone born on dob can be on a date (two candidates when only the year is known)."""
+    born = _as_date(dob)
+    if born is None:
+        return {on.year - dob[0] - 1, on.year - dob[0]}
+    return {on.year - born.year - ((on.month, on.day) < (born.month, born.day))}
+
+
+@lru_cache(maxsize=1024)
+def _subject_pattern(subject_name: str) -> Optional[re.Pattern]:
+    """Any subject name token or its variants, as a capitalised word."""
+    words = set()
+    for token in name_tokens(subject_name):
+        if len(token) > 1:
+            words |= name_variants(token)
+    if not words:
+        return None
+    alternatives = "|".join(sorted((re.escape(w) for w in words), key=len, reverse=True))
+    return re.compile(rf"\b(?=[A-Z])(?i:{alternatives})\b")
+
+
+def _subject_mentions(subject_name: str, article_text: str) -> List[int]:
+    """Offsets of subject name mentions. Accented spellings the subject lacks are missed, which defers to the agent."""
+    pattern = _subject_pattern(subject_name)
+    return [m.start() for m in pattern.finditer(article_text)] if pattern else []
+
+
+def _is_historical(article_text: str, start: int, end: int, published: Optional[date]) -> bool:
+    """An age given for another moment: a different year or "when"/"then"/... in the same clause."""
+    begin = max(
+        (m.end() for m in SENTENCE_END_RE.finditer(article_text, max(0, start - HISTORY_BEFORE_CHARS), start)),
+        default=max(0, start - HISTORY_BEFORE_CHARS),
+    )
+    stop = SENTENCE_END_RE.search(article_text, end, end + HISTORY_AFTER_CHARS)
+    clause = article_text[begin : stop.start() if stop else end + HISTORY_AFTER_CHARS]
+    years = {int(year) for year in YEAR_RE.findall(clause)} - ({published.year} if published else set())
+    return bool(years or HISTORICAL_RE.search(clause))
+
+
+def find_evidence(subject_name: str, article_text: str, published: Optional[date]) -> List[AgeEvidence]:
+    mentions = _subject_mentions(subject_name, article_text)
+    evidence = []
+    for match in EVIDENCE_RE.finditer(article_text):
+        groups = {name: value for name, value in match.groupdict().items() if value is not None}
+        if "born_date" in groups or "born_year" in groups or "dob_date" in groups:
+            raw = groups.get("born_date") or groups.get("born_year") or groups.get("dob_date")
+            item = AgeEvidence("dob", match.group().strip(), match.start(), dob=parse_date(raw))
+            if item.dob is None:
+                continue
+        else:
+            age = int(next(groups[name] for name in ("hyphen_age", "aged", "both", "apposition") if name in groups))
+            if not 0 < age < 120:
+                continue
+            item = AgeEvidence("age", match.group().strip(" ,"), match.start(), age=age)
+            item.historical = _is_historical(article_text, match.start(), match.end(), published)
+        if "apposition" in groups:
+            # "Wen, 44," is about whoever is named right before the number.
+            item.about_subject = match.start() in mentions
+        else:
+            window = DOB_AGE_ANAPHORA_CHARS if "anaphor" in groups else DOB_AGE_SUBJECT_WINDOW_CHARS
+            # "The 60-year-old Colin Nesbitt" puts the name just after the age.
+            item.about_subject = any(
+                -len(match.group()) - 40 <= match.start() - offset <= window for offset in mentions
+            )
+        evidence.append(item)
+    return evidence
+
+
+def _result(
+    age: Optional[AgeEvidence],
+    dob: Optional[AgeEvidence],
+    consistent: Optional[bool],
+    reasoning: str,
+) -> DobAgeMatchResult:
+    dob_text = None
+    if dob is not None:
+        year, month, day = dob.dob
+        dob_text = f"{year:04d}-{month:02d}-{day:02d}" if day else str(year)
+    return DobAgeMatchResult(
+        dob_in_article=dob_text,
+        age_in_article=age.age if age else None,
+        age_phrase=age.phrase if age else (dob.phrase if dob else None),
+        is_dob_or_age_consistent=consistent,
+        confidence=0.9,
+        reasoning=f"Local DOB/age extractor: {reasoning}",
+    )
+
+
+def extract_dob_age(
+    subject_name: str,
+    subject_dob: Optional[str],
+    article_text: str,
+    published: Optional[date] = None,
+) -> DobAgeExtraction:
+    """
+    Scan the article once for age and birth-date evidence about the subject
+    and decide locally where the evidence allows it. published defaults to
+    the date in the article's dateline.
+    """
+    published = published or find_published_date(article_text)
+    evidence = find_evidence(subject_name, article_text, published)
+    extraction = DobAgeExtraction(evidence, published)
+
+    if not evidence:
+        extraction.reason = "no age or date-of-birth phrase in the article"
+        extraction.result = _result(None, None, None, "the article contains no explicit age or date-of-birth phrase.")
+        return extraction
+    about = [e for e in evidence if e.about_subject]
+    if not about:
+        extraction.reason = "age/DOB phrases found, but none clearly about the subject"
+        return extraction
+    if any(e.historical for e in about):
+        extraction.reason = "an age is given for an earlier point in time"
+        return extraction
+    ages = {e.age for e in about if e.kind == "age"}
+    dobs = {e.dob for e in about if e.kind == "dob"}
+    if len(ages) > 1 or len(dobs) > 1:
+        extraction.reason = "conflicting ages or birth dates near the subject"
+        return extraction
+    age = next((e for e in about if e.kind == "age"), None)
+    dob = next((e for e in about if e.kind == "dob"), None)
+    quoted = " and ".join(f"'{e.phrase}'" for e in (age, dob) if e is not None)
+
+    if not subject_dob:
+        extraction.reason = "unambiguous evidence; no subject DOB to compare"
+        extraction.result = _result(
+            age, dob, None, f"{quoted} near a mention of the subject; no subject DOB to compare."
+        )
+        return extraction
+    supplied = parse_date(subject_dob)
+    if supplied is None:
+        extraction.reason = f"subject DOB '{subject_dob}' not understood"
+        return extraction
+
+    verdicts = []
+    if dob is not None:
+        article_dob = dob.dob
+        precision = 3 if article_dob[2] and supplied[2] else 2 if article_dob[1] and supplied[1] else 1
+        verdicts.append(article_dob[:precision] == supplied[:precision])
+    if age is not None:
+        if published is None:
+            extraction.reason = "no publication date to check the age against"
+            return extraction
+        expected = possible_ages(supplied, published)
+        if age.age in expected:
+            verdicts.append(True)
+        elif min(abs(age.age - e) for e in expected) >= 2:
+            verdicts.append(False)
+        else:
+            extraction.reason = "age is one year off the subject DOB"
+            return extraction
+    if len(set(verdicts)) > 1:
+        extraction.reason = "age and birth date disagree about the subject DOB"
+        return extraction
+
+    consistent = verdicts[0]
+    against = f" on {published.isoformat()}" if age is not None else ""
+    extraction.reason = "unambiguous evidence, " + ("consistent" if consistent else "inconsistent") + " with the DOB"
+    extraction.result = _result(
+        age,
+        dob,
+        consistent,
+        f"{quoted} near a mention of the subject is {'consistent' if consistent else 'inconsistent'} "
+        f"with the subject DOB {subject_dob}{against}.",
+    )
+    return extraction
@@ -0,0 +1,280 @@
+"""
+Process-wide LLM rate governor.
+
+Every model call made by run_agent passes through one RateGovernor, which
+keeps the process under the provider's limits instead of discovering them
+through 429s:
+
+- a requests bucket (LLM_REQUESTS_PER_MINUTE) and a prompt-tokens bucket
+  (LLM_TOKENS_PER_MINUTE), charged with an estimate before the call and
+  settled against the reported usage afterwards;
+- a cap on calls in flight (LLM_MAX_CONCURRENCY);
+- strict priority between classes: a waiting "interactive" call (the
+  /api/run_screening endpoints) is always admitted before any "batch" call
+  (batch screening and background jobs), FIFO within a class;
+- retries of rate-limited / overloaded calls with full-jitter exponential
+  backoff. A Retry-After from the provider pauses all admissions until it
+  has passed, since every other caller would be refused too.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import (
+    LLM_BACKOFF_BASE_SECONDS,
+    LLM_BACKOFF_MAX_SECONDS,
+    LLM_BUCKET_BURST_SECONDS,
+    LLM_GOVERNOR_ENABLED,
+    LLM_MAX_CONCURRENCY,
+    LLM_MAX_RETRIES,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_RETRY_STATUS_CODES,
+    LLM_TOKENS_PER_MINUTE,
+)
+from scraping.politeness import parse_retry_after
+from utils.metrics import REGISTRY, Counter, Gauge, Histogram
+
+logger = logging.getLogger("aml.governor")
+
+# Admission order: lower index first.
+PRIORITIES = ("interactive", "batch")
+
+QUEUE_DEPTH = REGISTRY.register(Gauge("aml_llm_queue_depth", "Model calls waiting for admission.", ("priority",)))
+QUEUE_SECONDS = REGISTRY.register(
+    Histogram("aml_llm_queue_wait_seconds", "Time model calls waited for admission.", ("priority",))
+)
+RETRIES = REGISTRY.register(
+    Counter("aml_llm_retries_total", "Model calls retried after a retryable provider error.", ("status",))
+)
+
+_priority: ContextVar[str] = ContextVar("aml_llm_priority", default="interactive")
+
+
+@contextmanager
+def llm_priority(priority: str) -> Iterator[None]:
+    """Run the enclosed model calls (and tasks started inside) in this priority class."""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority {priority!r}; expected one of {PRIORITIES}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+class TokenBucket:
+    """Refills at `rate` units per second up to `capacity`; may go into debt when settled."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.level = capacity
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available (amounts above capacity wait for a full bucket)."""
+        self._refill()
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate)
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self.level -= amount
+
+    def give(self, amount: float) -> None:
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+def retry_status(exc: BaseException) -> Optional[int]:
+    """HTTP status of a retryable provider error (429, 5xx overload), else None."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if status in LLM_RETRY_STATUS_CODES else None
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Delay requested by the provider (retry-after-ms / Retry-After), if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    return parse_retry_after(headers) if headers else None
+
+
+def backoff_seconds(attempt: int, base: float = LLM_BACKOFF_BASE_SECONDS, cap: float = LLM_BACKOFF_MAX_SECONDS) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class RateGovernor:
+    """
+    Admits at most `request_limit` calls and `token_limit` estimated prompt
+    tokens in any `window_seconds`: the buckets refill at limit / (window +
+    burst) per second and hold `burst_seconds` of that, so even a full burst
+    followed by steady refill stays within one window's allowance.
+    """
+
+    def __init__(
+        self,
+        request_limit: float = LLM_REQUESTS_PER_MINUTE,
+        token_limit: float = LLM_TOKENS_PER_MINUTE,
+        window_seconds: float = 60.0,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        burst_seconds: float = LLM_BUCKET_BURST_SECONDS,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE_SECONDS,
+        backoff_max: float = LLM_BACKOFF_MAX_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        request_rate = request_limit / (window_seconds + burst_seconds)
+        token_rate = token_limit / (window_seconds + burst_seconds)
+        self.requests = TokenBucket(request_rate, max(1.0, request_rate * burst_seconds), clock)
+        self.tokens = TokenBucket(token_rate, max(1.0, token_rate * burst_seconds), clock)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.clock = clock
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._order = itertools.count()
+        # Heap of (priority rank, arrival) tickets; each waiter's wake-up future by ticket.
+        self._waiting: List[Tuple[int, int]] = []
+        self._wakeups: Dict[Tuple[int, int], asyncio.Future] = {}
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiting),
+            "request_tokens": round(self.requests.level, 2),
+            "prompt_tokens": round(self.tokens.level, 2),
+        }
+
+    def _admission_delay(self, estimated_tokens: int) -> Optional[float]:
+        """0 when the head of the queue can go now, seconds to wait, or None to wait for a release."""
+        if self.in_flight >= self.max_concurrency:
+            return None
+        return max(
+            self.paused_until - self.clock(),
+            self.requests.wait_time(1),
+            self.tokens.wait_time(estimated_tokens),
+            0.0,
+        )
+
+    def _wake_all(self) -> None:
+        for future in self._wakeups.values():
+            if not future.done():
+                future.set_result(None)
+
+    async def acquire(self, estimated_tokens: int, priority: Optional[str] = None) -> None:
+        """Wait for admission of one call expected to use `estimated_tokens` prompt tokens."""
+        priority = priority or current_priority()
+        ticket = (PRIORITIES.index(priority), next(self._order))
+        heapq.heappush(self._waiting, ticket)
+        started = self.clock()
+        loop = asyncio.get_running_loop()
+        try:
+            with QUEUE_DEPTH.track(priority=priority):
+                while True:
+                    delay: Optional[float] = None
+                    if self._waiting[0] == ticket:
+                        delay = self._admission_delay(estimated_tokens)
+                        if delay == 0:
+                            break
+                    # Wait for the computed delay, or for the queue to change.
+                    wakeup = self._wakeups[ticket] = loop.create_future()
+                    await asyncio.wait({wakeup}, timeout=delay)
+            heapq.heappop(self._waiting)
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+            self.in_flight += 1
+        finally:
+            self._wakeups.pop(ticket, None)
+            if ticket in self._waiting:
+                # Cancelled while queued.
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+            self._wake_all()
+        QUEUE_SECONDS.observe(self.clock() - started, priority=priority)
+
+    def release(self, estimated_tokens: int = 0, used_tokens: Optional[int] = None) -> None:
+        """Finish a call, settling the token bucket against the usage the provider reported."""
+        self.in_flight -= 1
+        if used_tokens is not None and used_tokens != estimated_tokens:
+            if used_tokens > estimated_tokens:
+                self.tokens.take(used_tokens - estimated_tokens)
+            else:
+                self.tokens.give(estimated_tokens - used_tokens)
+        self._wake_all()
+
+    def pause(self, seconds: float) -> None:
+        """Admit nothing new for `seconds` (the provider asked us to back off)."""
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+        self._wake_all()
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[Any]],
+        estimated_tokens: int,
+        priority: Optional[str] = None,
+        used_tokens: Callable[[Any], Optional[int]] = lambda result: None,
+    ) -> Any:
+        """
+        Run fn() once admitted, retrying rate-limited / overloaded failures
+        with backoff. Other exceptions (including timeouts) propagate as-is.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(estimated_tokens, priority)
+            used: Optional[int] = None
+            try:
+                result = await fn()
+                used = used_tokens(result)
+                return result
+            except Exception as exc:
+                status = retry_status(exc)
+                if status is None or attempt == self.max_retries:
+                    raise
+                retry_after = retry_after_seconds(exc)
+                if retry_after is not None:
+                    # Spread the restart over a little jitter so the queue doesn't stampede.
+                    self.pause(retry_after)
+                    delay = retry_after + random.uniform(0, min(1.0, retry_after / 4 + 0.05))
+                else:
+                    delay = backoff_seconds(attempt, self.backoff_base, self.backoff_max)
+                RETRIES.inc(status=str(status))
+                logger.warning(f"Model call got HTTP {status}; retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+            finally:
+                self.release(estimated_tokens, used)
+            await asyncio.sleep(delay)
+
+
+_governor: Optional[RateGovernor] = None
+
+
+def get_governor() -> Optional[RateGovernor]:
+    """Process-wide governor, or None when disabled in config."""
+    global _governor
+    if _governor is None and LLM_GOVERNOR_ENABLED:
+        _governor = RateGovernor()
+    return _governor
+
+
+def set_governor(governor: Optional[RateGovernor]) -> None:
+    """Replace the process-wide governor (e.g. different limits for a benchmark)."""
+    global _governor
+    _governor = governor
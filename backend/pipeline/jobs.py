@@ -0,0 +1,336 @@
+import asyncio
+import json
+import logging
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from config import (
+    JOB_ESTIMATED_SECONDS,
+    JOB_LEASE_SECONDS,
+    JOB_MAX_ATTEMPTS,
+    JOB_POLL_INTERVAL_SECONDS,
+    JOB_RETENTION_SECONDS,
+    JOB_WORKERS,
+    JOBS_DB_PATH,
+    JOBS_ENABLED,
+    JOBS_MAX_QUEUE_DEPTH,
+)
+from pipeline.governor import llm_priority
+from pipeline.orchestrator import run_screening
+
+logger = logging.getLogger("aml.jobs")
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload_json TEXT NOT NULL,
+    result_json TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at);
+"""
+
+JOB_FIELDS = "id, status, payload_json, result_json, error, attempts, created_at, started_at, finished_at"
+
+
+class QueueFullError(Exception):
+    """Raised by enqueue when the queue is at its depth limit."""
+
+    def __init__(self, depth: int):
+        super().__init__(f"Job queue is full ({depth} queued)")
+        self.depth = depth
+
+
+def _row_to_job(row) -> Dict[str, Any]:
+    job_id, status, payload_json, result_json, error, attempts, created_at, started_at, finished_at = row
+    return {
+        "id": job_id,
+        "status": status,
+        "payload": json.loads(payload_json),
+        "result": json.loads(result_json) if result_json else None,
+        "error": error,
+        "attempts": attempts,
+        "created_at": created_at,
+        "started_at": started_at,
+        "finished_at": finished_at,
+    }
+
+
+class JobStore:
+    """
+    Durable screening queue in SQLite (WAL), safe to share between processes.
+
+    A claim moves a job to "running" under a lease that the worker renews
+    while the job runs; if the worker dies the lease lapses and the job is
+    claimed again, at most max_attempts times. Renewals and results are
+    tied to the claim (its attempt number), so a worker whose job was
+    reclaimed cannot overwrite the new claim's result.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_depth: int = JOBS_MAX_QUEUE_DEPTH,
+        lease_seconds: float = JOB_LEASE_SECONDS,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        retention_seconds: float = JOB_RETENTION_SECONDS,
+    ):
+        self.path = Path(path)
+        self.max_depth = max_depth
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; claims open their own BEGIN IMMEDIATE transaction.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def enqueue(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            depth = self._depth(now)
+            if depth >= self.max_depth:
+                raise QueueFullError(depth)
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, payload_json, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(payload), now),
+            )
+        return {"id": job_id, "status": QUEUED, "created_at": now}
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {JOB_FIELDS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Oldest claimable job, now marked running under a fresh lease."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._conn.execute(
+                        f"SELECT {JOB_FIELDS} FROM jobs "
+                        "WHERE status = ? OR (status = ? AND lease_expires_at < ?) "
+                        "ORDER BY created_at LIMIT 1",
+                        (QUEUED, RUNNING, now),
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+                    job = _row_to_job(row)
+                    if job["attempts"] >= self.max_attempts:
+                        logger.warning(f"Job {job['id']} abandoned after {job['attempts']} attempts")
+                        self._conn.execute(
+                            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                            (FAILED, f"Abandoned after {job['attempts']} attempts", now, job["id"]),
+                        )
+                        continue
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ?, "
+                        "lease_expires_at = ? WHERE id = ?",
+                        (RUNNING, now, now + self.lease_seconds, job["id"]),
+                    )
+                    self._conn.execute("COMMIT")
+                    return {**job, "status": RUNNING, "attempts": job["attempts"] + 1, "started_at": now}
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def renew(self, job_id: str, attempt: int) -> bool:
+        """Extend the lease of a claim; False if the job is no longer held by it."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (time.time() + self.lease_seconds, job_id, RUNNING, attempt),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, attempt: int, result: Dict[str, Any]) -> bool:
+        return self._finish(job_id, attempt, SUCCEEDED, json.dumps(result, default=str), None)
+
+    def fail(self, job_id: str, attempt: int, error: str) -> bool:
+        return self._finish(job_id, attempt, FAILED, None, error)
+
+    def release(self, job_id: str, attempt: int) -> None:
+        """Put a job interrupted by shutdown back in the queue without using up an attempt."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = MAX(attempts - 1, 0), started_at = NULL, "
+                "lease_expires_at = NULL WHERE id = ? AND status = ? AND attempts = ?",
+                (QUEUED, job_id, RUNNING, attempt),
+            )
+
+    def depth(self) -> int:
+        with self._lock:
+            return self._depth(time.time())
+
+    def purge_finished(self) -> int:
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?", (SUCCEEDED, FAILED, cutoff)
+            )
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _finish(
+        self, job_id: str, attempt: int, status: str, result_json: Optional[str], error: Optional[str]
+    ) -> bool:
+        """Record the outcome of a claim; False (nothing written) if the job was reclaimed since."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, result_json = ?, error = ?, finished_at = ?, "
+                "lease_expires_at = NULL WHERE id = ? AND status = ? AND attempts = ?",
+                (status, result_json, error, time.time(), job_id, RUNNING, attempt),
+            )
+        if cursor.rowcount == 0:
+            logger.warning(f"Job {job_id} attempt {attempt} lost its lease; result discarded")
+        return cursor.rowcount == 1
+
+    def _depth(self, now: float) -> int:
+        (depth,) = self._conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ? OR (status = ? AND lease_expires_at < ?)",
+            (QUEUED, RUNNING, now),
+        ).fetchone()
+        return depth
+
+
+JobRunner = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+class JobWorkerPool:
+    """
+    Fixed number of asyncio workers draining a JobStore through run_screening.
+
+    Workers wake immediately on local enqueues and poll for jobs enqueued by
+    other processes. Job durations feed Retry-After estimates.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = JOB_WORKERS,
+        poll_interval: float = JOB_POLL_INTERVAL_SECONDS,
+        runner: JobRunner = run_screening,
+    ):
+        self.store = store
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self.runner = runner
+        self.avg_seconds = JOB_ESTIMATED_SECONDS
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self._last_purge = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        logger.info(f"Started {self.workers} job workers on {self.store.path}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def retry_after(self, depth: int) -> int:
+        """Seconds until roughly one queue slot's worth of work has drained."""
+        backlog = max(depth - self.store.max_depth + 1, 1)
+        return max(1, math.ceil(self.avg_seconds * backlog / self.workers))
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            job = await asyncio.to_thread(self.store.claim)
+            if job is None:
+                await self._idle()
+                continue
+
+            started = time.monotonic()
+            logger.info(f"Worker {n} running job {job['id']} (attempt {job['attempts']})")
+            lease = asyncio.create_task(self._keep_lease(job))
+            try:
+                # Queued jobs yield the model to interactive screenings.
+                with llm_priority("batch"):
+                    result = await self.runner(**job["payload"])
+            except asyncio.CancelledError:
+                await asyncio.to_thread(self.store.release, job["id"], job["attempts"])
+                raise
+            except Exception as exc:
+                logger.warning(f"Job {job['id']} failed: {exc}")
+                await asyncio.to_thread(self.store.fail, job["id"], job["attempts"], f"Screening failed: {exc}")
+            else:
+                await asyncio.to_thread(self.store.complete, job["id"], job["attempts"], result)
+            finally:
+                lease.cancel()
+            self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * (time.monotonic() - started)
+
+    async def _keep_lease(self, job: Dict[str, Any]) -> None:
+        """Renew a running job's lease a few times per lease period, however long the screening takes."""
+        while True:
+            await asyncio.sleep(max(self.store.lease_seconds / 3, 0.01))
+            if not await asyncio.to_thread(self.store.renew, job["id"], job["attempts"]):
+                logger.warning(f"Job {job['id']} attempt {job['attempts']} was reclaimed by another worker")
+                return
+
+    async def _idle(self) -> None:
+        if time.time() - self._last_purge > 3600:
+            self._last_purge = time.time()
+            purged = await asyncio.to_thread(self.store.purge_finished)
+            if purged:
+                logger.info(f"Purged {purged} finished jobs")
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+
+_job_pool: Optional[JobWorkerPool] = None
+
+
+def get_job_pool() -> Optional[JobWorkerPool]:
+    """Process-wide job store and worker pool, or None when disabled in config."""
+    global _job_pool
+    if not JOBS_ENABLED:
+        return None
+    if _job_pool is None:
+        _job_pool = JobWorkerPool(JobStore(Path(JOBS_DB_PATH)))
+    return _job_pool
@@ -0,0 +1,393 @@
+"""
+Incremental monitoring: rescreen known (subject, URL) pairs, running the
+agents only for articles whose content changed.
+
+Per pair the monitor keeps the SHA-256 of the cleaned article text the last
+decision was made on, and that FinalScreeningDecision; per URL it keeps the
+ETag / Last-Modified validators. A run fetches each URL once:
+
+- 304 Not Modified, or a cleaned text with the same hash -> the pair is
+  "unchanged" and no agent runs;
+- otherwise the subject is screened against the new text with
+  screen_article. Stages whose inputs did not change are not re-run: the
+  agent cache answers prompts whose context window is unchanged, and the
+  subject-independent agents run once per article for all its subjects.
+
+A degraded screening (an agent timed out or failed and a placeholder fed
+the decision) is recorded as "degraded" without replacing the pair's hash
+and decision, so the next run screens it again.
+
+Decision changes are emitted as a diff per pair. A run's pairs are written
+to SQLite before it starts and each pair is committed with its outcome, so
+a run interrupted by a crash resumes where it stopped.
+
+    cd backend
+    python -m pipeline.monitoring add --name "Joseph Mason" [--dob 1977-03-02] --url URL [--url URL ...]
+    python -m pipeline.monitoring import pairs.json|pairs.jsonl|pairs.csv
+    python -m pipeline.monitoring run [--mode combined] [--concurrency 8] [--diff-out diffs.jsonl]
+    python -m pipeline.monitoring status
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import MAX_ARTICLE_CHARS, MONITOR_DB_PATH, MONITOR_MAX_CONCURRENCY
+from models.decision import FinalScreeningDecision
+from models.inputs import ScreeningInput
+from pipeline.agent_runner import close_model_client, open_model_client
+from pipeline.bulk import load_pairs
+from pipeline.governor import llm_priority
+from pipeline.orchestrator import screen_article
+from scraping.cache import normalize_url
+from scraping.fetcher import byte_budget, clean_html_async, close_http_client, download
+
+logger = logging.getLogger("aml.monitoring")
+
+NEW, UNCHANGED, RESCREENED, CHANGED = "new", "unchanged", "rescreened", "changed"
+ERROR, DEGRADED = "error", "degraded"
+# Fields compared for the decision diff; the free-text summary and audit
+# notes are reworded on every rerun and would drown the real changes.
+DIFF_FIELDS = ("decision", "overall_risk_label", "is_subject_match", "match_confidence")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pairs (
+    id INTEGER PRIMARY KEY,
+    subject_name TEXT NOT NULL,
+    subject_dob TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL,
+    content_sha256 TEXT,
+    decision_json TEXT,
+    last_checked_at REAL,
+    last_changed_at REAL,
+    UNIQUE (subject_name, subject_dob, url)
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_sha256 TEXT,
+    checked_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS run_pairs (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    pair_id INTEGER NOT NULL REFERENCES pairs (id),
+    outcome TEXT,
+    diff_json TEXT,
+    finished_at REAL,
+    PRIMARY KEY (run_id, pair_id)
+);
+CREATE INDEX IF NOT EXISTS idx_run_pairs_pending ON run_pairs (run_id, outcome);
+"""
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def decision_diff(before: Optional[Dict[str, Any]], after: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """DIFF_FIELDS whose value changed, as {field: {"before", "after"}}; every field for a first screening."""
+    return {
+        field: {"before": (before or {}).get(field), "after": after.get(field)}
+        for field in DIFF_FIELDS
+        if before is None or before.get(field) != after.get(field)
+    }
+
+
+class MonitorStore:
+    """Monitored pairs, per-URL validators and run progress in SQLite (WAL)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def add_pairs(self, pairs: Sequence[Tuple[str, Optional[str], str]]) -> int:
+        """Register (name, dob, url) pairs; ones already monitored are ignored. Returns pairs added."""
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO pairs (subject_name, subject_dob, url) VALUES (?, ?, ?)",
+                [(" ".join(name.split()), (dob or "").strip(), url.strip()) for name, dob, url in pairs],
+            )
+            return self._conn.total_changes - before
+
+    def start_run(self) -> Tuple[int, bool]:
+        """(run id, resumed): the unfinished run if a previous one crashed, else a new run over every pair."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id FROM runs WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                return row[0], True
+            run_id = self._conn.execute("INSERT INTO runs (started_at) VALUES (?)", (time.time(),)).lastrowid
+            self._conn.execute(
+                "INSERT INTO run_pairs (run_id, pair_id) SELECT ?, id FROM pairs", (run_id,)
+            )
+            return run_id, False
+
+    def pending(self, run_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT p.id, p.subject_name, p.subject_dob, p.url, p.content_sha256, p.decision_json "
+                "FROM run_pairs r JOIN pairs p ON p.id = r.pair_id "
+                "WHERE r.run_id = ? AND r.outcome IS NULL ORDER BY p.url, p.id",
+                (run_id,),
+            ).fetchall()
+        return [
+            {
+                "id": pair_id,
+                "name": name,
+                "dob": dob or None,
+                "url": url,
+                "content_sha256": sha,
+                "decision": json.loads(decision_json) if decision_json else None,
+            }
+            for pair_id, name, dob, url, sha, decision_json in rows
+        ]
+
+    def page(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_sha256 FROM pages WHERE url = ?", (normalize_url(url),)
+            ).fetchone()
+        return None if row is None else {"etag": row[0], "last_modified": row[1], "content_sha256": row[2]}
+
+    def save_page(self, url: str, etag: Optional[str], last_modified: Optional[str], sha: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_sha256, checked_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (normalize_url(url), etag, last_modified, sha, time.time()),
+            )
+
+    def finish_pair(
+        self,
+        run_id: int,
+        pair_id: int,
+        outcome: str,
+        diff: Optional[Dict[str, Any]] = None,
+        sha: Optional[str] = None,
+        decision: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Record a pair's outcome; with a decision, also its new content hash and decision (one transaction)."""
+        now = time.time()
+        with self._lock, self._conn:
+            if decision is not None:
+                self._conn.execute(
+                    "UPDATE pairs SET content_sha256 = ?, decision_json = ?, last_checked_at = ?, "
+                    "last_changed_at = ? WHERE id = ?",
+                    (sha, json.dumps(decision), now, now, pair_id),
+                )
+            elif outcome not in (ERROR, DEGRADED):
+                self._conn.execute("UPDATE pairs SET last_checked_at = ? WHERE id = ?", (now, pair_id))
+            self._conn.execute(
+                "UPDATE run_pairs SET outcome = ?, diff_json = ?, finished_at = ? WHERE run_id = ? AND pair_id = ?",
+                (outcome, json.dumps(diff) if diff is not None else None, now, run_id, pair_id),
+            )
+
+    def finish_run(self, run_id: int) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+
+    def run_report(self, run_id: int) -> Dict[str, Any]:
+        """Outcome counts and the decision diffs of a run, including pairs finished before a resume."""
+        with self._lock:
+            counts = dict(
+                self._conn.execute(
+                    "SELECT COALESCE(outcome, 'pending'), COUNT(*) FROM run_pairs WHERE run_id = ? GROUP BY 1",
+                    (run_id,),
+                ).fetchall()
+            )
+            rows = self._conn.execute(
+                "SELECT diff_json FROM run_pairs WHERE run_id = ? AND diff_json IS NOT NULL ORDER BY pair_id",
+                (run_id,),
+            ).fetchall()
+        return {"run_id": run_id, "outcomes": counts, "diffs": [json.loads(row[0]) for row in rows]}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (pairs,) = self._conn.execute("SELECT COUNT(*) FROM pairs").fetchone()
+            (screened,) = self._conn.execute(
+                "SELECT COUNT(*) FROM pairs WHERE decision_json IS NOT NULL"
+            ).fetchone()
+            last = self._conn.execute(
+                "SELECT id, started_at, finished_at FROM runs ORDER BY id DESC LIMIT 1"
+            ).fetchone()
+        return {
+            "pairs": pairs,
+            "screened": screened,
+            "last_run": None if last is None else {"id": last[0], "started_at": last[1], "finished_at": last[2]},
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class Monitor:
+    """Runs the checks for a MonitorStore; the store holds all state between runs."""
+
+    def __init__(
+        self, store: MonitorStore, mode: Optional[str] = None, max_concurrency: int = MONITOR_MAX_CONCURRENCY
+    ):
+        self.store = store
+        self.mode = mode
+        self.max_concurrency = max_concurrency
+        # Bounds screenings, not just articles: one URL may carry hundreds of pairs.
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    async def run(self) -> Dict[str, Any]:
+        """Check every monitored pair once (resuming an interrupted run) and return its report."""
+        run_id, resumed = await asyncio.to_thread(self.store.start_run)
+        pending = await asyncio.to_thread(self.store.pending, run_id)
+        by_url: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for pair in pending:
+            by_url[pair["url"]].append(pair)
+        logger.info(
+            f"{'Resuming' if resumed else 'Starting'} monitoring run {run_id}: "
+            f"{len(pending)} pairs over {len(by_url)} articles"
+        )
+
+        urls = iter(by_url.items())
+
+        async def worker() -> None:
+            for url, pairs in urls:
+                await self.check_article(run_id, url, pairs)
+
+        with llm_priority("batch"):
+            await asyncio.gather(*(worker() for _ in range(max(1, min(self.max_concurrency, len(by_url))))))
+        await asyncio.to_thread(self.store.finish_run, run_id)
+        report = await asyncio.to_thread(self.store.run_report, run_id)
+        logger.info(f"Monitoring run {run_id} finished: {report['outcomes']}")
+        return report
+
+    async def check_article(self, run_id: int, url: str, pairs: List[Dict[str, Any]]) -> None:
+        """Fetch one URL (conditionally when every pair is up to date with it) and settle its pairs."""
+        page = await asyncio.to_thread(self.store.page, url)
+        headers = None
+        # A 304 only says "same as the last fetch"; pairs that never saw that content need the body.
+        if page is not None and all(pair["content_sha256"] == page["content_sha256"] for pair in pairs):
+            headers = {
+                name: value
+                for name, value in (("If-None-Match", page["etag"]), ("If-Modified-Since", page["last_modified"]))
+                if value
+            } or None
+        try:
+            resp = await download(url, headers=headers, max_bytes=byte_budget(MAX_ARTICLE_CHARS))
+            if resp.status_code == 304:
+                for pair in pairs:
+                    await asyncio.to_thread(self.store.finish_pair, run_id, pair["id"], UNCHANGED)
+                return
+            text = await clean_html_async(resp.html, max_chars=MAX_ARTICLE_CHARS)
+        except Exception as exc:
+            logger.warning(f"Monitoring fetch failed for {url}: {exc}")
+            for pair in pairs:
+                diff = {"url": url, "name": pair["name"], "dob": pair["dob"], "error": f"Article fetch failed: {exc}"}
+                await asyncio.to_thread(self.store.finish_pair, run_id, pair["id"], ERROR, diff)
+            return
+
+        sha = content_hash(text)
+        await asyncio.to_thread(
+            self.store.save_page, url, resp.headers.get("ETag"), resp.headers.get("Last-Modified"), sha
+        )
+        await asyncio.gather(*(self.check_pair(run_id, pair, text, sha) for pair in pairs))
+
+    async def check_pair(self, run_id: int, pair: Dict[str, Any], text: str, sha: str) -> None:
+        if pair["content_sha256"] == sha and pair["decision"] is not None:
+            await asyncio.to_thread(self.store.finish_pair, run_id, pair["id"], UNCHANGED)
+            return
+        entry = {"url": pair["url"], "name": pair["name"], "dob": pair["dob"]}
+        try:
+            async with self._slots:
+                result = await screen_article(
+                    ScreeningInput(pair["name"], pair["dob"], pair["url"], text), self.mode
+                )
+        except Exception as exc:
+            logger.warning(f"Monitoring screening failed for {pair['name']} @ {pair['url']}: {exc}")
+            await asyncio.to_thread(
+                self.store.finish_pair, run_id, pair["id"], ERROR, {**entry, "error": f"Screening failed: {exc}"}
+            )
+            return
+        degraded = result.get("details", {}).get("degraded")
+        if degraded:
+            logger.warning(f"Monitoring screening degraded for {pair['name']} @ {pair['url']}: {degraded}")
+            await asyncio.to_thread(
+                self.store.finish_pair, run_id, pair["id"], DEGRADED, {**entry, "degraded": degraded}
+            )
+            return
+
+        decision = {field: result[field] for field in FinalScreeningDecision.model_fields}
+        changes = decision_diff(pair["decision"], decision)
+        if pair["decision"] is None:
+            outcome = NEW
+        else:
+            outcome = CHANGED if changes else RESCREENED
+        diff = {**entry, "outcome": outcome, "changes": changes} if changes else None
+        await asyncio.to_thread(self.store.finish_pair, run_id, pair["id"], outcome, diff, sha, decision)
+
+
+async def _run(store: MonitorStore, args: argparse.Namespace) -> Dict[str, Any]:
+    open_model_client()
+    try:
+        return await Monitor(store, args.mode, args.concurrency).run()
+    finally:
+        await close_http_client()
+        await close_model_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Incremental monitoring of subject x article pairs.")
+    parser.add_argument("--db", type=Path, default=Path(MONITOR_DB_PATH))
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    add = subcommands.add_parser("add", help="Monitor one subject against one or more URLs.")
+    add.add_argument("--name", required=True)
+    add.add_argument("--dob")
+    add.add_argument("--url", action="append", required=True)
+    importer = subcommands.add_parser("import", help="Monitor the pairs listed in a .json, .jsonl or .csv file.")
+    importer.add_argument("file", type=Path)
+    run = subcommands.add_parser("run", help="Rescreen changed articles (resumes an interrupted run).")
+    run.add_argument("--mode", choices=("multi_agent", "combined"))
+    run.add_argument("--concurrency", type=int, default=MONITOR_MAX_CONCURRENCY)
+    run.add_argument("--diff-out", type=Path, help="Append decision diffs here as JSON lines (default: stdout).")
+    subcommands.add_parser("status", help="Monitored pairs and the last run.")
+    args = parser.parse_args()
+
+    store = MonitorStore(args.db)
+    if args.command == "add":
+        print(f"added {store.add_pairs([(args.name, args.dob, url) for url in args.url])} pairs")
+    elif args.command == "import":
+        print(f"added {store.add_pairs(load_pairs(args.file))} pairs")
+    elif args.command == "status":
+        print(json.dumps(store.stats(), indent=2))
+    else:
+        report = asyncio.run(_run(store, args))
+        out = args.diff_out.open("a") if args.diff_out else sys.stdout
+        try:
+            for diff in report["diffs"]:
+                out.write(json.dumps(diff) + "\n")
+        finally:
+            if args.diff_out:
+                out.close()
+        print(json.dumps({"run_id": report["run_id"], "outcomes": report["outcomes"]}), file=sys.stderr)
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
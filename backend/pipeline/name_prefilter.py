@@ -0,0 +1,290 @@
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from config import (
+    NAME_PREFILTER_GIVEN_NAME_WINDOW,
+    NAME_PREFILTER_PHONETIC,
+    NAME_PREFILTER_SIMILARITY_THRESHOLD,
+)
+from models.decision import FinalScreeningDecision, RiskDecision
+from models.name_match import NameMatchResult
+
+HONORIFICS = {
+    "mr", "mrs", "ms", "miss", "mx", "dr", "sir", "dame", "lord", "lady", "prof",
+    "professor", "rev", "reverend", "hon", "judge", "justice", "sheikh", "sheik",
+}
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "qc", "kc", "mp", "obe", "mbe", "cbe", "phd"}
+
+# Nickname / transliteration groups. A token's variants are the union of
+# every group it belongs to; groups are deliberately not merged transitively.
+NAME_VARIANT_GROUPS: Tuple[FrozenSet[str], ...] = tuple(
+    frozenset(group.split())
+    for group in (
+        "john jon jonathan johnny jack jonny",
+        "joseph joe joey jo giuseppe jose",
+        "william bill billy will willy liam",
+        "robert rob bob bobby robbie bert",
+        "michael mike mick mickey mikey michele michel mikhail",
+        "nicholas nick nicky nico nikolai",
+        "nicola nikki nicky nicole",
+        "alexander alex alec sasha aleksandr alexandr alessandro",
+        "alexandra alex sasha alessandra",
+        "thomas tom tommy",
+        "david dave davey dai",
+        "james jim jimmy jamie",
+        "christopher chris kit kris",
+        "christine chris chrissie kristine",
+        "stephen steven steve stevie stefan",
+        "andrew andy drew andrei andrey",
+        "anthony tony antony antonio anton",
+        "matthew matt matteo mateo matthias matvey",
+        "peter pete pietro pedro piotr pyotr",
+        "katherine catherine kathryn kate katie kathy cathy kat",
+        "elizabeth liz lizzie beth betty eliza elisabeth",
+        "margaret maggie meg peggy greta",
+        "richard rich rick ricky dick",
+        "edward ed eddie ted ned",
+        "charles charlie chuck carlos carlo karl",
+        "daniel dan danny",
+        "samuel sam sammy",
+        "benjamin ben benny",
+        "patrick pat paddy",
+        "vijay vijai",
+        "mohammed muhammad mohamed mohammad mohamad muhammed mehmet",
+        "ahmed ahmad ahmet",
+        "yusuf yousef yousuf youssef",
+        "sergei sergey serge",
+        "alexei alexey aleksei aleksey",
+        "dmitri dmitry dmitriy",
+        "yuri yury iouri",
+        "vladimir volodymyr vlad",
+        "zhang chang",
+        "zhou chou",
+        "xu hsu",
+        "li lee",
+        "wang wong",
+    )
+)
+
+TOKEN_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)?")
+
+
+@lru_cache(maxsize=65536)
+def normalize_token(token: str) -> str:
+    """Strip accents and apostrophes, lower-case."""
+    decomposed = unicodedata.normalize("NFKD", token)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return stripped.replace("'", "").replace("’", "").lower()
+
+
+def tokenize(text: str) -> List[Tuple[str, str]]:
+    """(normalized, surface) pairs for every word in the text."""
+    return [(normalize_token(m.group()), m.group()) for m in TOKEN_RE.finditer(text)]
+
+
+def name_tokens(name: str) -> List[str]:
+    """Subject name tokens without honorifics, suffixes or punctuation."""
+    tokens = [normalized for normalized, _ in tokenize(name)]
+    return [t for t in tokens if t not in HONORIFICS and t not in SUFFIXES]
+
+
+@lru_cache(maxsize=4096)
+def name_variants(token: str) -> FrozenSet[str]:
+    variants = {token}
+    for group in NAME_VARIANT_GROUPS:
+        if token in group:
+            variants |= group
+    return frozenset(variants)
+
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+@lru_cache(maxsize=65536)
+def soundex(token: str) -> str:
+    if not token:
+        return ""
+    code = token[0]
+    previous = SOUNDEX_CODES.get(token[0], "")
+    for ch in token[1:]:
+        digit = SOUNDEX_CODES.get(ch, "")
+        if digit and digit != previous:
+            code += digit
+        if ch not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+
+@lru_cache(maxsize=65536)
+def trigrams(token: str) -> FrozenSet[str]:
+    padded = f"  {token} "
+    return frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+
+
+def token_similarity(a: str, b: str, phonetic: bool = NAME_PREFILTER_PHONETIC) -> float:
+    """Trigram Jaccard similarity, pulled halfway towards 1.0 when the Soundex codes agree."""
+    if a == b:
+        return 1.0
+    ta, tb = trigrams(a), trigrams(b)
+    score = len(ta & tb) / len(ta | tb)
+    if phonetic and soundex(a) == soundex(b):
+        score = (1.0 + score) / 2
+    return score
+
+
+@dataclass
+class NamePresence:
+    """Outcome of scanning article text for the subject."""
+
+    subject_tokens: List[str]
+    plausible: bool
+    best_score: float
+    best_candidate: Optional[str]
+    mentions: List[str] = field(default_factory=list)
+    full_match: bool = False
+
+    @property
+    def reason(self) -> str:
+        subject = " ".join(self.subject_tokens)
+        if self.plausible:
+            shown = ", ".join(f"'{m}'" for m in self.mentions[:5])
+            return f"Possible mentions of '{subject}': {shown}."
+        if self.best_candidate is None:
+            return f"No token in the article resembles the subject name '{subject}'."
+        return (
+            f"No plausible mention of '{subject}'; closest article token '{self.best_candidate}' "
+            f"scored {self.best_score:.2f}, below the {NAME_PREFILTER_SIMILARITY_THRESHOLD:.2f} threshold."
+        )
+
+
+def _given_name_compatible(given: str, candidate: str, threshold: float) -> bool:
+    if len(candidate) == 1:
+        return candidate == given[0]
+    if candidate in name_variants(given):
+        return True
+    return token_similarity(given, candidate) >= threshold
+
+
+def _full_name_nearby(
+    subject: List[str], token: str, context: List[Tuple[str, str]], threshold: float
+) -> bool:
+    """Whether the other half of the subject's name sits next to a family-name hit."""
+    if len(subject) < 2:
+        return False
+    others = []
+    if token_similarity(subject[-1], token) >= threshold:
+        others.append(subject[0])
+    if token_similarity(subject[0], token) >= threshold:
+        others.append(subject[-1])
+    return any(
+        _given_name_compatible(other, neighbour, threshold)
+        for other in others
+        for neighbour, _ in context
+        if neighbour != token
+    )
+
+
+def find_name_presence(
+    subject_name: str,
+    article_text: str,
+    aliases: Sequence[str] = (),
+    threshold: float = NAME_PREFILTER_SIMILARITY_THRESHOLD,
+    window: int = NAME_PREFILTER_GIVEN_NAME_WINDOW,
+) -> NamePresence:
+    """
+    Deterministic, recall-oriented scan for the subject in cleaned article text.
+
+    Any article token resembling the subject's family name (last token) is a
+    plausible mention. A token resembling the first name counts only with
+    the family name nearby, which also covers family-name-first orders.
+    Given names match on variants and initials; exact alias phrases match
+    too. Fuzzy matches only consider capitalised article tokens.
+    """
+    subject = name_tokens(subject_name)
+    article = tokenize(article_text)
+    normalized_article = " ".join(token for token, _ in article)
+
+    mentions: List[str] = []
+    full_match = False
+    for alias in aliases:
+        alias_norm = " ".join(name_tokens(alias))
+        if alias_norm and f" {alias_norm} " in f" {normalized_article} ":
+            mentions.append(alias)
+            full_match = True
+    if not subject:
+        return NamePresence(subject, bool(mentions), 1.0 if mentions else 0.0, None, mentions, full_match)
+
+    family = subject[-1]
+    first = subject[0] if len(subject) > 1 else None
+    best_score, best_candidate = 0.0, None
+    last_full_index = -window - 1
+    scores: Dict[str, Tuple[float, float]] = {}
+    for index, (token, surface) in enumerate(article):
+        if token not in (family, first) and (len(token) < 3 or not surface[0].isupper()):
+            continue
+        if token not in scores:
+            scores[token] = (
+                token_similarity(family, token),
+                token_similarity(first, token) if first else 0.0,
+            )
+        family_score, first_score = scores[token]
+        if family_score > best_score:
+            best_score, best_candidate = family_score, surface
+        if family_score < threshold and first_score < threshold:
+            continue
+
+        context = article[max(0, index - window) : index + window + 1]
+        full = _full_name_nearby(subject, token, context, threshold)
+        if family_score < threshold and not full:
+            continue  # a lone first-token hit is usually just a shared given name
+        if full:
+            if index - last_full_index <= window:
+                continue  # same mention as the previous window
+            last_full_index = index
+            full_match = True
+            mention = " ".join(s for _, s in context)
+        else:
+            mention = surface
+        if mention not in mentions:
+            mentions.append(mention)
+
+    return NamePresence(subject, bool(mentions), best_score, best_candidate, mentions, full_match)
+
+
+def build_skip_results(
+    subject_name: str, presence: NamePresence
+) -> Tuple[NameMatchResult, FinalScreeningDecision]:
+    """Name result and final decision for an article that never mentions the subject."""
+    reasoning = f"Local name pre-filter: {presence.reason} Agents were not called."
+    name_result = NameMatchResult(
+        subject_name_normalized=" ".join(presence.subject_tokens) or subject_name.lower(),
+        article_primary_names=[],
+        is_name_potential_match=False,
+        confidence=0.95,
+        reasoning=reasoning,
+    )
+    decision = FinalScreeningDecision(
+        is_subject_match=False,
+        match_confidence=0.0,
+        overall_risk_label="no_match",
+        decision=RiskDecision.DISCARD,
+        human_readable_summary=(
+            f"The article does not mention {subject_name} or any close variant of the name, "
+            "so it is not relevant to this subject."
+        ),
+        audit_notes=(
+            f"- Name pre-filter (local): {presence.reason}\n"
+            "- Specialist and decision agents skipped: no plausible subject mention."
+        ),
+    )
+    return name_result, decision
@@ -0,0 +1,329 @@
+"""
+Near-duplicate article index, so syndicated copies of a story reuse the
+specialist results of an earlier screening of the same subject.
+
+Articles are fingerprinted with a MinHash signature over word shingles of
+the cleaned text (one-permutation hashing: each shingle hash falls into one
+of NEAR_DUPLICATE_PERMUTATIONS bins, which keep their minimum), so the share
+of matching bins estimates the Jaccard similarity of the shingle sets.
+Signatures are cut into NEAR_DUPLICATE_BANDS bands: an article is a
+candidate when a whole band matches, and is kept when the estimate reaches
+NEAR_DUPLICATE_MIN_SIMILARITY.
+
+Each band is a sorted array of band hashes searched with bisect, and
+candidates are checked against 16-bit per-bin sketches, so a lookup is a
+few binary searches whatever the index size. Full signatures and
+per-subject results persist in SQLite; the arrays are rebuilt on open and
+pick up rows other processes (API workers) add to the same file. When a
+URL's content changes its article row is replaced by a new one (with no
+results yet) and the old row's results are deleted, so the stale
+signature left in the arrays no longer matches anything.
+"""
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import (
+    NEAR_DUPLICATE_BANDS,
+    NEAR_DUPLICATE_DB_PATH,
+    NEAR_DUPLICATE_ENABLED,
+    NEAR_DUPLICATE_MIN_SIMILARITY,
+    NEAR_DUPLICATE_MIN_WORDS,
+    NEAR_DUPLICATE_PERMUTATIONS,
+    NEAR_DUPLICATE_SHINGLE_WORDS,
+)
+from scraping.cache import normalize_url
+
+logger = logging.getLogger("aml.near_duplicates")
+
+WORD_RE = re.compile(r"\w+")
+MASK64 = (1 << 64) - 1
+# Empty bins borrow the next filled bin's minimum, offset by how far away it is.
+DENSIFY_STEP = 0x9E3779B97F4A7C15
+
+Signature = Tuple[int, ...]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    signature BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS subject_results (
+    article_id INTEGER NOT NULL REFERENCES articles (id),
+    subject_key TEXT NOT NULL,
+    agents_fingerprint TEXT NOT NULL,
+    outputs_json TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (article_id, subject_key)
+);
+"""
+
+
+def minhash(
+    text: str,
+    permutations: int = NEAR_DUPLICATE_PERMUTATIONS,
+    shingle_words: int = NEAR_DUPLICATE_SHINGLE_WORDS,
+) -> Optional[Signature]:
+    """MinHash signature of the text's word shingles, or None when it has fewer than NEAR_DUPLICATE_MIN_WORDS words."""
+    words = WORD_RE.findall(text.lower())
+    if len(words) < max(NEAR_DUPLICATE_MIN_WORDS, shingle_words):
+        return None
+    mins = [MASK64] * permutations
+    for i in range(len(words) - shingle_words + 1):
+        shingle = " ".join(words[i : i + shingle_words]).encode("utf-8")
+        value = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "big")
+        slot, rest = value % permutations, value // permutations
+        if rest < mins[slot]:
+            mins[slot] = rest
+    filled = [slot for slot, value in enumerate(mins) if value != MASK64]
+    for slot in range(permutations):
+        if mins[slot] == MASK64:
+            donor = next((s for s in filled if s > slot), filled[0])
+            distance = (donor - slot) % permutations
+            mins[slot] = (mins[donor] + distance * DENSIFY_STEP) & MASK64
+    return tuple(mins)
+
+
+def subject_key(name: str, dob: Optional[str]) -> str:
+    return f"{' '.join(name.lower().split())}|{(dob or '').strip()}"
+
+
+class MinHashIndex:
+    """In-memory signature -> position lookup above min_similarity; positions follow insertion order."""
+
+    def __init__(
+        self,
+        permutations: int = NEAR_DUPLICATE_PERMUTATIONS,
+        bands: int = NEAR_DUPLICATE_BANDS,
+        min_similarity: float = NEAR_DUPLICATE_MIN_SIMILARITY,
+    ):
+        if permutations % bands:
+            raise ValueError(f"{permutations} permutations do not split into {bands} bands")
+        self.permutations = permutations
+        self.bands = bands
+        self.rows = permutations // bands
+        self.min_similarity = min_similarity
+        # Per band: sorted 32-bit band hashes and the position each belongs to.
+        self._keys = [array("I") for _ in range(bands)]
+        self._positions = [array("I") for _ in range(bands)]
+        self.sketches = array("H")
+
+    def __len__(self) -> int:
+        return len(self.sketches) // self.permutations
+
+    def _band_keys(self, signature: Signature) -> List[int]:
+        if len(signature) != self.permutations:
+            raise ValueError(f"Expected {self.permutations} values, got {len(signature)}")
+        rows = self.rows
+        # Tuples of ints hash the same in every process.
+        return [hash(signature[start : start + rows]) & 0xFFFFFFFF for start in range(0, self.permutations, rows)]
+
+    def add(self, signature: Signature) -> int:
+        """Store a signature; returns its position."""
+        position = len(self)
+        for keys, positions, key in zip(self._keys, self._positions, self._band_keys(signature)):
+            at = bisect_left(keys, key)
+            keys.insert(at, key)
+            positions.insert(at, position)
+        self.sketches.extend(value & 0xFFFF for value in signature)
+        return position
+
+    def add_many(self, signatures: Iterable[Signature]) -> None:
+        """Bulk load: one sort per band rather than an array insert per signature."""
+        start = len(self)
+        added = [array("I") for _ in range(self.bands)]
+        for signature in signatures:
+            for band_keys, key in zip(added, self._band_keys(signature)):
+                band_keys.append(key)
+            self.sketches.extend(value & 0xFFFF for value in signature)
+        count = len(self) - start
+        for band in range(self.bands):
+            keys = self._keys[band] + added[band]
+            positions = self._positions[band] + array("I", range(start, start + count))
+            order = sorted(range(len(keys)), key=keys.__getitem__)
+            self._keys[band] = array("I", (keys[i] for i in order))
+            self._positions[band] = array("I", (positions[i] for i in order))
+
+    def similarity(self, position: int, signature: Signature) -> float:
+        """Estimated Jaccard similarity: share of bins where the stored sketch matches."""
+        stored = self.sketches[position * self.permutations : (position + 1) * self.permutations]
+        return sum(1 for a, b in zip(stored, signature) if a == b & 0xFFFF) / self.permutations
+
+    def query(self, signature: Signature) -> List[Tuple[int, float]]:
+        """(position, estimated similarity) of stored signatures at or above min_similarity, closest first."""
+        candidates = set()
+        for keys, positions, key in zip(self._keys, self._positions, self._band_keys(signature)):
+            at = bisect_left(keys, key)
+            while at < len(keys) and keys[at] == key:
+                candidates.add(positions[at])
+                at += 1
+        found = [(position, self.similarity(position, signature)) for position in candidates]
+        return sorted(
+            ((position, score) for position, score in found if score >= self.min_similarity),
+            key=lambda item: (-item[1], item[0]),
+        )
+
+
+@dataclass
+class NearDuplicate:
+    url: str
+    similarity: float
+    outputs: Dict[str, Any]
+
+    def report(self, reused: List[str]) -> Dict[str, Any]:
+        return {"url": self.url, "similarity": round(self.similarity, 4), "reused": reused}
+
+
+def _pack(signature: Signature) -> bytes:
+    return b"".join(value.to_bytes(8, "big") for value in signature)
+
+
+def _unpack(blob: bytes) -> Signature:
+    return tuple(int.from_bytes(blob[i : i + 8], "big") for i in range(0, len(blob), 8))
+
+
+class NearDuplicateIndex:
+    """Persistent article signatures plus the specialist outputs screened against each, per subject."""
+
+    def __init__(self, path: Path, min_similarity: float = NEAR_DUPLICATE_MIN_SIMILARITY):
+        self.path = Path(path)
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._index = MinHashIndex(min_similarity=min_similarity)
+        self._article_ids = array("q")
+        self._last_id = 0
+        started = time.perf_counter()
+        with self._lock:
+            self._load_new()
+        logger.info(f"Loaded {len(self._index)} article signatures in {time.perf_counter() - started:.2f}s")
+
+    def _load_new(self) -> None:
+        """
+        Index rows written since the last load, by this process or another
+        one sharing the file (API workers). Rows get ids in commit order, so
+        everything past the last id seen is new. Call with the lock held.
+        """
+        rows = [
+            (article_id, _unpack(blob))
+            for article_id, blob in self._conn.execute(
+                "SELECT id, signature FROM articles WHERE id > ? ORDER BY id", (self._last_id,)
+            )
+        ]
+        if not rows:
+            return
+        self._last_id = rows[-1][0]
+        # Signatures written under another NEAR_DUPLICATE_PERMUTATIONS cannot be compared; skip them.
+        rows = [(article_id, signature) for article_id, signature in rows if len(signature) == self._index.permutations]
+        if len(rows) == 1:
+            self._index.add(rows[0][1])
+        else:
+            self._index.add_many([signature for _, signature in rows])
+        self._article_ids.extend(article_id for article_id, _ in rows)
+
+    def __len__(self) -> int:
+        """Current articles; signatures retired by a content change are not counted."""
+        with self._lock:
+            (articles,) = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()
+        return articles
+
+    def find(self, signature: Signature, subject: str, url: str, agents_fingerprint: str) -> Optional[NearDuplicate]:
+        """
+        Most similar other article above the threshold that already has
+        results for this subject from the current agent definitions. The same
+        URL never matches itself: re-fetched pages are the agent cache's business.
+        """
+        own = normalize_url(url)
+        with self._lock:
+            self._load_new()
+            for position, score in self._index.query(signature):
+                row = self._conn.execute(
+                    "SELECT a.url, r.outputs_json FROM subject_results r JOIN articles a ON a.id = r.article_id "
+                    "WHERE r.article_id = ? AND r.subject_key = ? AND r.agents_fingerprint = ?",
+                    (self._article_ids[position], subject, agents_fingerprint),
+                ).fetchone()
+                if row is not None and row[0] != own:
+                    return NearDuplicate(row[0], score, json.loads(row[1]))
+        return None
+
+    def add(
+        self, url: str, signature: Signature, subject: str, agents_fingerprint: str, outputs: Dict[str, Any]
+    ) -> None:
+        """
+        Record this subject's specialist outputs for an article. A URL seen
+        with a different signature (the page changed) gets a new article
+        row, and the results screened against the old text are dropped.
+        """
+        key = normalize_url(url)
+        packed = _pack(signature)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT id, signature FROM articles WHERE url = ?", (key,)).fetchone()
+            if row is not None and row[1] != packed:
+                self._conn.execute("DELETE FROM subject_results WHERE article_id = ?", (row[0],))
+                self._conn.execute("DELETE FROM articles WHERE id = ?", (row[0],))
+                # Never reuse the retired id: processes still holding the old signature map it to that id.
+                (latest,) = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM articles").fetchone()
+                article_id = self._conn.execute(
+                    "INSERT INTO articles (id, url, signature, created_at) VALUES (?, ?, ?, ?)",
+                    (max(latest, row[0]) + 1, key, packed, now),
+                ).lastrowid
+            elif row is None:
+                article_id = self._conn.execute(
+                    "INSERT INTO articles (url, signature, created_at) VALUES (?, ?, ?)", (key, packed, now)
+                ).lastrowid
+            else:
+                article_id = row[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO subject_results "
+                "(article_id, subject_key, agents_fingerprint, outputs_json, created_at) VALUES (?, ?, ?, ?, ?)",
+                (article_id, subject, agents_fingerprint, json.dumps(outputs), now),
+            )
+        with self._lock:
+            self._load_new()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (articles,) = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()
+            (results,) = self._conn.execute("SELECT COUNT(*) FROM subject_results").fetchone()
+        return {"articles": articles, "subject_results": results}
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_index: Optional[NearDuplicateIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index() -> Optional[NearDuplicateIndex]:
+    """Process-wide index, or None when disabled in config."""
+    global _index
+    if not NEAR_DUPLICATE_ENABLED:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = NearDuplicateIndex(Path(NEAR_DUPLICATE_DB_PATH))
+    return _index
+
+
+def close_near_duplicate_index() -> None:
+    global _index
+    with _index_lock:
+        if _index is not None:
+            _index.close()
+            _index = None
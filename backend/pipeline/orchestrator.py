@@ -1,5 +1,23 @@
-from agents import Runner
+import asyncio
+from dataclasses import replace
+from config import (
+    AGENT_TIMEOUT_SECONDS,
+    ARTICLE_WINDOWING_ENABLED,
+    DECISION_RULES_ENABLED,
+    DETAILS_ARTICLE_CHARS,
+    DOB_AGE_LOCAL_ENABLED,
+    NAME_PREFILTER_ENABLED,
+    PIPELINE_MODE,
+    PIPELINE_MODES,
+)
 from models.inputs import ScreeningInput
+from models.article_metadata import ArticleMetadataResult
+from models.context import ContextExtractionResult
+from models.decision import FinalScreeningDecision
+from models.dob_age import DobAgeMatchResult
+from models.name_match import NameMatchResult
+from models.person import PersonExtractionResult
+from models.sentiment import SentimentLabel, SentimentResult
 from aml_agents.name_agent import name_match_agent
 from aml_agents.dob_agent import dob_age_agent
 from aml_agents.sentiment_agent import sentiment_agent
@@ -7,12 +25,49 @@ from aml_agents.decision_agent import decision_agent
 from aml_agents.article_metadata_agent import article_metadata_agent
 from aml_agents.person_agent import person_extraction_agent
 from aml_agents.context_agent import context_extraction_agent
-from scraping.fetcher import fetch_article_text
+from aml_agents.combined_agent import combined_extraction_agent
+from pipeline.agent_cache import agent_fingerprint
+from pipeline.agent_runner import run_agent, substitute_provider_active
+from pipeline.article_stage import article_key, get_article_stage_cache
+from pipeline.decision_rules import decide_locally
+from pipeline.dob_age_extractor import DobAgeExtraction, extract_dob_age
+from pipeline.name_prefilter import NamePresence, build_skip_results, find_name_presence
+from pipeline.near_duplicates import NearDuplicate, Signature, get_near_duplicate_index, minhash, subject_key
+from pipeline.windowing import ContextWindow, select_context, truncate_context
+from scraping.fetcher import fetch_article_text_async
+from utils.metrics import collect_timings, stage_timer
+import hashlib
 import logging
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
 
 logger = logging.getLogger("aml.orchestrator")
 
+# Progress hooks used by the streaming endpoint.
+# (details field, output model, degradation reason or None)
+ResultCallback = Callable[[str, Any, Optional[str]], None]
+# (event name, JSON-serialisable payload)
+EventCallback = Callable[[str, Dict[str, Any]], None]
+
+# Specialist agents keyed by the field they populate in the response "details".
+SPECIALIST_AGENTS = {
+    "metadata": article_metadata_agent,
+    "people": person_extraction_agent,
+    "context": context_extraction_agent,
+    "name_match": name_match_agent,
+    "dob_age": dob_age_agent,
+    "sentiment": sentiment_agent,
+}
+
+# The decision only consumes name/DOB/sentiment, so these may fail without
+# failing the screening; the response is marked degraded instead.
+NON_CRITICAL_AGENTS = {"metadata", "people", "context"}
+
+# Article-level agents describe the article, not the subject: they get a
+# subject-free prompt and their outputs are shared across subjects.
+ARTICLE_AGENTS = {key: SPECIALIST_AGENTS[key] for key in ("metadata", "people", "context")}
+SUBJECT_AGENTS = {key: SPECIALIST_AGENTS[key] for key in ("name_match", "dob_age", "sentiment")}
+
 
 def build_base_prompt(screening_input: ScreeningInput) -> str:
     dob = screening_input.subject_date_of_birth or "not provided"
@@ -33,48 +88,95 @@ Use ONLY the information above. Do not fabricate new facts.
 """
 
 
-async def run_screening(name: str, dob: Optional[str], url: str) -> Dict[str, Any]:
-    logger.info(
-        "Starting screening for subject='%s', dob='%s', url=%s",
-        name,
-        dob or "not provided",
-        url,
-    )
+def build_article_prompt(article_url: str, article_text: str) -> str:
+    return f"""
+You are assisting with adverse media screening in a regulated financial services context.
 
-    # 1) Fetch Article
-    try:
-        article_text = fetch_article_text(url)
-        logger.info(f"Fetched article: length={len(article_text)} chars from {url}")
-    except Exception as e:
-        logger.error(f"Failed to fetch article: {e}")
-        raise
+No screening subject is provided for this step. Describe the article itself.
 
-    screening_input = ScreeningInput(name, dob, url, article_text)
-    prompt = build_base_prompt(screening_input)
+Article URL:
+- {article_url}
 
-    logger.debug(f"Base prompt:\n{prompt}")
+Article text:
+\"\"\"{article_text}\"\"\"
 
-    # 2) Run specialist agents
-    logger.info("Running ArticleMetadataAgent…")
-    metadata_result = (await Runner.run(article_metadata_agent, prompt)).final_output
+Use ONLY the information above. Do not fabricate new facts.
+"""
+
+
+def build_context_window(
+    article_text: str, subject_name: Optional[str] = None, subject_dob: Optional[str] = None
+) -> ContextWindow:
+    """Article text the agents see: relevance-selected passages, or a plain prefix when windowing is off."""
+    if ARTICLE_WINDOWING_ENABLED:
+        return select_context(article_text, subject_name, subject_dob)
+    return truncate_context(article_text)
 
-    logger.info("Running PersonExtractionAgent…")
-    person_result = (await Runner.run(person_extraction_agent, prompt)).final_output
 
-    logger.info("Running ContextExtractionAgent…")
-    context_result = (await Runner.run(context_extraction_agent, prompt)).final_output
+def _placeholder_output(key: str, note: str) -> Any:
+    """Empty-but-valid output for an agent that was not run or did not finish."""
+    if key == "metadata":
+        return ArticleMetadataResult(reasoning=note)
+    if key == "people":
+        return PersonExtractionResult(reasoning=note)
+    if key == "context":
+        return ContextExtractionResult(confidence=0.0, reasoning=note)
+    if key == "dob_age":
+        return DobAgeMatchResult(confidence=0.0, reasoning=note)
+    if key == "sentiment":
+        return SentimentResult(
+            overall_sentiment=SentimentLabel.NEUTRAL,
+            is_adverse_media=False,
+            adverse_categories=[],
+            key_positives=[],
+            key_negatives=[],
+            reasoning=note,
+        )
+    raise KeyError(key)
 
-    logger.info("Running NameMatchAgent…")
-    name_result = (await Runner.run(name_match_agent, prompt)).final_output
 
-    logger.info("Running DobAgeAgent…")
-    dob_result = (await Runner.run(dob_age_agent, prompt)).final_output
+def _degraded_placeholder(key: str, reason: str) -> Any:
+    return _placeholder_output(key, f"Unavailable: {reason}")
 
-    logger.info("Running SentimentAgent…")
-    sentiment_result = (await Runner.run(sentiment_agent, prompt)).final_output
 
-    # 3) Build final decision prompt (you can extend this later to include metadata/context/person if desired)
-    decision_prompt = f"""
+def _prefilter_details(presence: NamePresence, skipped: bool) -> Dict[str, Any]:
+    return {
+        "skipped_agents": skipped,
+        "reason": presence.reason,
+        "mentions": presence.mentions[:10],
+        "best_candidate": presence.best_candidate,
+        "best_score": round(presence.best_score, 3),
+    }
+
+
+def _article_details(article_text: str) -> Dict[str, Any]:
+    """The article as returned in details: cut to DETAILS_ARTICLE_CHARS, with the full length when cut."""
+    if len(article_text) <= DETAILS_ARTICLE_CHARS:
+        return {"article_text": article_text}
+    return {"article_text": article_text[:DETAILS_ARTICLE_CHARS], "article_chars": len(article_text)}
+
+
+def _prefilter_skip_response(screening_input: ScreeningInput, presence: NamePresence) -> Dict[str, Any]:
+    name_result, final = build_skip_results(screening_input.subject_name, presence)
+    note = "Not assessed: the local name pre-filter found no mention of the subject."
+    outputs = {key: _placeholder_output(key, note) for key in SPECIALIST_AGENTS if key != "name_match"}
+    outputs["name_match"] = name_result
+    return {
+        **final.model_dump(),
+        "details": {
+            **{key: outputs[key].model_dump() for key in SPECIALIST_AGENTS},
+            **_article_details(screening_input.article_text),
+            "degraded": {},
+            "decision_source": {"engine": "prefilter", "rule": None},
+            "prefilter": _prefilter_details(presence, skipped=True),
+        },
+    }
+
+
+def build_decision_prompt(
+    name_result: NameMatchResult, dob_result: DobAgeMatchResult, sentiment_result: SentimentResult
+) -> str:
+    return f"""
 You are combining the outputs of three specialist AML agents.
 
 NameMatchResult:
@@ -88,26 +190,349 @@ SentimentResult:
 
 Produce a FinalScreeningDecision JSON object only.
 """
+
+
+async def decide(
+    name_result: NameMatchResult, dob_result: DobAgeMatchResult, sentiment_result: SentimentResult
+) -> Tuple[FinalScreeningDecision, Dict[str, Any]]:
+    """Final decision plus where it came from (local rule or the decision agent)."""
+    if DECISION_RULES_ENABLED:
+        local = decide_locally(name_result, dob_result, sentiment_result)
+        if local is not None:
+            final, rule = local
+            logger.info(
+                f"Decision rule '{rule}' applied: decision={final.decision}, "
+                f"match={final.is_subject_match}, risk={final.overall_risk_label}"
+            )
+            return final, {"engine": "rules", "rule": rule}
+
+    decision_prompt = build_decision_prompt(name_result, dob_result, sentiment_result)
     logger.debug(f"Decision prompt:\n{decision_prompt}")
 
-    logger.info("Running DecisionAgent…")
-    final = (await Runner.run(decision_agent, decision_prompt)).final_output
+    final = await run_agent(decision_agent, decision_prompt)
 
     logger.info(
         f"DecisionAgent completed: decision={final.decision}, "
         f"match={final.is_subject_match}, risk={final.overall_risk_label}"
     )
+    return final, {"engine": "llm", "rule": None}
+
+
+async def run_specialist_agents(
+    prompt: str,
+    agents: Optional[Dict[str, Any]] = None,
+    timeout: float = AGENT_TIMEOUT_SECONDS,
+    on_result: Optional[ResultCallback] = None,
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Run specialist agents (all six by default) concurrently over the same prompt.
+    Returns (outputs keyed by details field, degradation reasons by field).
+    A critical agent failure cancels the remaining calls and is re-raised.
+    on_result, if given, is called as each agent's output (or placeholder) lands.
+    """
+    agents = SPECIALIST_AGENTS if agents is None else agents
+    tasks = {
+        asyncio.create_task(run_agent(agent, prompt, timeout)): key
+        for key, agent in agents.items()
+    }
+    outputs: Dict[str, Any] = {}
+    degraded: Dict[str, str] = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                key = tasks[task]
+                exc = task.exception()
+                if exc is None:
+                    outputs[key] = task.result()
+                    if on_result is not None:
+                        on_result(key, outputs[key], None)
+                    continue
+
+                agent_name = SPECIALIST_AGENTS[key].name
+                if isinstance(exc, asyncio.TimeoutError):
+                    reason = f"timed out after {timeout:g}s"
+                else:
+                    reason = f"{type(exc).__name__}: {exc}"
+
+                if key not in NON_CRITICAL_AGENTS:
+                    logger.error(f"{agent_name} failed: {reason}")
+                    if isinstance(exc, asyncio.TimeoutError):
+                        raise TimeoutError(f"{agent_name} {reason}") from exc
+                    raise exc
+
+                logger.warning(f"{agent_name} degraded: {reason}")
+                degraded[key] = reason
+                outputs[key] = _degraded_placeholder(key, reason)
+                if on_result is not None:
+                    on_result(key, outputs[key], reason)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    return outputs, degraded
+
+
+async def run_article_stage(article_url: str, article_text: str) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Subject-independent agents (metadata, people, context), run at most once
+    per article: concurrent screenings share the in-flight run and later
+    ones reuse the stored result.
+    """
+    return await get_article_stage_cache().get_or_run(
+        article_key(article_url, article_text),
+        lambda: run_specialist_agents(
+            build_article_prompt(article_url, build_context_window(article_text).text), ARTICLE_AGENTS
+        ),
+    )
+
+
+async def run_combined_extraction(
+    prompt: str, timeout: float = AGENT_TIMEOUT_SECONDS, on_result: Optional[ResultCallback] = None
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    All six specialist results from one combined agent call, in the same
+    (outputs, degraded) shape as run_specialist_agents. Any failure is fatal.
+    """
+    try:
+        combined = await run_agent(combined_extraction_agent, prompt, timeout)
+    except asyncio.TimeoutError as exc:
+        logger.error(f"{combined_extraction_agent.name} timed out after {timeout:g}s")
+        raise TimeoutError(f"{combined_extraction_agent.name} timed out after {timeout:g}s") from exc
+    outputs = {key: getattr(combined, key) for key in SPECIALIST_AGENTS}
+    if on_result is not None:
+        for key, output in outputs.items():
+            on_result(key, output, None)
+    return outputs, {}
+
+
+@lru_cache(maxsize=None)
+def specialist_definitions_hash() -> str:
+    """Changes whenever any specialist agent's instructions or output schema do."""
+    return hashlib.sha256(
+        "|".join(f"{key}:{agent_fingerprint(agent)}" for key, agent in SPECIALIST_AGENTS.items()).encode("utf-8")
+    ).hexdigest()
+
+
+def _find_near_duplicate(screening_input: ScreeningInput) -> Tuple[Optional[Signature], Optional[NearDuplicate]]:
+    """(signature, earlier screening of this subject on a near-duplicate article); CPU-bound, run in a thread."""
+    signature = minhash(screening_input.article_text)
+    if signature is None:
+        return None, None
+    index = get_near_duplicate_index()
+    subject = subject_key(screening_input.subject_name, screening_input.subject_date_of_birth)
+    return signature, index.find(
+        signature, subject, screening_input.article_url, specialist_definitions_hash()
+    )
+
+
+async def run_reused_specialists(
+    screening_input: ScreeningInput,
+    duplicate: NearDuplicate,
+    on_result: Optional[ResultCallback] = None,
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Specialist results for a near-duplicate article: everything from the
+    earlier screening except metadata, which describes this URL and is run
+    afresh (a metadata failure degrades as usual).
+    """
+    outputs = {
+        key: agent.output_type.model_validate(duplicate.outputs[key])
+        for key, agent in SPECIALIST_AGENTS.items()
+        if key != "metadata"
+    }
+    if on_result is not None:
+        for key, output in outputs.items():
+            on_result(key, output, None)
+    metadata_prompt = build_article_prompt(
+        screening_input.article_url, build_context_window(screening_input.article_text).text
+    )
+    metadata, degraded = await run_specialist_agents(
+        metadata_prompt, {"metadata": SPECIALIST_AGENTS["metadata"]}, on_result=on_result
+    )
+    return {**metadata, **outputs}, degraded
+
+
+def resolve_pipeline_mode(mode: Optional[str]) -> str:
+    mode = mode or PIPELINE_MODE
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode '{mode}'; expected one of {', '.join(PIPELINE_MODES)}")
+    return mode
+
+
+async def run_screening(
+    name: str,
+    dob: Optional[str],
+    url: str,
+    mode: Optional[str] = None,
+    on_event: Optional[EventCallback] = None,
+    include_timings: bool = False,
+) -> Dict[str, Any]:
+    """
+    Fetch the article and screen the subject against it. With
+    include_timings the response gains a `timings` block: seconds per
+    pipeline stage and per agent call made for this screening.
+    """
+    logger.info(
+        "Starting screening for subject='%s', dob='%s', url=%s",
+        name,
+        dob or "not provided",
+        url,
+    )
+
+    with collect_timings() as timings, stage_timer("screening"):
+        # 1) Fetch Article
+        try:
+            article_text = await fetch_article_text_async(url)
+            logger.info(f"Fetched article: length={len(article_text)} chars from {url}")
+        except Exception as e:
+            logger.error(f"Failed to fetch article: {e}")
+            raise
+
+        if on_event is not None:
+            on_event("article", {"url": url, "article_chars": len(article_text)})
+        result = await screen_article(ScreeningInput(name, dob, url, article_text), mode, on_event)
+    if include_timings:
+        result["timings"] = timings
+    return result
+
+
+async def screen_article(
+    screening_input: ScreeningInput,
+    mode: Optional[str] = None,
+    on_event: Optional[EventCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Run the agent pipeline over an article that has already been fetched and
+    cleaned. mode is "multi_agent" or "combined" (default: PIPELINE_MODE).
+    on_event, if given, receives "prefilter", "context" and one "agent"
+    event per specialist result as the pipeline progresses.
+    """
+    mode = resolve_pipeline_mode(mode)
+    article_text = screening_input.article_text
+
+    def emit(event: str, data: Dict[str, Any]) -> None:
+        if on_event is not None:
+            on_event(event, data)
+
+    def emit_result(key: str, output: Any, reason: Optional[str]) -> None:
+        emit("agent", {"key": key, "result": output.model_dump(), "degraded": reason})
+
+    def emit_article_stage(task: asyncio.Task) -> None:
+        if task.cancelled() or task.exception() is not None:
+            return
+        article_outputs, article_degraded = task.result()
+        for key, output in article_outputs.items():
+            emit_result(key, output, article_degraded.get(key))
+
+    # 1b) Cheap local check: no plausible mention of the subject -> no agents.
+    presence = None
+    if NAME_PREFILTER_ENABLED:
+        with stage_timer("prefilter"):
+            presence = find_name_presence(screening_input.subject_name, article_text)
+        if not presence.plausible:
+            logger.info(f"Name pre-filter skipped agents: {presence.reason}")
+            emit("prefilter", _prefilter_details(presence, skipped=True))
+            return _prefilter_skip_response(screening_input, presence)
+
+    with stage_timer("window"):
+        window = build_context_window(
+            article_text, screening_input.subject_name, screening_input.subject_date_of_birth
+        )
+    if window.windowed:
+        logger.info(f"Article context windowed: {window.report()}")
+    prompt = build_base_prompt(replace(screening_input, article_text=window.text))
+    emit("context", window.report())
+
+    logger.debug(f"Base prompt:\n{prompt}")
+
+    # 2) Specialist results: reused from a near-duplicate article already
+    #    screened for this subject, one combined call, or article-level and
+    #    subject-level agents running concurrently
+    signature, duplicate = None, None
+    # Results from a substitute model provider must never land in the shared index.
+    if get_near_duplicate_index() is not None and not substitute_provider_active():
+        with stage_timer("near_duplicate"):
+            signature, duplicate = await asyncio.to_thread(_find_near_duplicate, screening_input)
+        if duplicate is not None:
+            logger.info(
+                f"Near-duplicate of {duplicate.url} (similarity {duplicate.similarity:.2f}); reusing its results"
+            )
+
+    # 2b) Local DOB/age pass: the dob_age agent only runs when the evidence is
+    #     conflicting or not clearly about the subject. Scans the full text, not the window.
+    dob_age_local: Optional[DobAgeExtraction] = None
+    if DOB_AGE_LOCAL_ENABLED and duplicate is None and mode != "combined":
+        with stage_timer("dob_age_local"):
+            dob_age_local = extract_dob_age(
+                screening_input.subject_name, screening_input.subject_date_of_birth, article_text
+            )
+        logger.info(f"Local DOB/age pass: {dob_age_local.reason}")
+
+    with stage_timer("agents"):
+        if duplicate is not None:
+            outputs, degraded = await run_reused_specialists(screening_input, duplicate, on_result=emit_result)
+        elif mode == "combined":
+            outputs, degraded = await run_combined_extraction(prompt, on_result=emit_result)
+        else:
+            article_task = asyncio.create_task(
+                run_article_stage(screening_input.article_url, article_text)
+            )
+            if on_event is not None:
+                article_task.add_done_callback(emit_article_stage)
+            subject_agents = SUBJECT_AGENTS
+            if dob_age_local is not None and dob_age_local.result is not None:
+                subject_agents = {key: agent for key, agent in SUBJECT_AGENTS.items() if key != "dob_age"}
+                emit_result("dob_age", dob_age_local.result, None)
+            try:
+                subject_outputs, subject_degraded = await run_specialist_agents(
+                    prompt, subject_agents, on_result=emit_result
+                )
+                if subject_agents is not SUBJECT_AGENTS:
+                    subject_outputs["dob_age"] = dob_age_local.result
+                article_outputs, article_degraded = await article_task
+            finally:
+                if not article_task.done():
+                    article_task.cancel()
+                    await asyncio.gather(article_task, return_exceptions=True)
+            outputs = {**article_outputs, **subject_outputs}
+            degraded = {**article_degraded, **subject_degraded}
+    if signature is not None and not degraded:
+        await asyncio.to_thread(
+            get_near_duplicate_index().add,
+            screening_input.article_url,
+            signature,
+            subject_key(screening_input.subject_name, screening_input.subject_date_of_birth),
+            specialist_definitions_hash(),
+            {key: outputs[key].model_dump(mode="json") for key in SPECIALIST_AGENTS},
+        )
+    name_result = outputs["name_match"]
+    dob_result = outputs["dob_age"]
+    sentiment_result = outputs["sentiment"]
+
+    # 3) Final decision: local rules first, the LLM adjudicator for the ambiguous band
+    with stage_timer("decision"):
+        final, decision_source = await decide(name_result, dob_result, sentiment_result)
 
     # 4) Return unified JSON with all agent outputs for the UI
     return {
         **final.model_dump(),
         "details": {
-            "metadata": metadata_result.model_dump(),
-            "people": person_result.model_dump(),
-            "context": context_result.model_dump(),
-            "name_match": name_result.model_dump(),
-            "dob_age": dob_result.model_dump(),
-            "sentiment": sentiment_result.model_dump(),
-            "article_text": article_text,
+            **{key: outputs[key].model_dump() for key in SPECIALIST_AGENTS},
+            **_article_details(article_text),
+            "degraded": degraded,
+            "decision_source": decision_source,
+            "pipeline_mode": mode,
+            "context_window": window.report(),
+            **({"prefilter": _prefilter_details(presence, skipped=False)} if presence else {}),
+            **({"dob_age_source": dob_age_local.report()} if dob_age_local else {}),
+            **(
+                {"near_duplicate": duplicate.report([key for key in SPECIALIST_AGENTS if key != "metadata"])}
+                if duplicate
+                else {}
+            ),
         },
     }
@@ -0,0 +1,44 @@
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+from pipeline.orchestrator import run_screening
+
+logger = logging.getLogger("aml.streaming")
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+async def stream_screening(
+    name: str, dob: Optional[str], url: str, mode: Optional[str] = None
+) -> AsyncIterator[Event]:
+    """
+    Run a screening and yield (event, data) pairs as it progresses:
+    "article" once fetched, optionally "prefilter" and "context", one
+    "agent" per specialist result, then "result" (the full response) or
+    "error". Closing the generator early cancels the remaining agent calls.
+    """
+    queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue()
+    task = asyncio.create_task(
+        run_screening(name, dob, url, mode, on_event=lambda event, data: queue.put_nowait((event, data)))
+    )
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+    try:
+        while (item := await queue.get()) is not None:
+            yield item
+        if task.cancelled():
+            yield "error", {"detail": "Screening cancelled"}
+        elif task.exception() is not None:
+            yield "error", {"detail": f"Screening failed: {task.exception()}"}
+        else:
+            yield "result", task.result()
+    finally:
+        if not task.done():
+            logger.info(f"Stream for {url} closed early; cancelling screening")
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,216 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from config import (
+    ARTICLE_CONTEXT_TOKEN_BUDGET,
+    ARTICLE_LEAD_PASSAGES,
+    ARTICLE_PASSAGE_CHARS,
+    ARTICLE_PREFIX_CHARS,
+    CHARS_PER_TOKEN,
+    NAME_PREFILTER_SIMILARITY_THRESHOLD,
+)
+from pipeline.name_prefilter import name_tokens, name_variants, token_similarity, tokenize
+
+GAP_MARKER = "[…]"
+
+SENTENCE_BOUNDARY_RE = re.compile(r"(?<=[.!?])[\"'”’)]?\s+(?=[\"'“‘(]?[A-Z0-9])|(?<=[。！？])\s*")
+
+AGE_RE = re.compile(
+    r"\b\d{1,3}[- ]years?[- ]old\b|\baged \d{1,3}\b|\bage \d{1,3}\b|, \d{2},|"
+    r"\bborn (?:in|on)\b|\bdate of birth\b|\bd\.?o\.?b\b",
+    re.IGNORECASE,
+)
+YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+
+# Matched against normalized tokens: stems as prefixes, words exactly.
+ADVERSE_STEMS = (
+    "fraud", "launder", "corrupt", "brib", "sanction", "embezzl", "convict", "arrest", "sentenc",
+    "jail", "prison", "indict", "prosecut", "investigat", "penalt", "evasion", "evad", "smuggl",
+    "traffick", "terror", "scam", "ponzi", "misconduct", "extort", "forger", "theft", "seiz",
+    "confiscat", "disqualif", "regulator", "allegation", "alleged", "insider",
+)
+ADVERSE_WORDS = frozenset({"charged", "guilty", "fined", "stole", "stolen", "accused"})
+
+NAME_WEIGHT = 3.0
+AGE_WEIGHT = 2.0
+ADVERSE_WEIGHT = 1.0
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences within each line; a line break always ends a sentence."""
+    return [s for line in text.splitlines() for s in SENTENCE_BOUNDARY_RE.split(line) if s.strip()]
+
+
+def hard_split(text: str, max_chars: int) -> List[str]:
+    """Pieces of at most max_chars, cut at the last space when there is one in the second half."""
+    pieces: List[str] = []
+    while len(text) > max_chars:
+        cut = text.rfind(" ", max_chars // 2, max_chars + 1)
+        cut = cut if cut > 0 else max_chars
+        pieces.append(text[:cut])
+        text = text[cut:].lstrip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def split_passages(text: str, target_chars: int = ARTICLE_PASSAGE_CHARS) -> List[str]:
+    """
+    Group consecutive sentences into passages of roughly target_chars.
+    Sentences longer than that (unpunctuated runs, lists) are cut up, so no
+    passage is much over target_chars.
+    """
+    passages: List[str] = []
+    current: List[str] = []
+    size = 0
+    for sentence in (piece for s in split_sentences(text) for piece in hard_split(s, target_chars)):
+        if current and size + len(sentence) > target_chars:
+            passages.append(" ".join(current))
+            current, size = [], 0
+        current.append(sentence)
+        size += len(sentence) + 1
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+@dataclass
+class ContextWindow:
+    """Text sent to the agents, plus what was left out."""
+
+    text: str
+    source_chars: int
+    passages_total: int
+    passages_selected: int
+
+    @property
+    def windowed(self) -> bool:
+        return self.passages_selected < self.passages_total
+
+    def report(self) -> Dict[str, int]:
+        return {
+            "tokens_before": -(-self.source_chars // CHARS_PER_TOKEN),
+            "tokens_after": estimate_tokens(self.text),
+            "passages_total": self.passages_total,
+            "passages_selected": self.passages_selected,
+        }
+
+
+@dataclass(frozen=True)
+class SubjectTerms:
+    """Family names and given-name variants of the subject and any aliases."""
+
+    families: FrozenSet[str] = frozenset()
+    given: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_names(cls, names: Sequence[str]) -> "SubjectTerms":
+        families, given = set(), set()
+        for name in names:
+            tokens = name_tokens(name)
+            if not tokens:
+                continue
+            families.add(tokens[-1])
+            for token in tokens[:-1]:
+                given |= name_variants(token)
+        return cls(frozenset(families), frozenset(given - families))
+
+
+@lru_cache(maxsize=65536)
+def _resembles_family(families: FrozenSet[str], token: str, threshold: float) -> bool:
+    return any(token_similarity(family, token) >= threshold for family in families)
+
+
+def _name_hits(tokens: List[Tuple[str, str]], terms: SubjectTerms, threshold: float) -> int:
+    """Tokens that look like a family name or a given-name variant."""
+    hits = 0
+    for token, surface in tokens:
+        if token in terms.families or token in terms.given:
+            hits += 1
+        elif len(token) >= 3 and surface[0].isupper() and _resembles_family(terms.families, token, threshold):
+            hits += 1
+    return hits
+
+
+def score_passage(
+    passage: str,
+    terms: SubjectTerms = SubjectTerms(),
+    dob_years: Sequence[str] = (),
+    threshold: float = NAME_PREFILTER_SIMILARITY_THRESHOLD,
+) -> float:
+    """Relevance of one passage: subject name hits, then age/DOB phrases, then adverse terms."""
+    tokens = tokenize(passage)
+    name = _name_hits(tokens, terms, threshold) if terms.families else 0
+    age = len(AGE_RE.findall(passage)) + sum(1 for year in YEAR_RE.findall(passage) if year in dob_years)
+    adverse = sum(1 for token, _ in tokens if token in ADVERSE_WORDS or token.startswith(ADVERSE_STEMS))
+    return NAME_WEIGHT * min(name, 3) + AGE_WEIGHT * min(age, 2) + ADVERSE_WEIGHT * min(adverse, 3)
+
+
+def select_context(
+    article_text: str,
+    subject_name: Optional[str] = None,
+    subject_dob: Optional[str] = None,
+    aliases: Sequence[str] = (),
+    token_budget: int = ARTICLE_CONTEXT_TOKEN_BUDGET,
+    lead_passages: int = ARTICLE_LEAD_PASSAGES,
+) -> ContextWindow:
+    """
+    Token-budgeted context for the agents.
+
+    Articles that fit the budget are returned unchanged. Otherwise the lead
+    passages are kept, then the highest-scoring passages each followed by
+    their neighbours, until the budget is spent. Passages are emitted in
+    article order with a gap marker where text was dropped. Without a
+    subject the scoring uses age and adverse terms only. If nothing fits,
+    the window falls back to a plain prefix rather than an empty one.
+    """
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    if len(article_text) <= budget_chars:
+        return ContextWindow(article_text, len(article_text), 1, 1)
+
+    passages = split_passages(article_text, min(ARTICLE_PASSAGE_CHARS, budget_chars // 2))
+    terms = SubjectTerms.from_names([name for name in (subject_name, *aliases) if name])
+    dob_years = YEAR_RE.findall(subject_dob or "")
+    scores = [score_passage(p, terms, dob_years) for p in passages]
+
+    order = list(range(min(lead_passages, len(passages))))
+    for index in sorted(range(len(passages)), key=lambda i: (-scores[i], i)):
+        if scores[index] <= 0:
+            break
+        order.extend(i for i in (index, index - 1, index + 1) if 0 <= i < len(passages))
+
+    selected, used = set(), 0
+    for index in order:
+        if index in selected:
+            continue
+        cost = len(passages[index]) + len(GAP_MARKER) + 2
+        if used + cost > budget_chars:
+            continue
+        selected.add(index)
+        used += cost
+    if not selected:
+        return truncate_context(article_text, budget_chars)
+
+    parts: List[str] = []
+    previous = -1
+    for index in sorted(selected):
+        if index != previous + 1:
+            parts.append(GAP_MARKER)
+        parts.append(passages[index])
+        previous = index
+    if previous != len(passages) - 1:
+        parts.append(GAP_MARKER)
+
+    return ContextWindow(" ".join(parts), len(article_text), len(passages), len(selected))
+
+
+def truncate_context(article_text: str, max_chars: int = ARTICLE_PREFIX_CHARS) -> ContextWindow:
+    """Plain prefix of the article (windowing disabled, or nothing selected fits the budget)."""
+    text = article_text[:max_chars]
+    return ContextWindow(text, len(article_text), 1, 1 if text == article_text else 0)
@@ -0,0 +1,99 @@
+"""
+Process-wide resources owned by the API lifespan: opened and warmed before
+the first request is served, closed on shutdown.
+
+Every uvicorn worker runs this once. The caches that should be warm for all
+workers live on local disk under CACHE_ROOT (article cache files, agent
+results, near-duplicate signatures, result snapshots), so an entry one
+worker pays for is served to the others; only the small in-memory tiers in
+front of them are per process.
+"""
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+from config import (
+    API_WORKERS,
+    LLM_GOVERNOR_ENABLED,
+    LLM_MAX_CONCURRENCY,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_TOKENS_PER_MINUTE,
+)
+from logging_config import setup_logging
+from pipeline.agent_cache import close_agent_cache, get_agent_cache
+from pipeline.agent_runner import close_model_client, open_model_client
+from pipeline.article_stage import get_article_stage_cache
+from pipeline.governor import RateGovernor, get_governor, set_governor
+from pipeline.jobs import get_job_pool
+from pipeline.near_duplicates import close_near_duplicate_index, get_near_duplicate_index
+from pipeline.orchestrator import specialist_definitions_hash
+from scraping.cache import get_article_cache
+from scraping.fetcher import close_http_client, get_http_client, warm_clean_executor
+from utils.result_store import close_result_store, get_result_store
+
+logger = logging.getLogger("aml.resources")
+
+
+def _open_stores() -> None:
+    get_article_cache()
+    get_agent_cache()
+    get_near_duplicate_index()  # loads every stored signature
+    get_result_store()  # imports the legacy snapshots on first open
+    get_article_stage_cache()
+    specialist_definitions_hash()  # agent output schemas, used in every cache key
+
+
+def _close_stores() -> None:
+    close_agent_cache()
+    close_near_duplicate_index()
+    close_result_store()
+
+
+async def open_resources() -> Dict[str, float]:
+    """Open and warm every shared resource; returns seconds spent on each."""
+    setup_logging()
+    timings: Dict[str, float] = {}
+
+    @contextmanager
+    def timed(name: str):
+        started = time.perf_counter()
+        yield
+        timings[name] = round(time.perf_counter() - started, 3)
+
+    with timed("http_client"):
+        get_http_client()
+        await warm_clean_executor()
+    with timed("model_client"):
+        open_model_client()
+    with timed("governor"):
+        if LLM_GOVERNOR_ENABLED and API_WORKERS > 1:
+            set_governor(
+                RateGovernor(
+                    request_limit=LLM_REQUESTS_PER_MINUTE / API_WORKERS,
+                    token_limit=LLM_TOKENS_PER_MINUTE / API_WORKERS,
+                    max_concurrency=max(1, LLM_MAX_CONCURRENCY // API_WORKERS),
+                )
+            )
+        get_governor()
+    with timed("stores"):
+        await asyncio.to_thread(_open_stores)
+    with timed("jobs"):
+        job_pool = get_job_pool()
+        if job_pool is not None:
+            await job_pool.start()
+    logger.info(f"Resources ready in {sum(timings.values()):.2f}s: {timings}")
+    return timings
+
+
+async def close_resources() -> None:
+    """Stop the job workers, then release connection pools, worker processes and store handles."""
+    job_pool = get_job_pool()
+    if job_pool is not None:
+        await job_pool.stop()
+    await close_http_client()
+    await close_model_client()
+    await asyncio.to_thread(_close_stores)
+    set_governor(None)
+    logger.info("Resources closed")
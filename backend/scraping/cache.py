@@ -0,0 +1,291 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import (
+    ARTICLE_CACHE_DIR,
+    ARTICLE_CACHE_DISK_MAX_BYTES,
+    ARTICLE_CACHE_ENABLED,
+    ARTICLE_CACHE_MAX_AGE_SECONDS,
+    ARTICLE_CACHE_MEMORY_MAX_BYTES,
+    ARTICLE_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger("aml.article_cache")
+
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "at_medium", "at_campaign", "ocid"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical cache key: lower-case host, no default port, fragment or tracking params."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def hash_html(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedArticle:
+    url: str
+    html_sha256: str
+    text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    nbytes: int = 0
+
+    @classmethod
+    def create(
+        cls, url: str, html_sha256: str, text: str, etag: Optional[str], last_modified: Optional[str]
+    ) -> "CachedArticle":
+        return cls(
+            url=url,
+            html_sha256=html_sha256,
+            text=text,
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=time.time(),
+            nbytes=len(text.encode("utf-8")) + len(url) + 128,
+        )
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def revalidated(self, etag: Optional[str], last_modified: Optional[str]) -> "CachedArticle":
+        """Copy with a fresh validation time after a 304 Not Modified."""
+        return replace(
+            self,
+            etag=etag or self.etag,
+            last_modified=last_modified or self.last_modified,
+            fetched_at=time.time(),
+        )
+
+
+class ArticleCache:
+    """
+    Two-tier cache of cleaned article text keyed by normalized URL.
+
+    - Memory: LRU bounded by approximate byte size.
+    - Disk: one JSON file per URL, evicted oldest-first past a byte budget.
+
+    Entries younger than ttl_seconds are served without touching the origin;
+    older ones are revalidated with ETag / If-Modified-Since. Entries older
+    than max_age_seconds are dropped outright.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path],
+        memory_max_bytes: int = ARTICLE_CACHE_MEMORY_MAX_BYTES,
+        disk_max_bytes: int = ARTICLE_CACHE_DISK_MAX_BYTES,
+        ttl_seconds: float = ARTICLE_CACHE_TTL_SECONDS,
+        max_age_seconds: float = ARTICLE_CACHE_MAX_AGE_SECONDS,
+    ):
+        self.directory = Path(directory) if directory else None
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_age_seconds = max_age_seconds
+
+        self._memory: "OrderedDict[str, CachedArticle]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "revalidated": 0,
+            "refetched_unchanged": 0,
+            "refetched_changed": 0,
+            "expired": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+
+    # ---- lookups -------------------------------------------------------
+
+    def get(self, url: str) -> Optional[CachedArticle]:
+        """Return the entry for a normalized URL, promoting disk hits into memory."""
+        with self._lock:
+            entry = self._memory.get(url)
+            if entry is not None:
+                self._memory.move_to_end(url)
+                if self._expired(entry):
+                    self._drop(url)
+                    return None
+                self._counters["memory_hits"] += 1
+                return entry
+
+        entry = self._read_disk(url)
+        with self._lock:
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            if self._expired(entry):
+                self._drop(url)
+                return None
+            self._counters["disk_hits"] += 1
+            self._put_memory(entry)
+        return entry
+
+    def is_fresh(self, entry: CachedArticle) -> bool:
+        return time.time() - entry.fetched_at < self.ttl_seconds
+
+    def record(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                **self._counters,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes or 0,
+            }
+
+    # ---- writes --------------------------------------------------------
+
+    def put(self, entry: CachedArticle) -> None:
+        with self._lock:
+            self._put_memory(entry)
+        self._write_disk(entry)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if self.directory and self.directory.exists():
+            for path in self.directory.glob("*/*.json"):
+                path.unlink(missing_ok=True)
+            self._disk_bytes = 0
+
+    # ---- internals -----------------------------------------------------
+
+    def _expired(self, entry: CachedArticle) -> bool:
+        if time.time() - entry.fetched_at <= self.max_age_seconds:
+            return False
+        self._counters["expired"] += 1
+        return True
+
+    def _drop(self, url: str) -> None:
+        entry = self._memory.pop(url, None)
+        if entry is not None:
+            self._memory_bytes -= entry.nbytes
+        if self.directory:
+            self._path_for(url).unlink(missing_ok=True)
+
+    def _put_memory(self, entry: CachedArticle) -> None:
+        previous = self._memory.pop(entry.url, None)
+        if previous is not None:
+            self._memory_bytes -= previous.nbytes
+        if entry.nbytes > self.memory_max_bytes:
+            return
+        self._memory[entry.url] = entry
+        self._memory_bytes += entry.nbytes
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted.nbytes
+            self._counters["memory_evictions"] += 1
+
+    def _path_for(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def _read_disk(self, url: str) -> Optional[CachedArticle]:
+        if not self.directory:
+            return None
+        path = self._path_for(url)
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                entry = CachedArticle(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+        return entry if entry.url == url else None
+
+    def _write_disk(self, entry: CachedArticle) -> None:
+        if not self.directory:
+            return
+        path = self._path_for(entry.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        previous_size = path.stat().st_size if path.exists() else 0
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(asdict(entry), f)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+            else:
+                self._disk_bytes += path.stat().st_size - previous_size
+            over_budget = self._disk_bytes > self.disk_max_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _disk_files(self) -> List[Tuple[float, int, Path]]:
+        """(mtime, size, path) of each cached file, stat'ed once; files removed meanwhile are skipped."""
+        files = []
+        for path in self.directory.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # evicted or replaced by another worker since the glob
+            files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def _evict_disk(self) -> None:
+        """Remove least recently written files until the tier is at 90% of its budget."""
+        files = sorted(self._disk_files(), key=lambda item: item[0])
+        total = sum(size for _, size, _ in files)
+        target = int(self.disk_max_bytes * 0.9)
+        evicted = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self._counters["disk_evictions"] += evicted
+        logger.info(f"Evicted {evicted} article cache files from {self.directory}")
+
+
+_article_cache: Optional[ArticleCache] = None
+
+
+def get_article_cache() -> Optional[ArticleCache]:
+    """Process-wide article cache, or None when disabled in config."""
+    global _article_cache
+    if not ARTICLE_CACHE_ENABLED:
+        return None
+    if _article_cache is None:
+        _article_cache = ArticleCache(Path(ARTICLE_CACHE_DIR) if ARTICLE_CACHE_DIR else None)
+    return _article_cache
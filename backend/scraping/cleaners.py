@@ -1,6 +1,10 @@
 import re
 from bs4 import BeautifulSoup
-from typing import List
+from lxml import etree
+from lxml import html as lxml_html
+from typing import FrozenSet, Iterable, List, Optional, Tuple
+
+from config import CLEANER_ENGINE, MAX_ARTICLE_CHARS
 
 NOISE_SELECTORS = [
     "script",
@@ -61,11 +65,24 @@ def extract_main_content(soup: BeautifulSoup) -> str:
     return soup.body.get_text(separator="\n", strip=True) if soup.body else ""
 
 
-def clean_html_to_text(html: str, max_chars: int = 16000) -> str:
+def clean_html_to_text(
+    html: str, max_chars: Optional[int] = MAX_ARTICLE_CHARS, engine: str = CLEANER_ENGINE
+) -> str:
     """
     Convert HTML into clean, deduplicated article text suitable for LLM processing.
     This is the main function the orchestrator should call.
+    Pass max_chars=None to keep the full text. engine is "lxml" or "bs4";
+    both produce the same text.
     """
+    if engine == "lxml":
+        return clean_html_to_text_lxml(html, max_chars)
+    if engine == "bs4":
+        return clean_html_to_text_bs4(html, max_chars)
+    raise ValueError(f"Unknown cleaner engine '{engine}'; expected 'lxml' or 'bs4'")
+
+
+def clean_html_to_text_bs4(html: str, max_chars: Optional[int] = MAX_ARTICLE_CHARS) -> str:
+    """Reference cleaner: BeautifulSoup with html.parser and one select() per selector."""
     soup = BeautifulSoup(html, "html.parser")
 
     # Remove all noise nodes
@@ -85,3 +102,122 @@ def clean_html_to_text(html: str, max_chars: int = 16000) -> str:
     text = normalize_whitespace(text)
 
     return text[:max_chars]
+
+
+# --- lxml engine -----------------------------------------------------------
+# Same selectors, compiled to plain lookups so one tree walk can prune every
+# noise node and find every content candidate.
+
+
+def _compile_selector(selector: str) -> Tuple[str, str]:
+    match = re.fullmatch(r"\[(\w+)='([^']*)'\]", selector)
+    if match:
+        return ("attr:" + match.group(1), match.group(2))
+    if selector.startswith("."):
+        return ("class", selector[1:])
+    if selector.startswith("#"):
+        return ("id", selector[1:])
+    if re.fullmatch(r"[a-z][a-z0-9]*", selector):
+        return ("tag", selector)
+    raise ValueError(f"Selector '{selector}' is not supported by the lxml cleaner")
+
+
+_NOISE_RULES = [_compile_selector(s) for s in NOISE_SELECTORS]
+NOISE_TAGS: FrozenSet[str] = frozenset(v for kind, v in _NOISE_RULES if kind == "tag")
+NOISE_CLASSES: FrozenSet[str] = frozenset(v for kind, v in _NOISE_RULES if kind == "class")
+if len(NOISE_TAGS) + len(NOISE_CLASSES) != len(NOISE_SELECTORS):
+    raise ValueError("NOISE_SELECTORS may only contain tag and class selectors")
+CONTENT_RULES = [_compile_selector(s) for s in CONTENT_SELECTORS]
+
+# html.parser keeps these strings out of get_text(); their tails still count.
+TEXTLESS_TAGS = frozenset({"script", "style", "template", "rt", "rp"})
+
+_BODY_TAG_RE = re.compile(r"<body[\s>/]", re.IGNORECASE)
+
+
+def _matches(rule: Tuple[str, str], element) -> bool:
+    kind, value = rule
+    if kind == "tag":
+        return element.tag == value
+    if kind == "class":
+        return value in element.get("class", "").split()
+    if kind == "id":
+        return element.get("id") == value
+    return element.get(kind[5:]) == value
+
+
+def _parse_lxml(html: str):
+    try:
+        return lxml_html.document_fromstring(html)
+    except ValueError:
+        # str input carrying an <?xml encoding=...?> declaration
+        return lxml_html.document_fromstring(
+            html.encode("utf-8"), parser=lxml_html.HTMLParser(encoding="utf-8")
+        )
+    except etree.ParserError:
+        return None  # empty document
+
+
+def _text_lines(strings: Iterable[str]) -> List[str]:
+    """Per-string strip, split, whitespace collapse, tiny-fragment and duplicate removal."""
+    seen = set()
+    lines = []
+    for string in strings:
+        string = string.strip()
+        if not string:
+            continue
+        for line in string.split("\n"):
+            line = " ".join(line.split())
+            if len(line) <= 2:
+                continue
+            key = line.lower()
+            if key in seen:
+                continue
+            seen.add(key)
+            lines.append(line)
+    return lines
+
+
+def clean_html_to_text_lxml(html: str, max_chars: Optional[int] = MAX_ARTICLE_CHARS) -> str:
+    """
+    Single-pass equivalent of clean_html_to_text_bs4 on lxml.
+
+    One walk clears every noise element (keeping its tail text, as
+    decompose() does) and records the first match for each content
+    selector outside the noise; text is then streamed from the chosen
+    region straight into the line filter.
+    """
+    root = _parse_lxml(html)
+    if root is None:
+        return ""
+
+    candidates = [None] * len(CONTENT_RULES)
+    body = None
+    walker = etree.iterwalk(root, events=("start",))
+    for _, element in walker:
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue  # comments and processing instructions
+        if (
+            tag in NOISE_TAGS
+            or tag in TEXTLESS_TAGS
+            or not NOISE_CLASSES.isdisjoint(element.get("class", "").split())
+        ):
+            walker.skip_subtree()
+            element.clear(keep_tail=True)
+            continue
+        if tag == "body" and body is None:
+            body = element
+        for index, rule in enumerate(CONTENT_RULES):
+            if candidates[index] is None and _matches(rule, element):
+                candidates[index] = element
+
+    region = next((c for c in candidates if c is not None), None)
+    if region is None:
+        # libxml2 always synthesises <body>; html.parser only has one if the page does.
+        region = body if _BODY_TAG_RE.search(html) else None
+    if region is None:
+        return ""
+
+    text = " ".join(_text_lines(region.itertext()))
+    return text[:max_chars]
@@ -0,0 +1,102 @@
+import codecs
+import re
+from typing import Optional, Tuple
+
+from charset_normalizer import from_bytes
+
+from config import FETCH_CHARSET_PRESCAN_BYTES, FETCH_HTML_CONTENT_TYPES
+
+CHARSET_PARAM_RE = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.IGNORECASE)
+META_CHARSET_RE = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.IGNORECASE)
+
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+
+# Leading bytes of formats that turn up behind article links.
+BINARY_SIGNATURES = (b"%PDF-", b"PK\x03\x04", b"\x89PNG", b"GIF8", b"\xff\xd8\xff", b"\xd0\xcf\x11\xe0")
+
+# Browsers decode these labels as windows-1252, and so do servers' pages.
+WINDOWS_1252_ALIASES = {"iso8859-1", "ascii"}
+
+# Bytes handed to charset detection when nothing is declared.
+DETECTION_SAMPLE_BYTES = 64 * 1024
+
+
+class UnsupportedContentError(ValueError):
+    """Raised when a response is not an HTML page (by Content-Type or leading bytes)."""
+
+
+def media_type(content_type: Optional[str]) -> str:
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def check_content_type(content_type: Optional[str]) -> None:
+    """Reject declared non-HTML media types; a missing header is allowed."""
+    declared = media_type(content_type)
+    if declared and declared not in FETCH_HTML_CONTENT_TYPES:
+        raise UnsupportedContentError(f"Unsupported content type {declared!r}")
+
+
+def check_leading_bytes(head: bytes) -> None:
+    """Reject binary bodies served with an HTML (or no) Content-Type."""
+    if any(head.startswith(bom) for bom, _ in BOMS):
+        return
+    stripped = head.lstrip()
+    if stripped.startswith(BINARY_SIGNATURES) or b"\x00" in head[:1024]:
+        raise UnsupportedContentError("Response body is binary, not HTML")
+
+
+def _codec(label: Optional[str]) -> Optional[str]:
+    if not label:
+        return None
+    try:
+        name = codecs.lookup(label.strip().lower()).name
+    except LookupError:
+        return None
+    return "cp1252" if name in WINDOWS_1252_ALIASES else name
+
+
+def declared_charset(content_type: Optional[str]) -> Optional[str]:
+    match = CHARSET_PARAM_RE.search(content_type or "")
+    return _codec(match.group(1)) if match else None
+
+
+def meta_charset(head: bytes) -> Optional[str]:
+    match = META_CHARSET_RE.search(head[:FETCH_CHARSET_PRESCAN_BYTES])
+    return _codec(match.group(1).decode("ascii", "ignore")) if match else None
+
+
+def _utf8_prefix(body: bytes) -> Optional[str]:
+    """Strict UTF-8 decode that tolerates a sequence cut off at the end of a truncated body."""
+    try:
+        return codecs.getincrementaldecoder("utf-8")("strict").decode(body, final=False)
+    except UnicodeDecodeError:
+        return None
+
+
+def decode_html(body: bytes, content_type: Optional[str] = None) -> Tuple[str, str]:
+    """
+    Decode an HTML body, returning (text, encoding).
+
+    Order, as browsers do it: byte-order mark, Content-Type charset,
+    <meta charset> in the first few KB, strict UTF-8, then detection over a
+    sample of the body (windows-1252 if that finds nothing).
+    """
+    for bom, name in BOMS:
+        if body.startswith(bom):
+            return body[len(bom):].decode(name, "replace"), name
+    encoding = declared_charset(content_type) or meta_charset(body)
+    if encoding is not None:
+        return body.decode(encoding, "replace"), encoding
+
+    text = _utf8_prefix(body)
+    if text is not None:
+        return text, "utf-8"
+
+    best = from_bytes(body[:DETECTION_SAMPLE_BYTES]).best()
+    encoding = _codec(best.encoding) if best is not None else None
+    encoding = encoding or "cp1252"
+    return body.decode(encoding, "replace"), encoding
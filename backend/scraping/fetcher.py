@@ -1,9 +1,308 @@
-from scraping.cleaners import clean_html_to_text
+import asyncio
+import importlib.util
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import httpx
 import requests
 
-def fetch_article_text(url: str, max_chars: int = 16000) -> str:
-    resp = requests.get(url, timeout=15)
-    resp.raise_for_status()
+from config import (
+    CLEAN_WORKERS,
+    FETCH_BYTES_PER_TEXT_CHAR,
+    FETCH_CHUNK_BYTES,
+    FETCH_KEEPALIVE_EXPIRY_SECONDS,
+    FETCH_MAX_CONNECTIONS,
+    FETCH_MAX_BYTES,
+    FETCH_MIN_BYTES,
+    FETCH_RESPECT_ROBOTS,
+    FETCH_THROTTLE_RETRIES,
+    FETCH_TIMEOUT_SECONDS,
+    FETCH_USER_AGENT,
+    MAX_ARTICLE_CHARS,
+)
+from scraping.cache import CachedArticle, get_article_cache, hash_html, normalize_url
+from scraping.cleaners import clean_html_to_text
+from scraping.decoding import check_content_type, check_leading_bytes, decode_html
+from scraping.politeness import FetchScheduler, parse_retry_after
+from utils.metrics import stage_timer
+
+logger = logging.getLogger("aml.fetcher")
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_transport: Optional[httpx.AsyncBaseTransport] = None
+_clean_executor: Optional[ProcessPoolExecutor] = None
+_scheduler: Optional[FetchScheduler] = None
+
+# Statuses that mean "too fast": the host is backed off and the download retried.
+THROTTLE_STATUSES = (429, 503)
+
+
+def byte_budget(max_chars: Optional[int] = MAX_ARTICLE_CHARS) -> int:
+    """Raw HTML bytes worth reading to recover max_chars of article text."""
+    if max_chars is None:
+        return FETCH_MAX_BYTES
+    return min(FETCH_MAX_BYTES, max(max_chars * FETCH_BYTES_PER_TEXT_CHAR, FETCH_MIN_BYTES))
+
+
+class BodyReader:
+    """Accumulates a streamed body up to max_bytes, rejecting binary content on the first chunk."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.truncated = False
+        self._chunks: List[bytes] = []
+
+    def feed(self, chunk: bytes) -> bool:
+        """Add a chunk; returns False once the budget is reached and reading should stop."""
+        if not chunk:
+            return True
+        if not self._chunks:
+            check_leading_bytes(chunk)
+        chunk = chunk[: self.max_bytes - self.size]
+        self._chunks.append(chunk)
+        self.size += len(chunk)
+        self.truncated = self.size >= self.max_bytes
+        return not self.truncated
 
-    html = resp.text
+    def body(self) -> bytes:
+        return b"".join(self._chunks)
+
+
+@dataclass
+class Download:
+    url: str
+    status_code: int
+    headers: httpx.Headers
+    html: str
+    encoding: Optional[str] = None
+    truncated: bool = False
+
+
+def _decode(url: str, reader: BodyReader, content_type: Optional[str]) -> Tuple[str, str]:
+    if reader.truncated:
+        logger.info(f"Stopped reading {url} at {reader.size} bytes (budget {reader.max_bytes})")
+    return decode_html(reader.body(), content_type)
+
+
+def fetch_article_text(url: str, max_chars: int = MAX_ARTICLE_CHARS) -> str:
+    """Blocking fetch + clean, for scripts and callers outside an event loop."""
+    headers = {"User-Agent": FETCH_USER_AGENT}
+    with requests.get(url, headers=headers, timeout=FETCH_TIMEOUT_SECONDS, stream=True) as resp:
+        resp.raise_for_status()
+        content_type = resp.headers.get("Content-Type")
+        check_content_type(content_type)
+        reader = BodyReader(byte_budget(max_chars))
+        for chunk in resp.iter_content(FETCH_CHUNK_BYTES):
+            if not reader.feed(chunk):
+                break
+
+    html, _ = _decode(url, reader, content_type)
     return clean_html_to_text(html, max_chars=max_chars)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared keep-alive client; created on first use, closed by close_http_client()."""
+    global _client, _client_loop, _scheduler
+    loop = asyncio.get_running_loop()
+    if _client is not None and _client_loop is not loop:
+        # Pooled connections belong to the loop that opened them.
+        _client = None
+        _scheduler = None
+    if _client is None or _client.is_closed:
+        _client_loop = loop
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=FETCH_TIMEOUT_SECONDS,
+            follow_redirects=True,
+            headers={"User-Agent": FETCH_USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=FETCH_MAX_CONNECTIONS,
+                max_keepalive_connections=FETCH_MAX_CONNECTIONS,
+                keepalive_expiry=FETCH_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            transport=_transport,
+        )
+        logger.info(f"Opened HTTP client pool (http2={HTTP2_AVAILABLE})")
+    return _client
+
+
+def set_http_transport(transport: Optional[httpx.AsyncBaseTransport]) -> None:
+    """
+    Route the shared client through a custom transport (e.g. the offline
+    replay harness); None restores the network. Takes effect on the next
+    client created, so call it before fetching or after close_http_client().
+    """
+    global _transport, _client, _scheduler
+    _transport = transport
+    _client = None
+    _scheduler = None
+
+
+def _get_clean_executor() -> ProcessPoolExecutor:
+    global _clean_executor
+    if _clean_executor is None:
+        # API workers are started with "spawn", which their own pools would inherit,
+        # re-importing the whole app in every cleaning process; fork where available.
+        context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+        _clean_executor = ProcessPoolExecutor(max_workers=CLEAN_WORKERS, mp_context=context)
+    return _clean_executor
+
+
+async def warm_clean_executor() -> None:
+    """Start the cleaning worker processes up front so the first screenings don't pay for it."""
+    loop = asyncio.get_running_loop()
+    executor = _get_clean_executor()
+    await asyncio.gather(
+        *(loop.run_in_executor(executor, clean_html_to_text, "") for _ in range(CLEAN_WORKERS))
+    )
+
+
+async def close_http_client() -> None:
+    """Release pooled connections and the cleaning worker processes."""
+    global _client, _clean_executor, _scheduler
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Closed HTTP client pool")
+    if _clean_executor is not None:
+        _clean_executor.shutdown(wait=False, cancel_futures=True)
+        _clean_executor = None
+    _scheduler = None
+
+
+def get_fetch_scheduler() -> FetchScheduler:
+    """Per-host politeness scheduler; lives as long as the shared client (and its loop)."""
+    global _scheduler
+    get_http_client()
+    if _scheduler is None:
+        _scheduler = FetchScheduler()
+    return _scheduler
+
+
+async def _fetch_robots(robots_url: str) -> Tuple[int, str]:
+    resp = await get_http_client().get(robots_url)
+    return resp.status_code, resp.text
+
+
+async def download(
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    max_bytes: int = FETCH_MAX_BYTES,
+) -> Download:
+    """
+    Stream a page through the shared pool under the per-host politeness
+    scheduler (robots.txt, per-host caps and spacing, backoff). Error
+    statuses raise, after up to FETCH_THROTTLE_RETRIES retries of a 429/503;
+    non-HTML responses raise UnsupportedContentError before (or on the first
+    chunk of) the body, and reading stops after max_bytes. A 304 comes back
+    with an empty body.
+    """
+    with stage_timer("download"):
+        scheduler = get_fetch_scheduler()
+        if FETCH_RESPECT_ROBOTS:
+            await scheduler.check_robots(url, _fetch_robots)
+        for attempt in range(FETCH_THROTTLE_RETRIES + 1):
+            async with scheduler.slot(url):
+                try:
+                    result = await _stream(url, headers, max_bytes, retry=attempt < FETCH_THROTTLE_RETRIES)
+                except httpx.TimeoutException:
+                    scheduler.throttled(url)
+                    raise
+                except httpx.HTTPStatusError as exc:
+                    if exc.response.status_code in THROTTLE_STATUSES:
+                        scheduler.throttled(url, parse_retry_after(exc.response.headers))
+                    raise
+            if isinstance(result, Download):
+                scheduler.succeeded(url)
+                return result
+            # Throttled: back the host off; the retry waits for it in the scheduler.
+            delay = scheduler.throttled(url, result)
+            logger.info(f"{url} throttled; retry {attempt + 1}/{FETCH_THROTTLE_RETRIES} after {delay:.1f}s")
+
+
+async def _stream(url: str, headers: Optional[Dict[str, str]], max_bytes: int, retry: bool):
+    """The Download, or the Retry-After (possibly None) of a throttled response when retry is allowed."""
+    async with get_http_client().stream("GET", url, headers=headers) as resp:
+        if resp.status_code == 304:
+            return Download(url, 304, resp.headers, "")
+        if retry and resp.status_code in THROTTLE_STATUSES:
+            return parse_retry_after(resp.headers)
+        resp.raise_for_status()
+        content_type = resp.headers.get("Content-Type")
+        check_content_type(content_type)
+        reader = BodyReader(max_bytes)
+        async for chunk in resp.aiter_bytes(FETCH_CHUNK_BYTES):
+            if not reader.feed(chunk):
+                break
+
+    html, encoding = _decode(url, reader, content_type)
+    return Download(url, resp.status_code, resp.headers, html, encoding, reader.truncated)
+
+
+async def fetch_article_html_async(url: str, max_bytes: int = FETCH_MAX_BYTES) -> str:
+    """Download a page's HTML, decoded and capped at max_bytes."""
+    return (await download(url, max_bytes=max_bytes)).html
+
+
+async def clean_html_async(html: str, max_chars: Optional[int] = MAX_ARTICLE_CHARS) -> str:
+    """Run clean_html_to_text in the cleaning executor so parsing never blocks the loop."""
+    loop = asyncio.get_running_loop()
+    with stage_timer("clean"):
+        return await loop.run_in_executor(_get_clean_executor(), clean_html_to_text, html, max_chars)
+
+
+async def fetch_article_text_async(url: str, max_chars: int = MAX_ARTICLE_CHARS) -> str:
+    """
+    Non-blocking equivalent of fetch_article_text for use inside the API.
+    Goes through the article cache when enabled: fresh entries skip the
+    network, stale ones are revalidated, unchanged bodies skip re-cleaning.
+    """
+    with stage_timer("fetch"):
+        return await _fetch_article_text(url, max_chars)
+
+
+async def _fetch_article_text(url: str, max_chars: int) -> str:
+    # Pages served by a substitute transport must never land in the shared cache.
+    cache = get_article_cache() if _transport is None else None
+    if cache is None:
+        html = await fetch_article_html_async(url, max_bytes=byte_budget(max_chars))
+        return await clean_html_async(html, max_chars=max_chars)
+
+    key = normalize_url(url)
+    cached = await asyncio.to_thread(cache.get, key)
+    if cached is not None and cache.is_fresh(cached):
+        return cached.text[:max_chars]
+
+    # Cached text is shared by every caller, so read enough for the full text budget.
+    resp = await download(
+        url,
+        headers=cached.conditional_headers() if cached else None,
+        max_bytes=byte_budget(MAX_ARTICLE_CHARS),
+    )
+    etag = resp.headers.get("ETag")
+    last_modified = resp.headers.get("Last-Modified")
+
+    if resp.status_code == 304 and cached is not None:
+        cache.record("revalidated")
+        entry = cached.revalidated(etag, last_modified)
+    else:
+        html = resp.html
+        html_sha256 = hash_html(html)
+        if cached is not None and cached.html_sha256 == html_sha256:
+            cache.record("refetched_unchanged")
+            text = cached.text
+        else:
+            if cached is not None:
+                cache.record("refetched_changed")
+            text = await clean_html_async(html, max_chars=None)
+        entry = CachedArticle.create(key, html_sha256, text, etag, last_modified)
+
+    await asyncio.to_thread(cache.put, entry)
+    return entry.text[:max_chars]
@@ -0,0 +1,235 @@
+"""
+Per-host politeness for article downloads.
+
+FetchScheduler admits downloads under a global cap and, per host, a
+concurrency cap and a minimum interval between request starts (raised to
+the site's robots.txt Crawl-delay when that is longer). A 429/503 or a
+timeout from a host pushes that host back with an adaptive, doubling
+backoff (or its Retry-After); successes shrink it again.
+
+Hosts waiting for a slot are served round-robin, and a download waiting on
+its host's limits holds no global slot, so one slow or throttled domain
+cannot starve the others. robots.txt is fetched once per host and cached.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+from config import (
+    FETCH_HOST_BACKOFF_BASE_SECONDS,
+    FETCH_HOST_BACKOFF_MAX_SECONDS,
+    FETCH_HOST_MIN_INTERVAL_SECONDS,
+    FETCH_MAX_CONCURRENCY,
+    FETCH_MAX_CONNECTIONS_PER_HOST,
+    FETCH_MAX_CRAWL_DELAY_SECONDS,
+    FETCH_ROBOTS_ERROR_TTL_SECONDS,
+    FETCH_ROBOTS_TTL_SECONDS,
+    FETCH_USER_AGENT,
+)
+
+logger = logging.getLogger("aml.politeness")
+
+# Fetches a robots.txt URL and returns (status code, body text).
+RobotsFetcher = Callable[[str], Awaitable[Tuple[int, str]]]
+
+
+class DisallowedByRobotsError(ValueError):
+    """The site's robots.txt does not allow FETCH_USER_AGENT to fetch this URL."""
+
+
+def host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}"
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds asked for by retry-after-ms or Retry-After (delta-seconds or HTTP date), if any."""
+    millis = headers.get("retry-after-ms")
+    if millis:
+        try:
+            return max(0.0, float(millis) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class HostState:
+    in_flight: int = 0
+    next_start: float = 0.0
+    backoff: float = 0.0
+    crawl_delay: float = 0.0
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+    robots: Optional[RobotFileParser] = None
+    robots_expires: float = 0.0
+    robots_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class FetchScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = FETCH_MAX_CONCURRENCY,
+        per_host_concurrency: int = FETCH_MAX_CONNECTIONS_PER_HOST,
+        min_interval: float = FETCH_HOST_MIN_INTERVAL_SECONDS,
+        backoff_base: float = FETCH_HOST_BACKOFF_BASE_SECONDS,
+        backoff_max: float = FETCH_HOST_BACKOFF_MAX_SECONDS,
+        user_agent: str = FETCH_USER_AGENT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.min_interval = min_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.user_agent = user_agent
+        self.clock = clock
+        self.in_flight = 0
+        self.hosts: Dict[str, HostState] = {}
+        # Hosts with waiters, in service order.
+        self._rotation: Deque[str] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def host(self, url: str) -> HostState:
+        key = host_key(url)
+        state = self.hosts.get(key)
+        if state is None:
+            state = self.hosts[key] = HostState()
+        return state
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hosts": len(self.hosts),
+            "in_flight": self.in_flight,
+            "waiting": sum(len(state.waiters) for state in self.hosts.values()),
+            "backing_off": sum(1 for state in self.hosts.values() if state.backoff),
+        }
+
+    # -- robots.txt ---------------------------------------------------------
+
+    async def check_robots(self, url: str, fetch: RobotsFetcher) -> None:
+        """Raise DisallowedByRobotsError when robots.txt forbids url; adopts the host's Crawl-delay."""
+        state = self.host(url)
+        async with state.robots_lock:
+            if state.robots is None or self.clock() >= state.robots_expires:
+                await self._load_robots(url, state, fetch)
+        if not state.robots.can_fetch(self.user_agent, url):
+            raise DisallowedByRobotsError(f"robots.txt disallows {url}")
+
+    async def _load_robots(self, url: str, state: HostState, fetch: RobotsFetcher) -> None:
+        robots_url = f"{host_key(url)}/robots.txt"
+        parser = RobotFileParser(robots_url)
+        ttl = FETCH_ROBOTS_TTL_SECONDS
+        try:
+            status, text = await fetch(robots_url)
+        except Exception as exc:
+            status, text = None, ""
+            logger.info(f"robots.txt unavailable for {host_key(url)} ({exc}); allowing")
+        if status is not None and 200 <= status < 300:
+            parser.parse(text.splitlines())
+        else:
+            # A missing robots.txt allows everything; an unreachable one is retried sooner.
+            parser.parse([])
+            if status is None or status >= 500:
+                ttl = FETCH_ROBOTS_ERROR_TTL_SECONDS
+        delay = parser.crawl_delay(self.user_agent)
+        state.crawl_delay = min(float(delay), FETCH_MAX_CRAWL_DELAY_SECONDS) if delay else 0.0
+        state.robots = parser
+        state.robots_expires = self.clock() + ttl
+
+    # -- admission ----------------------------------------------------------
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        await self.acquire(url)
+        try:
+            yield
+        finally:
+            self.release(url)
+
+    async def acquire(self, url: str) -> None:
+        key = host_key(url)
+        state = self.host(url)
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        if key not in self._rotation:
+            self._rotation.append(key)
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release(url)
+            elif waiter in state.waiters:
+                state.waiters.remove(waiter)
+            raise
+
+    def release(self, url: str) -> None:
+        state = self.host(url)
+        state.in_flight -= 1
+        self.in_flight -= 1
+        self._dispatch()
+
+    def throttled(self, url: str, retry_after: Optional[float] = None) -> float:
+        """The host refused or stalled: double its backoff (or honour Retry-After); returns the delay."""
+        state = self.host(url)
+        state.backoff = min(self.backoff_max, max(self.backoff_base, state.backoff * 2))
+        delay = min(self.backoff_max, max(state.backoff, retry_after or 0.0))
+        state.next_start = max(state.next_start, self.clock() + delay)
+        logger.warning(f"Backing off {host_key(url)} for {delay:.1f}s")
+        return delay
+
+    def succeeded(self, url: str) -> None:
+        state = self.host(url)
+        if state.backoff:
+            state.backoff = state.backoff / 2 if state.backoff / 2 >= self.backoff_base else 0.0
+
+    def _interval(self, state: HostState) -> float:
+        return max(self.min_interval, state.crawl_delay)
+
+    def _dispatch(self) -> None:
+        """Grant free slots round-robin over hosts whose own limits allow a start now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        now = self.clock()
+        next_ready: Optional[float] = None
+        passed = 0
+        while self._rotation and self.in_flight < self.max_concurrency and passed < len(self._rotation):
+            key = self._rotation.popleft()
+            state = self.hosts[key]
+            while state.waiters and state.waiters[0].done():
+                state.waiters.popleft()
+            if not state.waiters:
+                continue
+            if state.in_flight < self.per_host_concurrency and now >= state.next_start:
+                waiter = state.waiters.popleft()
+                waiter.set_result(None)
+                state.in_flight += 1
+                self.in_flight += 1
+                state.next_start = now + self._interval(state)
+                passed = 0
+            else:
+                passed += 1
+                if state.in_flight < self.per_host_concurrency:
+                    next_ready = state.next_start if next_ready is None else min(next_ready, state.next_start)
+            if state.waiters:
+                self._rotation.append(key)
+        if next_ready is not None and self.in_flight < self.max_concurrency:
+            self._timer = asyncio.get_running_loop().call_later(max(0.0, next_ready - now), self._dispatch)
@@ -0,0 +1,95 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+
+# A route returns (status, headers, body) for the request handler it is given.
+Route = Callable[[BaseHTTPRequestHandler], Tuple[int, Dict[str, str], bytes]]
+
+
+class LocalHTTPServer:
+    """Threaded HTTP server on 127.0.0.1 serving per-test routes."""
+
+    def __init__(self):
+        self.routes: Dict[str, Route] = {}
+        self.requests: List[Tuple[str, Dict[str, str]]] = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                route = server.routes.get(self.path)
+                if route is None:
+                    status, headers, body = 404, {"Content-Type": "text/plain"}, b"not found"
+                else:
+                    status, headers, body = route(self)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_port
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.port}{path}"
+
+    def hits(self, path: str) -> int:
+        return sum(1 for request_path, _ in self.requests if request_path == path)
+
+    def start(self) -> "LocalHTTPServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def http_server():
+    server = LocalHTTPServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(autouse=True)
+def fresh_rate_governor():
+    """Each test starts with full rate-governor buckets, whatever earlier tests spent."""
+    from pipeline import governor
+
+    governor.set_governor(None)
+    yield
+    governor.set_governor(None)
+
+
+@pytest.fixture(autouse=True)
+def no_near_duplicate_index(monkeypatch):
+    """Screenings in tests never read or write the on-disk near-duplicate index."""
+    from pipeline import orchestrator
+
+    monkeypatch.setattr(orchestrator, "get_near_duplicate_index", lambda: None)
+
+
+@pytest.fixture(autouse=True)
+def no_local_dob_age(monkeypatch):
+    """Screenings in tests call the dob_age agent unless a test turns the local pass back on."""
+    from pipeline import orchestrator
+
+    monkeypatch.setattr(orchestrator, "DOB_AGE_LOCAL_ENABLED", False)
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from agents import Agent
+
+from models.name_match import NameMatchResult
+from pipeline import agent_runner
+from pipeline.agent_cache import AgentResultCache
+
+RESULT = NameMatchResult(
+    subject_name_normalized="colin nesbitt",
+    article_primary_names=["Colin Nesbitt"],
+    is_name_potential_match=True,
+    confidence=0.95,
+    reasoning="Named throughout the article.",
+)
+
+
+def make_agent(name="name_match_agent", instructions="Match names."):
+    return Agent(name=name, model="gpt-4.1-mini", instructions=instructions, output_type=NameMatchResult)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AgentResultCache(tmp_path / "agents.sqlite3")
+    yield cache
+    cache.close()
+
+
+def test_round_trip_returns_validated_model(cache):
+    agent = make_agent()
+    cache.put(agent, "prompt", RESULT)
+
+    cached = cache.get(agent, "prompt")
+
+    assert isinstance(cached, NameMatchResult)
+    assert cached == RESULT
+    assert cache.get(agent, "other prompt") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_editing_instructions_invalidates_only_that_agent(tmp_path):
+    first = AgentResultCache(tmp_path / "agents.sqlite3")
+    first.put(make_agent(), "prompt", RESULT)
+    first.put(make_agent(name="other_agent"), "prompt", RESULT)
+    first.close()
+
+    reopened = AgentResultCache(tmp_path / "agents.sqlite3")
+    assert reopened.get(make_agent(instructions="Match names strictly."), "prompt") is None
+    assert reopened.get(make_agent(name="other_agent"), "prompt") == RESULT
+    stats = reopened.stats()
+    assert stats["purged"] == 1 and stats["entries"] == 1
+    reopened.close()
+
+
+def test_ttl_and_size_bound(tmp_path):
+    expired = AgentResultCache(tmp_path / "ttl.sqlite3", ttl_seconds=-1)
+    expired.put(make_agent(), "prompt", RESULT)
+    assert expired.get(make_agent(), "prompt") is None
+    assert expired.stats()["entries"] == 0
+
+    bounded = AgentResultCache(tmp_path / "bounded.sqlite3", max_entries=10)
+    for i in range(25):
+        bounded.put(make_agent(), f"prompt {i}", RESULT)
+    assert bounded.stats()["entries"] <= 10
+    assert bounded.get(make_agent(), "prompt 24") == RESULT
+
+
+def test_run_agent_calls_model_once_for_repeat_prompts(cache, monkeypatch):
+    calls = []
+
+    async def fake_run(agent, prompt, **kwargs):
+        calls.append(prompt)
+        return SimpleNamespace(final_output=RESULT)
+
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+    monkeypatch.setattr(agent_runner, "get_agent_cache", lambda: cache)
+
+    async def scenario():
+        agent = make_agent()
+        return [await agent_runner.run_agent(agent, "prompt") for _ in range(3)]
+
+    outputs = asyncio.run(scenario())
+
+    assert calls == ["prompt"]
+    assert outputs == [RESULT] * 3
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from scraping import fetcher
+from scraping.cache import ArticleCache, CachedArticle, normalize_url
+
+ARTICLE_HTML = (
+    "<html><body><main><p>Joseph Mason, 47, was convicted of bank fraud.</p>"
+    "<p>He appeared at Wolverhampton Magistrates' Court.</p></main></body></html>"
+)
+
+
+@pytest.fixture
+def article_cache(tmp_path, monkeypatch):
+    cache = ArticleCache(tmp_path / "articles", ttl_seconds=3600)
+    monkeypatch.setattr(fetcher, "get_article_cache", lambda: cache)
+    return cache
+
+
+def serve_with_etag(etag: str, html: str = ARTICLE_HTML):
+    def route(handler):
+        if handler.headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, b""
+        return 200, {"Content-Type": "text/html; charset=utf-8", "ETag": etag}, html.encode("utf-8")
+
+    return route
+
+
+def fetch(url: str, max_chars: int = 16000) -> str:
+    async def scenario():
+        try:
+            return await fetcher.fetch_article_text_async(url, max_chars=max_chars)
+        finally:
+            await fetcher.close_http_client()
+
+    return asyncio.run(scenario())
+
+
+def test_normalize_url_drops_tracking_and_fragment():
+    assert (
+        normalize_url("HTTPS://WWW.BBC.co.uk:443/news/x?utm_source=tw&b=2&a=1#top")
+        == "https://www.bbc.co.uk/news/x?a=1&b=2"
+    )
+    assert normalize_url("http://example.com") == "http://example.com/"
+
+
+def test_fresh_entry_served_without_network(http_server, article_cache):
+    http_server.routes["/a"] = serve_with_etag('"v1"')
+
+    first = fetch(http_server.url("/a"))
+    second = fetch(http_server.url("/a?utm_medium=email"))
+
+    assert first == second
+    assert "Joseph Mason" in first
+    assert http_server.hits("/a") == 1
+    stats = article_cache.stats()
+    assert stats["misses"] == 1 and stats["memory_hits"] == 1
+
+
+def test_stale_entry_revalidates_with_etag(http_server, article_cache):
+    http_server.routes["/a"] = serve_with_etag('"v1"')
+    fetch(http_server.url("/a"))
+    article_cache.ttl_seconds = 0
+
+    text = fetch(http_server.url("/a"), max_chars=20)
+
+    assert text == "Joseph Mason, 47, wa"
+    assert http_server.requests[-1][1].get("If-None-Match") == '"v1"'
+    assert article_cache.stats()["revalidated"] == 1
+
+
+def test_disk_tier_survives_new_process(http_server, article_cache, tmp_path):
+    http_server.routes["/a"] = serve_with_etag('"v1"')
+    fetch(http_server.url("/a"))
+
+    reopened = ArticleCache(tmp_path / "articles")
+    entry = reopened.get(normalize_url(http_server.url("/a")))
+
+    assert entry is not None and entry.etag == '"v1"'
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_memory_tier_is_bounded_by_bytes(tmp_path):
+    cache = ArticleCache(None, memory_max_bytes=1000)
+    for i in range(5):
+        cache.put(CachedArticle.create(f"http://x/{i}", "h", "x" * 300, None, None))
+
+    stats = cache.stats()
+    assert stats["memory_bytes"] <= 1000
+    assert stats["memory_evictions"] >= 2
+    assert cache.get("http://x/0") is None
+    assert cache.get("http://x/4") is not None
+
+
+def test_disk_tier_evicts_oldest_past_budget(tmp_path):
+    cache = ArticleCache(tmp_path, memory_max_bytes=0, disk_max_bytes=3000)
+    for i in range(10):
+        cache.put(CachedArticle.create(f"http://x/{i}", "h", "y" * 500, None, None))
+
+    assert cache.stats()["disk_bytes"] <= 3000
+    assert cache.get("http://x/9") is not None
+    assert cache.get("http://x/0") is None
+
+
+def test_disk_eviction_skips_files_removed_by_another_worker(tmp_path, monkeypatch):
+    cache = ArticleCache(tmp_path, memory_max_bytes=0, disk_max_bytes=3000)
+    real_glob = type(tmp_path).glob
+
+    def glob_with_vanished_file(self, pattern):
+        yield from real_glob(self, pattern)
+        yield self / "gone" / "vanished.json"
+
+    monkeypatch.setattr(type(tmp_path), "glob", glob_with_vanished_file)
+    for i in range(10):
+        cache.put(CachedArticle.create(f"http://x/{i}", "h", "y" * 500, None, None))
+
+    assert cache.stats()["disk_bytes"] <= 3000
+    assert cache.get("http://x/9") is not None
+
+def test_entries_past_max_age_are_dropped(tmp_path):
+    cache = ArticleCache(tmp_path, max_age_seconds=-1)
+    cache.put(CachedArticle.create("http://x/old", "h", "text", None, None))
+
+    assert cache.get("http://x/old") is None
+    assert cache.stats()["expired"] == 1
+    assert not list(tmp_path.glob("*/*.json"))
@@ -0,0 +1,152 @@
+import asyncio
+import json
+
+import pytest
+
+from pipeline import bulk
+from scraping import fetcher
+
+PAGE = b"<html><body><main><p>Joseph Mason, 47, was convicted of bank fraud.</p></main></body></html>"
+
+
+def html_page(handler):
+    return 200, {"Content-Type": "text/html; charset=utf-8"}, PAGE
+
+
+def test_dataset_jsonl_and_csv_inputs_agree(tmp_path):
+    dataset = tmp_path / "dataset.json"
+    dataset.write_text(
+        json.dumps(
+            [
+                {"subject_names": ["Joseph Mason", "Joe Mason"], "dob_value": None, "article_link": "http://a/1"},
+                {"name": "Ann Lee", "dob": "1980-01-02", "urls": ["http://a/1", "http://a/2"]},
+            ]
+        )
+    )
+    lines = tmp_path / "rows.jsonl"
+    lines.write_text(
+        '{"name": "Joseph Mason", "url": "http://a/1"}\n\n'
+        '{"name": "Ann Lee", "dob": "1980-01-02", "url": "http://a/1"}\n'
+        '{"name": "Ann Lee", "dob": "1980-01-02", "url": "http://a/2"}\n'
+    )
+    table = tmp_path / "rows.csv"
+    table.write_text(
+        "Subject_Name,DOB,Article_Link\nJoseph Mason,,http://a/1\nAnn Lee,1980-01-02,http://a/1\n"
+        "Ann Lee,1980-01-02,http://a/2\n"
+    )
+
+    expected = [
+        ("Joseph Mason", None, "http://a/1"),
+        ("Ann Lee", "1980-01-02", "http://a/1"),
+        ("Ann Lee", "1980-01-02", "http://a/2"),
+    ]
+    assert bulk.load_pairs(dataset) == bulk.load_pairs(lines) == bulk.load_pairs(table) == expected
+    with pytest.raises(ValueError, match="needs a name and a url"):
+        bulk.entry_pairs({"name": "Joseph Mason"})
+
+
+class Crash(BaseException):
+    """The process dying mid-run: not an Exception, so nothing records it as a row error."""
+
+
+def test_resume_skips_finished_rows_and_retries_errors(monkeypatch, http_server, tmp_path):
+    monkeypatch.setattr(fetcher, "get_article_cache", lambda: None)
+    for path in ("/a", "/b", "/c"):
+        http_server.routes[path] = html_page
+    rows = tmp_path / "rows.jsonl"
+    rows.write_text(
+        "".join(
+            json.dumps({"name": name, "url": http_server.url(path)}) + "\n"
+            for path, name in (("/a", "Joseph Mason"), ("/b", "Ann Lee"), ("/b", "Helen Carter"), ("/c", "Mark Lee"))
+        )
+    )
+    out = tmp_path / "out.jsonl"
+    screened, crash_on, fail_on = [], {"Mark Lee"}, {"Helen Carter"}
+
+    async def fake_screen(screening_input, mode=None):
+        screened.append(screening_input.subject_name)
+        if screening_input.subject_name in crash_on:
+            raise Crash()
+        if screening_input.subject_name in fail_on:
+            raise RuntimeError("model unavailable")
+        return {"decision": "discard_as_not_relevant", "details": {"article_text": screening_input.article_text}}
+
+    monkeypatch.setattr(bulk, "screen_article", fake_screen)
+
+    def run():
+        return asyncio.run(bulk.run_bulk(rows, out, max_concurrency=1, progress_interval=0.01))
+
+    with pytest.raises(Crash):
+        run()  # articles go in file order: /c, and the crash, come last
+    with out.open("a") as f:
+        f.write('{"key": "half a line')
+    first = [json.loads(line) for line in out.read_text().splitlines()[:-1]]
+    crash_on.clear()
+    fail_on.clear()
+    screened.clear()
+    summary = run()
+
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [(r["name"], r["status"]) for r in first] == [
+        ("Joseph Mason", "ok"),
+        ("Ann Lee", "ok"),
+        ("Helen Carter", "error"),
+    ]
+    assert sorted(screened) == ["Helen Carter", "Mark Lee"]
+    assert summary["rows"] == 4 and summary["skipped"] == 2 and summary["ok"] == 2 and summary["errors"] == 0
+    assert [(r["name"], r["status"]) for r in records[3:]] == [("Helen Carter", "ok"), ("Mark Lee", "ok")]
+    assert bulk.read_checkpoint(out) == {r["key"] for r in records}
+    assert "article_text" not in records[0]["result"]["details"]
+    assert http_server.hits("/a") == 1
+
+
+def test_checkpoint_skips_unreadable_lines(tmp_path):
+    out = tmp_path / "out.jsonl"
+    out.write_text(
+        '{"key": "a", "status": "ok"}\n'
+        "not json\n"
+        '{"key": "b"}\n'
+        '["c", "ok"]\n'
+        '{"key": "d", "status": "ok"}\n'
+        "\n"
+        '{"key": "e", "status": "ok"'
+    )
+
+    assert bulk.read_checkpoint(out) == {"a", "d"}
+    assert out.read_text().endswith('{"key": "d", "status": "ok"}\n\n')
+
+def test_degraded_rows_are_counted_and_rescreened(monkeypatch, http_server, tmp_path):
+    monkeypatch.setattr(fetcher, "get_article_cache", lambda: None)
+    http_server.routes["/a"] = html_page
+    rows = tmp_path / "rows.jsonl"
+    rows.write_text(
+        "".join(json.dumps({"name": name, "url": http_server.url("/a")}) + "\n" for name in ("Joseph Mason", "Ann Lee"))
+    )
+    out = tmp_path / "out.jsonl"
+    degraded = {"Ann Lee": {"name_match": "timed out"}}
+    screened = []
+
+    async def fake_screen(screening_input, mode=None):
+        screened.append(screening_input.subject_name)
+        failed = degraded.get(screening_input.subject_name, {})
+        return {"decision": "discard_as_not_relevant", "details": {"degraded": failed}}
+
+    monkeypatch.setattr(bulk, "screen_article", fake_screen)
+
+    def run():
+        return asyncio.run(bulk.run_bulk(rows, out, max_concurrency=1, progress_interval=60))
+
+    first = run()
+    degraded.clear()
+    screened.clear()
+    second = run()
+
+    records = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [(r["name"], r["status"]) for r in records] == [
+        ("Joseph Mason", "ok"),
+        ("Ann Lee", "degraded"),
+        ("Ann Lee", "ok"),
+    ]
+    assert first["ok"] == 1 and first["degraded"] == 1 and first["errors"] == 0
+    assert screened == ["Ann Lee"]
+    assert second["skipped"] == 1 and second["ok"] == 1 and second["degraded"] == 0
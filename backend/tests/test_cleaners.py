@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import pytest
+
+from scraping.cleaners import clean_html_to_text, clean_html_to_text_bs4, clean_html_to_text_lxml
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures" / "html").glob("*.html"))
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda p: p.stem)
+def test_lxml_engine_matches_bs4(path):
+    html = path.read_text(encoding="utf-8")
+
+    expected = clean_html_to_text_bs4(html, max_chars=None)
+
+    assert expected
+    assert clean_html_to_text_lxml(html, max_chars=None) == expected
+    assert clean_html_to_text_lxml(html, max_chars=500) == expected[:500]
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        "",
+        "   ",
+        "just text, no markup at all",
+        '<?xml version="1.0" encoding="utf-8"?><html><body><main><p>Declared page</p></main></body></html>',
+        "<html><body><div class='ad'>gone</div>Tail text stays<nav>menu</nav></body></html>",
+        "<body><p>A<span class='ad'>x</span>B joined</p><p>a<!-- c -->b stays split</p></body>",
+    ],
+)
+def test_engines_agree_on_odd_input(html):
+    assert clean_html_to_text_lxml(html) == clean_html_to_text_bs4(html)
+
+
+def test_engine_selection():
+    html = FIXTURES[0].read_text(encoding="utf-8")
+
+    assert clean_html_to_text(html, engine="bs4") == clean_html_to_text(html, engine="lxml")
+    with pytest.raises(ValueError, match="Unknown cleaner engine"):
+        clean_html_to_text(html, engine="regex")
@@ -0,0 +1,78 @@
+import pytest
+
+from models.dob_age import DobAgeMatchResult
+from models.name_match import NameMatchResult
+from models.sentiment import SentimentResult
+from pipeline.decision_rules import DecisionPolicy, decide_locally
+
+
+def name(match=True, confidence=0.9):
+    return NameMatchResult(
+        subject_name_normalized="joseph mason",
+        article_primary_names=["Joseph Mason"] if match else ["Joe Masonry"],
+        is_name_potential_match=match,
+        confidence=confidence,
+        reasoning="test",
+    )
+
+
+def dob(consistent=None, confidence=0.5):
+    return DobAgeMatchResult(is_dob_or_age_consistent=consistent, confidence=confidence, reasoning="test")
+
+
+def sentiment(label="negative", adverse=True):
+    return SentimentResult(
+        overall_sentiment=label,
+        is_adverse_media=adverse,
+        adverse_categories=["fraud"] if adverse else [],
+        key_positives=[],
+        key_negatives=[],
+        reasoning="test",
+    )
+
+
+@pytest.mark.parametrize(
+    "name_result, dob_result, sentiment_result, expected",
+    [
+        (name(False, 0.95), dob(), sentiment(), ("name_mismatch", "no_match", "discard_as_not_relevant")),
+        (name(True, 0.9), dob(True, 0.8), sentiment(), ("clear_match_adverse", "high", "high_risk_escalate")),
+        (name(True, 0.9), dob(), sentiment("neutral", False), ("clear_match_not_adverse", "clear", "discard_as_not_relevant")),
+        (name(True, 0.6), dob(), sentiment(), ("uncertain_identity_adverse", "medium", "needs_manual_review")),
+        (name(True, 0.95), dob(False, 0.9), sentiment(), ("uncertain_identity_adverse", "medium", "needs_manual_review")),
+    ],
+)
+def test_unambiguous_cases_decided_locally(name_result, dob_result, sentiment_result, expected):
+    decision, rule = decide_locally(name_result, dob_result, sentiment_result)
+
+    assert (rule, decision.overall_risk_label, decision.decision.value) == expected
+    assert f"'{rule}'" in decision.audit_notes
+    assert 0.0 <= decision.match_confidence <= 1.0
+
+
+@pytest.mark.parametrize(
+    "name_result, dob_result, sentiment_result",
+    [
+        (name(False, 0.6), dob(), sentiment()),  # weak "someone else"
+        (name(True, 0.6), dob(), sentiment("neutral", False)),  # uncertain identity, not adverse
+        (name(True, 0.9), dob(), sentiment("negative", False)),  # negative but not adverse
+        (name(True, 0.9), dob(False, 0.9), sentiment("mixed", False)),  # DOB conflict, not adverse
+    ],
+)
+def test_ambiguous_band_falls_back(name_result, dob_result, sentiment_result):
+    assert decide_locally(name_result, dob_result, sentiment_result) is None
+
+
+def test_policy_thresholds_are_configurable():
+    strict = DecisionPolicy(no_match_min_confidence=0.99, clear_match_min_confidence=0.99)
+
+    assert decide_locally(name(False, 0.95), dob(), sentiment(), strict) is None
+    _, rule = decide_locally(name(True, 0.95), dob(), sentiment(), strict)
+    assert rule == "uncertain_identity_adverse"
+
+
+def test_dob_evidence_moves_match_confidence():
+    consistent, _ = decide_locally(name(True, 0.9), dob(True, 1.0), sentiment())
+    unknown, _ = decide_locally(name(True, 0.9), dob(None), sentiment())
+    conflicting, _ = decide_locally(name(True, 0.9), dob(False, 1.0), sentiment())
+
+    assert conflicting.match_confidence < unknown.match_confidence < consistent.match_confidence
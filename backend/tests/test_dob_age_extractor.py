@@ -0,0 +1,103 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from models.inputs import ScreeningInput
+from pipeline import agent_runner, orchestrator
+from pipeline.dob_age_extractor import extract_dob_age, find_published_date, parse_date
+from tests.test_orchestrator import ARTICLE_TEXT, isolated_caches, make_fake_run  # noqa: F401  (fixture)
+
+PUBLISHED = date(2025, 11, 17)
+
+
+@pytest.mark.parametrize(
+    "text, age, dob",
+    [
+        ("Joseph Mason, 47, of Wolverhampton, was convicted.", 47, None),
+        ("Joseph Mason was convicted. The 47-year-old denied the charges.", 47, None),
+        ("Joseph Mason, aged 47, was convicted.", 47, None),
+        ("Joseph and Ann Mason, both 47, were convicted.", 47, None),
+        ("Joseph Mason, who was born on 2 March 1978, was convicted.", None, "1978-03-02"),
+        ("Joseph Mason (born in 1978) was convicted.", None, "1978"),
+    ],
+)
+def test_surface_forms(text, age, dob):
+    result = extract_dob_age("Joseph Mason", None, text, PUBLISHED).result
+
+    assert result is not None
+    assert (result.age_in_article, result.dob_in_article) == (age, dob)
+    assert result.is_dob_or_age_consistent is None
+
+
+@pytest.mark.parametrize(
+    "dob, consistent",
+    [("1978-03-02", True), ("02/03/1978", True), ("1977-12-01", True), ("1960", False)],
+)
+def test_age_checked_against_publication_date(dob, consistent):
+    extraction = extract_dob_age("Joseph Mason", dob, ARTICLE_TEXT, PUBLISHED)
+
+    assert extraction.result.age_in_article == 47
+    assert extraction.result.is_dob_or_age_consistent is consistent
+    assert extraction.report()["engine"] == "local"
+
+
+@pytest.mark.parametrize(
+    "subject, dob, text, published",
+    [
+        ("Joseph Mason", "1977-06-01", ARTICLE_TEXT, PUBLISHED),  # one year off: birthday arithmetic is the agent's
+        ("Joseph Mason", "1978", ARTICLE_TEXT, None),  # no date to age against
+        ("Joseph Mason", None, "Joseph Mason, 47, and his brother Mark Mason, 52, were convicted.", PUBLISHED),
+        ("Joseph Mason", None, "Joseph Mason was first convicted in 1999, aged 21.", PUBLISHED),
+        ("Joseph Mason", None, "Joseph Mason denied it. Ann Lee, 52, was convicted.", PUBLISHED),
+        ("Joseph Mason", None, "Joseph Mason, 47, born 1 June 1960, was convicted.", PUBLISHED),
+    ],
+)
+def test_hard_cases_defer_to_agent(subject, dob, text, published):
+    extraction = extract_dob_age(subject, dob, text, published)
+
+    assert extraction.result is None, extraction.reason
+    assert extraction.report()["engine"] == "llm"
+
+
+def test_no_evidence_is_decided_locally():
+    result = extract_dob_age("Joseph Mason", "1978-03-02", "Joseph Mason was convicted of fraud.", PUBLISHED).result
+
+    assert (result.age_in_article, result.dob_in_article, result.is_dob_or_age_consistent) == (None, None, None)
+
+
+def test_dates():
+    assert parse_date("2 March 1978") == (1978, 3, 2)
+    assert parse_date("March 2, 1978") == (1978, 3, 2)
+    assert parse_date("1978-03") == (1978, 3, None)
+    assert parse_date("March 1978") == (1978, 3, None)
+    assert parse_date("next Tuesday") is None
+    assert find_published_date("Published 17 November 2025\nJoseph Mason, 47, was convicted.") == PUBLISHED
+
+
+def test_screening_skips_dob_age_agent_when_decided_locally(monkeypatch):
+    monkeypatch.setattr(orchestrator, "DOB_AGE_LOCAL_ENABLED", True)
+    fake_run = make_fake_run()
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+    events = []
+
+    local = asyncio.run(
+        orchestrator.screen_article(
+            ScreeningInput("Joseph Mason", None, "http://a/1", ARTICLE_TEXT),
+            on_event=lambda event, data: events.append((event, data)),
+        )
+    )
+    local_calls = list(fake_run.calls)
+    fake_run.calls.clear()
+    deferred = asyncio.run(
+        orchestrator.screen_article(
+            ScreeningInput("Joseph Mason", None, "http://a/2", "Joseph Mason, 47, and Mark Mason, 52, were convicted.")
+        )
+    )
+
+    assert "dob_age_agent" not in local_calls and "name_match_agent" in local_calls
+    assert local["details"]["dob_age"]["age_in_article"] == 47
+    assert local["details"]["dob_age_source"]["engine"] == "local"
+    assert any(event == "agent" and data["key"] == "dob_age" for event, data in events)
+    assert "dob_age_agent" in fake_run.calls
+    assert deferred["details"]["dob_age_source"]["engine"] == "llm"
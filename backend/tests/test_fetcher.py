@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from scraping import fetcher
+from scraping.decoding import UnsupportedContentError, decode_html
+
+ARTICLE = "<main><p>Joseph Mason, 47, was convicted of bank fraud at Wolverhampton Crown Court.</p></main>"
+
+
+def html_page(body: str, head: str = "") -> str:
+    return f"<html><head>{head}</head><body>{body}</body></html>"
+
+
+def serve(body: bytes, content_type: str = "text/html; charset=utf-8"):
+    def route(handler):
+        headers = {"Content-Type": content_type} if content_type else {}
+        return 200, headers, body
+
+    return route
+
+
+def run(coro_factory):
+    async def scenario():
+        try:
+            return await coro_factory()
+        finally:
+            await fetcher.close_http_client()
+
+    return asyncio.run(scenario())
+
+
+@pytest.fixture(autouse=True)
+def no_article_cache(monkeypatch):
+    monkeypatch.setattr(fetcher, "get_article_cache", lambda: None)
+
+
+def test_oversized_page_stops_at_byte_cap(http_server):
+    filler = "<p>" + "Unrelated filler text. " * 40 + "</p>"
+    page = html_page(ARTICLE + filler * 4000).encode("utf-8")
+    http_server.routes["/big"] = serve(page)
+
+    download = run(lambda: fetcher.download(http_server.url("/big"), max_bytes=64 * 1024))
+
+    assert len(page) > 3_000_000
+    assert download.truncated
+    assert len(download.html.encode("utf-8")) <= 64 * 1024
+    assert "Joseph Mason" in download.html
+
+
+def test_text_budget_limits_bytes_read(http_server, monkeypatch):
+    monkeypatch.setattr(fetcher, "FETCH_MIN_BYTES", 0)
+    article = ARTICLE.replace("</main>", "<p>" + "More words here. " * 20000 + "</p></main>")
+    page = html_page(article).encode("utf-8")
+    http_server.routes["/long"] = serve(page)
+
+    text = run(lambda: fetcher.fetch_article_text_async(http_server.url("/long"), max_chars=500))
+
+    assert fetcher.byte_budget(500) == 500 * fetcher.FETCH_BYTES_PER_TEXT_CHAR
+    assert text.startswith("Joseph Mason, 47")
+    assert len(text) == 500
+
+
+@pytest.mark.parametrize(
+    "content_type, body",
+    [
+        ("application/pdf", b"%PDF-1.7\n%binary"),
+        ("text/html; charset=utf-8", b"%PDF-1.7\n%mislabelled pdf"),
+        ("", b"\x89PNG\r\n\x1a\n\x00\x00\x00"),
+        ("application/json", b'{"html": "<p>no</p>"}'),
+    ],
+)
+def test_non_html_rejected(http_server, content_type, body):
+    http_server.routes["/doc"] = serve(body, content_type)
+
+    with pytest.raises(UnsupportedContentError):
+        run(lambda: fetcher.fetch_article_text_async(http_server.url("/doc")))
+
+
+def test_sync_fetch_applies_same_limits(http_server):
+    http_server.routes["/pdf"] = serve(b"%PDF-1.4 stream", "text/html")
+    http_server.routes["/ok"] = serve(html_page(ARTICLE).encode("utf-8"))
+
+    with pytest.raises(UnsupportedContentError):
+        fetcher.fetch_article_text(http_server.url("/pdf"))
+    assert fetcher.fetch_article_text(http_server.url("/ok")).startswith("Joseph Mason")
+
+
+def test_meta_charset_used_when_header_has_none(http_server):
+    body = html_page("<main><p>Иосиф Мейсон осуждён за мошенничество.</p></main>", '<meta charset="windows-1251">')
+    http_server.routes["/ru"] = serve(body.encode("cp1251"), "text/html")
+
+    download = run(lambda: fetcher.download(http_server.url("/ru")))
+
+    assert download.encoding == "cp1251"
+    assert "Иосиф Мейсон" in download.html
+
+
+def test_header_charset_wins_over_meta():
+    body = html_page("<p>Café société</p>", '<meta charset="utf-8">').encode("latin-1")
+
+    html, encoding = decode_html(body, "text/html; charset=ISO-8859-1")
+
+    assert encoding == "cp1252"
+    assert "Café société" in html
+
+
+def test_bom_wins_over_header_charset():
+    body = "\ufeff".encode("utf-8") + html_page("<p>Zoë Müller – fraud</p>").encode("utf-8")
+
+    html, encoding = decode_html(body, "text/html; charset=ISO-8859-1")
+
+    assert encoding == "utf-8"
+    assert "Zoë Müller – fraud" in html and "\ufeff" not in html
+
+
+def test_latin_1_labels_decode_as_windows_1252():
+    body = html_page("<p>“Café” – société</p>").encode("cp1252")
+
+    for label in ("latin-1", "latin1", "ISO-8859-1", "us-ascii"):
+        html, encoding = decode_html(body, f"text/html; charset={label}")
+        assert encoding == "cp1252"
+        assert "“Café” – société" in html
+
+def test_undeclared_utf8_truncated_mid_character():
+    body = html_page("<p>Zoë Müller – fraud</p>").encode("utf-8") + "é".encode("utf-8")[:1]
+
+    html, encoding = decode_html(body, "text/html")
+
+    assert encoding == "utf-8"
+    assert "Zoë Müller – fraud" in html
+
+
+def test_undeclared_legacy_encoding_detected():
+    paragraph = "Le prévenu a été condamné à trois ans de prison pour escroquerie et blanchiment. "
+    body = html_page(f"<p>{paragraph * 20}</p>").encode("cp1252")
+
+    html, encoding = decode_html(body, None)
+
+    assert encoding != "utf-8"
+    assert "prévenu a été condamné" in html
@@ -0,0 +1,171 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import openai
+import pytest
+
+from benchmarks import replay
+from pipeline import agent_runner, governor, orchestrator
+
+AGENT = orchestrator.SPECIALIST_AGENTS["name_match"]
+PROMPT = "Full name: Joseph Mason\nArticle URL:\n- https://www.bbc.co.uk/news/articles/cdeg8enengxo"
+
+
+@pytest.fixture
+def limited_provider(monkeypatch):
+    monkeypatch.setattr(agent_runner, "get_agent_cache", lambda: None)
+    # 6 requests per 0.5s window, refused with a 429 + retry-after-ms beyond that.
+    provider = replay.ReplayModelProvider(limits=replay.ProviderLimits(requests=6, window_seconds=0.5))
+    agent_runner.set_model_provider(provider)
+    yield provider
+    agent_runner.set_model_provider(None)
+
+
+def run_calls(count):
+    async def scenario():
+        return await asyncio.gather(
+            *(agent_runner.run_agent(AGENT, PROMPT) for _ in range(count)), return_exceptions=True
+        )
+
+    return asyncio.run(scenario())
+
+
+def overloaded_error():
+    error = RuntimeError("overloaded")
+    error.status_code = 503
+    return error
+
+
+def test_token_bucket_and_retry_after_parsing():
+    now = [0.0]
+    bucket = governor.TokenBucket(rate=10, capacity=5, clock=lambda: now[0])
+    bucket.take(5)
+    assert bucket.wait_time(1) == pytest.approx(0.1)
+    assert bucket.wait_time(50) == pytest.approx(0.5)  # capped at a full bucket
+    now[0] = 10.0
+    assert bucket.wait_time(5) == 0
+
+    def error(headers):
+        return SimpleNamespace(status_code=429, response=SimpleNamespace(status_code=429, headers=headers))
+
+    assert governor.retry_after_seconds(error({"retry-after-ms": "250"})) == 0.25
+    assert governor.retry_after_seconds(error({"retry-after": "3"})) == 3
+    assert governor.retry_after_seconds(error({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0
+    assert governor.retry_after_seconds(error({})) is None
+    assert governor.retry_status(error({})) == 429
+    assert governor.retry_status(ValueError("bad output")) is None
+
+
+def test_backoff_retries_overload_and_passes_other_errors_through():
+    gov = governor.RateGovernor(request_limit=10**6, token_limit=10**9, backoff_base=0.01)
+    attempts = []
+
+    async def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise overloaded_error()
+        return "ok"
+
+    async def broken():
+        attempts.append(time.monotonic())
+        raise ValueError("bad output")
+
+    assert asyncio.run(gov.call(flaky, 10)) == "ok"
+    assert len(attempts) == 3
+    attempts.clear()
+    with pytest.raises(ValueError):
+        asyncio.run(gov.call(broken, 10))
+    assert len(attempts) == 1
+    assert gov.in_flight == 0
+
+
+def test_ungoverned_burst_trips_fake_provider_limits(limited_provider, monkeypatch):
+    monkeypatch.setattr(agent_runner, "get_governor", lambda: None)
+
+    results = run_calls(12)
+
+    assert sum(isinstance(r, openai.RateLimitError) for r in results) == 6
+    assert limited_provider.rejections == 6
+
+
+def test_governor_stays_under_fake_provider_limits(limited_provider):
+    governor.set_governor(governor.RateGovernor(request_limit=6, window_seconds=0.5, burst_seconds=0.25))
+    try:
+        results = run_calls(12)
+    finally:
+        governor.set_governor(None)
+
+    assert all(r.is_name_potential_match for r in results)
+    assert limited_provider.rejections == 0
+    assert len(limited_provider.calls) == 12
+
+
+def test_retry_after_is_honoured(limited_provider):
+    limited_provider.window.limits = replay.ProviderLimits(requests=1, window_seconds=0.3)
+    governor.set_governor(governor.RateGovernor(request_limit=10**6))
+    retried_before = governor.RETRIES.value(status="429")
+    try:
+        started = time.monotonic()
+        results = run_calls(2)
+        elapsed = time.monotonic() - started
+    finally:
+        governor.set_governor(None)
+
+    assert all(r.is_name_potential_match for r in results)
+    assert limited_provider.rejections == 1
+    assert governor.RETRIES.value(status="429") == retried_before + 1
+    assert elapsed >= 0.3
+
+
+def test_interactive_calls_admitted_before_batch():
+    gov = governor.RateGovernor(request_limit=10**6, max_concurrency=1)
+    admitted = []
+
+    async def call(name):
+        await gov.acquire(10)
+        admitted.append(name)
+        gov.release()
+
+    async def scenario():
+        await gov.acquire(10)  # occupy the only slot
+        with governor.llm_priority("batch"):
+            batch = [asyncio.create_task(call(f"batch-{n}")) for n in range(3)]
+        await asyncio.sleep(0.01)
+        interactive = asyncio.create_task(call("interactive"))
+        await asyncio.sleep(0.01)
+        gov.release()
+        await asyncio.gather(*batch, interactive)
+
+    asyncio.run(scenario())
+
+    assert admitted == ["interactive", "batch-0", "batch-1", "batch-2"]
+    assert gov.stats()["waiting"] == 0
+
+
+def test_pooled_client_leaves_retries_to_the_governor(monkeypatch, http_server):
+    responses = [
+        (429, {"Content-Type": "application/json", "retry-after-ms": "10"}, b'{"error": {"message": "slow down"}}'),
+        (503, {"Content-Type": "application/json"}, b'{"error": {"message": "overloaded"}}'),
+        (200, {"Content-Type": "application/json"}, b'{"object": "list", "data": []}'),
+    ]
+    http_server.routes["/v1/models"] = lambda handler: responses.pop(0)
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setenv("OPENAI_BASE_URL", http_server.url("/v1"))
+    gov = governor.RateGovernor(request_limit=10**6, token_limit=10**9, backoff_base=0.01)
+    retried = [governor.RETRIES.value(status=status) for status in ("429", "503")]
+
+    async def scenario():
+        client = agent_runner.open_model_client()
+        try:
+            return client, await gov.call(lambda: client.models.list(), 10)
+        finally:
+            await agent_runner.close_model_client()
+
+    client, models = asyncio.run(scenario())
+
+    assert client.max_retries == 0
+    assert models.data == []
+    # Every provider request went through an admission of its own.
+    assert http_server.hits("/v1/models") == 3
+    assert [governor.RETRIES.value(status=status) for status in ("429", "503")] == [n + 1 for n in retried]
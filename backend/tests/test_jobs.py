@@ -0,0 +1,196 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from pipeline.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobStore, JobWorkerPool, QueueFullError
+
+PAYLOAD = {"name": "Joseph Mason", "dob": None, "url": "http://a/1", "mode": None}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3", max_depth=3)
+    yield store
+    store.close()
+
+
+def test_enqueue_claim_complete(store):
+    job = store.enqueue(PAYLOAD)
+
+    claimed = store.claim()
+    assert claimed["id"] == job["id"]
+    assert claimed["payload"] == PAYLOAD
+    assert store.get(job["id"])["status"] == RUNNING
+    assert store.claim() is None
+
+    assert store.complete(job["id"], claimed["attempts"], {"decision": "discard_as_not_relevant"})
+    stored = store.get(job["id"])
+    assert stored["status"] == SUCCEEDED
+    assert stored["result"] == {"decision": "discard_as_not_relevant"}
+
+
+def test_queue_survives_restart(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    first = JobStore(path)
+    job = first.enqueue(PAYLOAD)
+    first.close()
+
+    second = JobStore(path)
+    assert second.get(job["id"])["status"] == QUEUED
+    assert second.claim()["id"] == job["id"]
+    second.close()
+
+
+def test_expired_lease_reclaimed_until_max_attempts(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3", lease_seconds=-1, max_attempts=2)
+    job = store.enqueue(PAYLOAD)
+
+    assert store.claim()["attempts"] == 1
+    assert store.claim()["attempts"] == 2  # worker "crashed": lease already lapsed
+    assert store.claim() is None
+    abandoned = store.get(job["id"])
+    assert abandoned["status"] == FAILED
+    assert "Abandoned after 2 attempts" in abandoned["error"]
+    store.close()
+
+
+def test_stale_claim_cannot_finish_a_reclaimed_job(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3", lease_seconds=-1)
+    job = store.enqueue(PAYLOAD)
+    stale = store.claim()
+    current = store.claim()  # the first worker's lease lapsed
+
+    assert not store.renew(job["id"], stale["attempts"])
+    assert not store.complete(job["id"], stale["attempts"], {"decision": "stale"})
+    store.release(job["id"], stale["attempts"])
+    assert store.get(job["id"])["status"] == RUNNING
+    assert store.complete(job["id"], current["attempts"], {"decision": "current"})
+    assert not store.fail(job["id"], current["attempts"], "late duplicate")
+    assert store.get(job["id"])["result"] == {"decision": "current"}
+    store.close()
+
+
+def test_running_job_keeps_its_lease(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    store = JobStore(path, lease_seconds=0.2)
+    other_worker = JobStore(path, lease_seconds=0.2)
+    claims = []
+
+    async def runner(**payload):
+        for _ in range(5):
+            await asyncio.sleep(0.1)
+            claims.append(other_worker.claim())
+        return {"subject": payload["name"]}
+
+    async def scenario():
+        pool = JobWorkerPool(store, workers=1, poll_interval=0.05, runner=runner)
+        await pool.start()
+        job = store.enqueue(PAYLOAD)
+        pool.notify()
+        for _ in range(100):
+            if store.get(job["id"])["status"] == SUCCEEDED:
+                break
+            await asyncio.sleep(0.05)
+        await pool.stop()
+        return job
+
+    job = asyncio.run(scenario())
+
+    # Over two lease periods, and no other worker could claim it.
+    assert claims == [None] * 5
+    finished = store.get(job["id"])
+    assert finished["attempts"] == 1
+    assert finished["result"] == {"subject": "Joseph Mason"}
+    other_worker.close()
+    store.close()
+
+
+def test_depth_limit(store):
+    for _ in range(3):
+        store.enqueue(PAYLOAD)
+    with pytest.raises(QueueFullError):
+        store.enqueue(PAYLOAD)
+
+
+def test_pool_runs_jobs_with_bounded_concurrency(tmp_path):
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    active, peak = 0, 0
+
+    async def runner(name, dob, url, mode):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        if url.endswith("bad"):
+            raise RuntimeError("fetch failed")
+        return {"subject": name}
+
+    async def scenario():
+        pool = JobWorkerPool(store, workers=2, poll_interval=0.05, runner=runner)
+        await pool.start()
+        jobs = [store.enqueue({**PAYLOAD, "url": f"http://a/{i}"}) for i in range(5)]
+        jobs.append(store.enqueue({**PAYLOAD, "url": "http://a/bad"}))
+        pool.notify()
+        for _ in range(100):
+            if store.stats()[SUCCEEDED] + store.stats()[FAILED] == len(jobs):
+                break
+            await asyncio.sleep(0.05)
+        await pool.stop()
+        return jobs
+
+    jobs = asyncio.run(scenario())
+
+    assert peak == 2
+    assert store.stats() == {QUEUED: 0, RUNNING: 0, SUCCEEDED: 5, FAILED: 1}
+    assert store.get(jobs[0]["id"])["result"] == {"subject": "Joseph Mason"}
+    assert "fetch failed" in store.get(jobs[-1]["id"])["error"]
+    store.close()
+
+
+def test_stopping_pool_requeues_running_job(store):
+    started = asyncio.Event()
+
+    async def runner(**payload):
+        started.set()
+        await asyncio.sleep(10)
+
+    async def scenario():
+        pool = JobWorkerPool(store, workers=1, poll_interval=0.05, runner=runner)
+        await pool.start()
+        job = store.enqueue(PAYLOAD)
+        pool.notify()
+        await asyncio.wait_for(started.wait(), 2)
+        await pool.stop()
+        return job
+
+    job = asyncio.run(scenario())
+
+    requeued = store.get(job["id"])
+    assert requeued["status"] == QUEUED
+    assert requeued["attempts"] == 0
+
+
+def test_job_endpoints(monkeypatch, store):
+    pool = JobWorkerPool(store, workers=2)
+    monkeypatch.setattr(main, "get_job_pool", lambda: pool)
+    client = TestClient(main.app)
+
+    created = client.post("/api/jobs", json={"name": "Joseph Mason", "url": "http://a/1"})
+    assert created.status_code == 202
+    job_id = created.json()["job_id"]
+    assert created.headers["location"] == f"/api/jobs/{job_id}"
+
+    status = client.get(f"/api/jobs/{job_id}").json()
+    assert status["status"] == QUEUED
+    assert status["payload"]["name"] == "Joseph Mason"
+    assert client.get("/api/jobs/nope").status_code == 404
+
+    for _ in range(2):
+        client.post("/api/jobs", json={"name": "Joseph Mason", "url": "http://a/1"})
+    refused = client.post("/api/jobs", json={"name": "Joseph Mason", "url": "http://a/1"})
+    assert refused.status_code == 429
+    assert int(refused.headers["retry-after"]) >= 1
+    assert client.get("/api/jobs").json()[QUEUED] == 3
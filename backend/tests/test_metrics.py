@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from benchmarks import replay
+from models.inputs import ScreeningInput
+from pipeline import agent_runner, article_stage, governor, orchestrator
+from scraping import fetcher
+from tests.test_orchestrator import ARTICLE_TEXT, isolated_caches, make_fake_run  # noqa: F401  (fixture)
+from utils import metrics
+
+URL = "https://www.bbc.co.uk/news/articles/cdeg8enengxo"
+
+
+def test_prometheus_text_format():
+    registry = metrics.MetricsRegistry()
+    calls = registry.register(metrics.Counter("calls_total", "Calls.", ("agent",)))
+    latency = registry.register(metrics.Histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0)))
+    in_flight = registry.register(metrics.Gauge("in_flight", "In flight."))
+    registry.add_collector(lambda: [("cache_stat", "gauge", "Cache.", [({"cache": 'a"b'}, 3)])])
+
+    calls.inc(agent="name_match_agent")
+    calls.inc(2, agent="name_match_agent")
+    latency.observe(0.05, stage="fetch")
+    latency.observe(0.1, stage="fetch")
+    latency.observe(5, stage="fetch")
+    with in_flight.track():
+        inside = registry.render()
+
+    lines = registry.render().splitlines()
+    assert "# TYPE calls_total counter" in lines
+    assert 'calls_total{agent="name_match_agent"} 3' in lines
+    assert 'latency_seconds_bucket{stage="fetch",le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="fetch",le="1"} 2' in lines
+    assert 'latency_seconds_bucket{stage="fetch",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{stage="fetch"} 3' in lines
+    assert 'cache_stat{cache="a\\"b"} 3' in lines
+    assert "in_flight 1" in inside.splitlines()
+    assert "in_flight 0" in lines
+
+
+def test_screening_timings_tokens_and_metrics_endpoint(monkeypatch):
+    stage_cache = article_stage.ArticleStageCache()
+    monkeypatch.setattr(orchestrator, "get_article_stage_cache", lambda: stage_cache)
+    replay.install(replay.PageCorpus(), replay.ReplayModelProvider())
+    tokens_before = metrics.AGENT_TOKENS.value(agent="name_match_agent", model="gpt-4.1-mini", direction="input")
+
+    async def scenario():
+        try:
+            return await orchestrator.run_screening("Joseph Mason", None, URL, include_timings=True)
+        finally:
+            await fetcher.close_http_client()
+
+    try:
+        result = asyncio.run(scenario())
+    finally:
+        replay.uninstall()
+
+    timings = result["timings"]
+    assert {"screening", "fetch", "download", "clean", "prefilter", "window", "agents", "decision"} <= set(
+        timings["stages"]
+    )
+    assert set(timings["agents"]) == {agent.name for agent in orchestrator.SPECIALIST_AGENTS.values()}
+    assert timings["stages"]["screening"] >= timings["stages"]["agents"]
+    assert metrics.AGENT_TOKENS.value(agent="name_match_agent", model="gpt-4.1-mini", direction="input") > tokens_before
+
+    body = TestClient(main.app).get("/api/metrics").text
+    assert 'aml_stage_duration_seconds_count{stage="decision"}' in body
+    assert 'aml_agent_calls_total{agent="sentiment_agent",model="gpt-4.1-mini",outcome="ok"}' in body
+    assert 'aml_cache_stat{cache="article_stage",stat="runs"}' in body
+
+
+def test_timeouts_and_errors_counted(monkeypatch):
+    monkeypatch.setattr(agent_runner, "get_agent_cache", lambda: None)
+    monkeypatch.setattr(agent_runner.Runner, "run", make_fake_run(delays={"sentiment_agent": 1}))
+    agent = orchestrator.SPECIALIST_AGENTS["sentiment"]
+    before = metrics.AGENT_CALLS.value(agent=agent.name, model="gpt-4.1-mini", outcome="timeout")
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(agent_runner.run_agent(agent, "prompt", timeout=0.05))
+
+    assert metrics.AGENT_CALLS.value(agent=agent.name, model="gpt-4.1-mini", outcome="timeout") == before + 1
+    assert metrics.IN_FLIGHT.value(stage="agent") == 0
+
+
+def test_agent_latency_excludes_governor_queueing(monkeypatch):
+    monkeypatch.setattr(agent_runner, "get_agent_cache", lambda: None)
+    monkeypatch.setattr(agent_runner.Runner, "run", make_fake_run(delays={"sentiment_agent": 0.1}))
+    monkeypatch.setattr(agent_runner, "get_governor", lambda: gov)
+    gov = governor.RateGovernor(request_limit=10**6, token_limit=10**9, max_concurrency=1)
+    agent = orchestrator.SPECIALIST_AGENTS["sentiment"]
+
+    async def timed_call():
+        with metrics.collect_timings() as timings:
+            await agent_runner.run_agent(agent, "prompt")
+        return timings["agents"][agent.name]
+
+    async def scenario():
+        return await asyncio.gather(timed_call(), timed_call())
+
+    first, second = asyncio.run(scenario())
+
+    # The second call queued behind the first for ~0.1s; only its own model time counts.
+    assert first < 0.15 and second < 0.15
+
+
+def test_shared_article_stage_timings_reach_every_screening(monkeypatch, isolated_caches):
+    monkeypatch.setattr(agent_runner.Runner, "run", make_fake_run())
+
+    async def screen(dob):
+        with metrics.collect_timings() as timings:
+            await orchestrator.screen_article(ScreeningInput("Joseph Mason", dob, "http://a/1", ARTICLE_TEXT))
+        return timings
+
+    async def scenario():
+        return await asyncio.gather(screen(None), screen("1978"))
+
+    first, second = asyncio.run(scenario())
+
+    for timings in (first, second):
+        assert {"article_metadata_agent", "person_extraction_agent", "context_extraction_agent"} <= set(
+            timings["agents"]
+        )
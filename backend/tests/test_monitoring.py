@@ -0,0 +1,176 @@
+import asyncio
+
+import pytest
+
+from pipeline import agent_runner, monitoring
+from scraping import fetcher
+from tests.test_orchestrator import isolated_caches, make_fake_run  # noqa: F401  (fixture)
+
+STORY = (
+    "<html><body><main><p>Joseph Mason, 47, of Wolverhampton, was convicted of nine counts of bank fraud "
+    "at Wolverhampton Crown Court on {day}.</p></main></body></html>"
+)
+
+
+class Page:
+    """A route serving STORY with an ETag, answering matching If-None-Match with 304."""
+
+    def __init__(self, day="Tuesday", etag='"v1"'):
+        self.day, self.etag = day, etag
+
+    def __call__(self, handler):
+        if handler.headers.get("If-None-Match") == self.etag:
+            return 304, {"ETag": self.etag}, b""
+        body = STORY.format(day=self.day).encode("utf-8")
+        return 200, {"Content-Type": "text/html; charset=utf-8", "ETag": self.etag}, body
+
+
+def run_monitor(store, **kwargs):
+    async def scenario():
+        try:
+            return await monitoring.Monitor(store, **kwargs).run()
+        finally:
+            await fetcher.close_http_client()
+
+    return asyncio.run(scenario())
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = monitoring.MonitorStore(tmp_path / "monitoring.sqlite3")
+    yield store
+    store.close()
+
+
+def test_unchanged_articles_skip_the_agents(monkeypatch, http_server, store):
+    fake_run = make_fake_run()
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+    page = Page()
+    http_server.routes["/story"] = page
+    url = http_server.url("/story")
+    store.add_pairs([("Joseph Mason", None, url), ("Helen Carter", None, url)])
+
+    first = run_monitor(store)
+    calls_after_first = len(fake_run.calls)
+    not_modified = run_monitor(store)
+    page.etag = '"v2"'  # same content under a new validator
+    same_text = run_monitor(store)
+    calls_before_edit = len(fake_run.calls)
+    page.day, page.etag = "Wednesday", '"v3"'
+    edited = run_monitor(store)
+
+    story_requests = [headers for path, headers in http_server.requests if path == "/story"]
+    assert len(story_requests) == 4  # one fetch per article per run, whatever the subject count
+    assert story_requests[1].get("If-None-Match") == '"v1"'
+    assert first["outcomes"] == {"new": 2}
+    assert {diff["name"] for diff in first["diffs"]} == {"Joseph Mason", "Helen Carter"}
+    assert not_modified["outcomes"] == {"unchanged": 2}
+    assert same_text["outcomes"] == {"unchanged": 2}
+    assert calls_after_first > 0 and calls_before_edit == calls_after_first
+    assert edited["outcomes"] == {"rescreened": 2}
+    assert edited["diffs"] == []
+    assert len(fake_run.calls) > calls_before_edit
+
+
+def test_degraded_screening_is_not_kept_as_baseline(monkeypatch, http_server, store):
+    degraded = {"name_match": "timed out"}
+
+    async def fake_screen(screening_input, mode=None):
+        return {
+            "is_subject_match": not degraded,
+            "match_confidence": 0.9 if not degraded else 0.0,
+            "overall_risk_label": "high",
+            "decision": "Escalate" if not degraded else "Discard",
+            "human_readable_summary": "",
+            "audit_notes": "",
+            "details": {"degraded": dict(degraded)},
+        }
+
+    monkeypatch.setattr(monitoring, "screen_article", fake_screen)
+    http_server.routes["/story"] = Page()
+    store.add_pairs([("Joseph Mason", None, http_server.url("/story"))])
+
+    first = run_monitor(store)
+    degraded.clear()
+    second = run_monitor(store)
+    third = run_monitor(store)
+
+    assert first["outcomes"] == {"degraded": 1}
+    assert first["diffs"][0]["degraded"] == {"name_match": "timed out"}
+    assert second["outcomes"] == {"new": 1}
+    assert second["diffs"][0]["changes"]["decision"] == {"before": None, "after": "Escalate"}
+    assert third["outcomes"] == {"unchanged": 1}
+
+
+def test_screenings_of_one_article_share_the_concurrency_bound(monkeypatch, http_server, store):
+    active, peak = 0, 0
+
+    async def fake_screen(screening_input, mode=None):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return {field: None for field in monitoring.FinalScreeningDecision.model_fields}
+
+    monkeypatch.setattr(monitoring, "screen_article", fake_screen)
+    http_server.routes["/story"] = Page()
+    store.add_pairs([(f"Subject {n}", None, http_server.url("/story")) for n in range(20)])
+
+    report = run_monitor(store, max_concurrency=3)
+
+    assert report["outcomes"] == {"new": 20}
+    assert peak == 3
+
+
+class Crash(BaseException):
+    """The process dying mid-run: not an Exception, so nothing records it as a pair error."""
+
+
+def test_decision_diff_and_resume_after_crash(monkeypatch, http_server, store):
+    decisions = {"Joseph Mason": "Discard", "Helen Carter": "Discard", "Ann Lee": "Discard"}
+    screened, crash_on = [], set()
+
+    async def fake_screen(screening_input, mode=None):
+        screened.append(screening_input.subject_name)
+        if screening_input.subject_name in crash_on:
+            raise Crash()
+        decision = decisions[screening_input.subject_name]
+        return {
+            "is_subject_match": decision == "Escalate",
+            "match_confidence": 0.9,
+            "overall_risk_label": "high" if decision == "Escalate" else "clear",
+            "decision": decision,
+            "human_readable_summary": f"screened on {len(screening_input.article_text)} chars",
+            "audit_notes": "",
+        }
+
+    monkeypatch.setattr(monitoring, "screen_article", fake_screen)
+    page = Page()
+    for path in ("/a", "/b", "/c"):
+        http_server.routes[path] = page
+    store.add_pairs(
+        [(name, None, http_server.url(path)) for name in ("Joseph Mason", "Helen Carter") for path in ("/a", "/b")]
+        + [("Ann Lee", None, http_server.url("/c"))]
+    )
+    run_monitor(store, max_concurrency=1)
+
+    page.day, page.etag = "Wednesday", '"v2"'
+    decisions["Helen Carter"] = "Escalate"
+    crash_on.add("Ann Lee")  # articles are checked in URL order: /c comes last
+    screened.clear()
+    with pytest.raises(Crash):
+        run_monitor(store, max_concurrency=1)
+    crash_on.clear()
+    resumed = run_monitor(store, max_concurrency=1)
+
+    # The resumed run finished run 2, screening only the pair the crash interrupted.
+    assert store.stats()["last_run"]["id"] == 2
+    assert sorted(screened) == ["Ann Lee", "Ann Lee", "Helen Carter", "Helen Carter", "Joseph Mason", "Joseph Mason"]
+    assert resumed["outcomes"] == {"changed": 2, "rescreened": 3}
+    assert {(d["name"], d["outcome"]) for d in resumed["diffs"]} == {("Helen Carter", "changed")}
+    assert resumed["diffs"][0]["changes"] == {
+        "decision": {"before": "Discard", "after": "Escalate"},
+        "overall_risk_label": {"before": "clear", "after": "high"},
+        "is_subject_match": {"before": False, "after": True},
+    }
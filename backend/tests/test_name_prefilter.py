@@ -0,0 +1,57 @@
+import pytest
+
+from pipeline.name_prefilter import find_name_presence, name_tokens, soundex, token_similarity
+
+
+def test_name_tokens_drop_honorifics_suffixes_and_accents():
+    assert name_tokens("Dr. José  O'Neill Jr.") == ["jose", "oneill"]
+
+
+def test_soundex():
+    assert soundex("robert") == soundex("rupert") == "r163"
+    assert soundex("ashcraft") == "a261"
+
+
+@pytest.mark.parametrize(
+    "subject, text",
+    [
+        ("Joseph Mason", "Joseph Mason, 47, appeared in court."),
+        ("Joseph Mason", "Joe Mason denied the charges."),
+        ("Joseph Mason", "J. Mason denied the charges."),
+        ("Mr Joseph Mason", "Police said Mason had fled."),
+        ("Colin Nesbitt", "Colin Nesbit, the charity founder, was convicted."),
+        ("Matteo Messina Denaro", "Matteo Messina-Denaro died in hospital."),
+        ("Zhimin Qian", "Qian Zhimin, also known as Yadi Zhang, was convicted."),
+        ("Jose Alvarez", "José Álvarez was arrested."),
+    ],
+)
+def test_plausible_mentions(subject, text):
+    presence = find_name_presence(subject, text)
+    assert presence.plausible, presence.reason
+
+
+@pytest.mark.parametrize(
+    "subject, text",
+    [
+        ("Jane Smith", "John Carter nearly drained his savings giving to charity."),
+        ("Michael Green", "Michael Bancroft was among six people convicted of fraud."),
+        ("Joseph Mason", "The mission was a success, said Joseph's colleagues."),
+    ],
+)
+def test_absent_subjects(subject, text):
+    presence = find_name_presence(subject, text)
+    assert not presence.plausible
+    assert "below" in presence.reason or "No token" in presence.reason
+
+
+def test_alias_phrase_counts_as_mention():
+    presence = find_name_presence(
+        "Vijay Mallya", 'Once called the "King of Good Times"', aliases=["The King of Good Times"]
+    )
+    assert presence.plausible and presence.full_match
+
+
+def test_threshold_is_configurable():
+    assert find_name_presence("Mark Killick", "Marc Kilick was convicted.", threshold=0.6).plausible
+    assert not find_name_presence("Mark Killick", "Marc Kilick was convicted.", threshold=0.99).plausible
+    assert token_similarity("killick", "kilick") < 0.99
@@ -0,0 +1,140 @@
+import asyncio
+import random
+
+from models.inputs import ScreeningInput
+from pipeline import agent_runner, near_duplicates, orchestrator
+from tests.test_orchestrator import isolated_caches, make_fake_run  # noqa: F401  (fixture)
+
+WIRE_STORY = (
+    "Joseph Mason, 47, of Wolverhampton, was convicted on Tuesday of nine counts of bank fraud after a "
+    "three week trial at Wolverhampton Crown Court. Prosecutors said Mason used forged documents to open "
+    "accounts in the names of elderly customers and moved more than two hundred thousand pounds through "
+    "them over four years. Detectives from the regional economic crime unit began investigating after a "
+    "building society reported unusual transfers in 2021. The jury heard that Mason spent the money on "
+    "cars, holidays and gambling. Judge Helen Carter remanded him in custody and said he faced a lengthy "
+    "prison sentence. Mason, who denied the charges, will be sentenced next month. A spokesperson for the "
+    "building society said customers who lost money had been fully reimbursed."
+)
+# A syndicated copy: its own standfirst and a reworded phrase.
+SYNDICATED = "From our wire service. " + WIRE_STORY.replace("on Tuesday", "this week")
+UNRELATED = (
+    "The city council approved a new cycling strategy on Monday that will add forty kilometres of protected "
+    "lanes over the next five years. Councillors said the plan would cut congestion and improve air quality "
+    "near schools, while some businesses raised concerns about the loss of parking spaces on the high "
+    "street. Work on the first routes is expected to start in the spring and the council will consult "
+    "residents on the remaining phases later this year. Funding comes from a regional transport grant."
+)
+
+
+def screen(name, url, text, mode=None):
+    return asyncio.run(orchestrator.screen_article(ScreeningInput(name, None, url, text), mode))
+
+
+def agreement(a, b):
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def test_minhash_separates_copies_from_unrelated_articles():
+    original = near_duplicates.minhash(WIRE_STORY)
+    copy = near_duplicates.minhash(SYNDICATED)
+    other = near_duplicates.minhash(UNRELATED)
+
+    assert agreement(original, copy) >= near_duplicates.NEAR_DUPLICATE_MIN_SIMILARITY
+    assert agreement(original, other) < 0.2
+    assert near_duplicates.minhash("Too short to fingerprint.") is None
+
+
+def test_index_matches_brute_force_above_threshold():
+    rng = random.Random(7)
+    stored = [tuple(rng.getrandbits(58) for _ in range(64)) for _ in range(3000)]
+    index = near_duplicates.MinHashIndex(min_similarity=0.75)
+    index.add_many(stored[:2000])
+    for signature in stored[2000:]:
+        index.add(signature)
+
+    for position in rng.sample(range(len(stored)), 50):
+        probe = list(stored[position])
+        for slot in rng.sample(range(64), rng.choice([0, 4, 8, 40])):
+            probe[slot] = rng.getrandbits(58)
+        probe = tuple(probe)
+        expected = {i for i, signature in enumerate(stored) if agreement(signature, probe) >= 0.75}
+        found = dict(index.query(probe))
+        # Banding can miss a true match; at >= 0.75 with 16 bands of 4 it almost never does.
+        assert set(found) == expected
+        assert all(found[i] == agreement(stored[i], probe) for i in found)
+
+
+def test_syndicated_copy_reuses_earlier_results(monkeypatch, isolated_caches, tmp_path):
+    index = near_duplicates.NearDuplicateIndex(tmp_path / "near_duplicates.sqlite3")
+    monkeypatch.setattr(orchestrator, "get_near_duplicate_index", lambda: index)
+    fake_run = make_fake_run()
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+
+    first = screen("Joseph Mason", "https://news.example/a/1", WIRE_STORY)
+    calls_before = len(fake_run.calls)
+    copy = screen("Joseph Mason", "https://wire.example/story/99", SYNDICATED)
+    copy_calls = fake_run.calls[calls_before:]
+    other_subject = screen("Helen Carter", "https://mirror.example/x", SYNDICATED)
+
+    assert "near_duplicate" not in first["details"]
+    assert copy_calls == ["article_metadata_agent"]
+    match = copy["details"]["near_duplicate"]
+    assert match["url"] == "https://news.example/a/1"
+    assert match["similarity"] >= near_duplicates.NEAR_DUPLICATE_MIN_SIMILARITY
+    assert "metadata" not in match["reused"] and "name_match" in match["reused"]
+    assert copy["details"]["sentiment"] == first["details"]["sentiment"]
+    assert copy["decision"] == first["decision"]
+    assert "near_duplicate" not in other_subject["details"]
+
+    # Persisted: a reopened index still finds the first screening.
+    index.close()
+    reopened = near_duplicates.NearDuplicateIndex(tmp_path / "near_duplicates.sqlite3")
+    found = reopened.find(
+        near_duplicates.minhash(SYNDICATED),
+        near_duplicates.subject_key("Joseph Mason", None),
+        "https://elsewhere.example/1",
+        orchestrator.specialist_definitions_hash(),
+    )
+    assert found is not None and found.outputs["name_match"]["is_name_potential_match"] is True
+
+
+def test_index_sees_articles_added_by_another_process(tmp_path):
+    # Two handles on one file stand in for two API workers.
+    first = near_duplicates.NearDuplicateIndex(tmp_path / "near_duplicates.sqlite3")
+    second = near_duplicates.NearDuplicateIndex(tmp_path / "near_duplicates.sqlite3")
+    subject = near_duplicates.subject_key("Joseph Mason", None)
+    outputs = {"name_match": {"is_name_potential_match": True}}
+
+    first.add("http://a/original", near_duplicates.minhash(WIRE_STORY), subject, "v1", outputs)
+    found = second.find(near_duplicates.minhash(SYNDICATED), subject, "http://b/copy", "v1")
+    second.add("http://b/copy", near_duplicates.minhash(SYNDICATED), subject, "v1", outputs)
+
+    assert found is not None and found.url == "http://a/original"
+    assert found.outputs == outputs
+    assert first.find(near_duplicates.minhash(WIRE_STORY), subject, "http://a/original", "v1").url == "http://b/copy"
+    assert len(first) == len(second) == 2
+    first.close()
+    second.close()
+
+
+def test_changed_page_replaces_its_signature_and_results(tmp_path):
+    first = near_duplicates.NearDuplicateIndex(tmp_path / "near_duplicates.sqlite3")
+    second = near_duplicates.NearDuplicateIndex(tmp_path / "near_duplicates.sqlite3")
+    subject = near_duplicates.subject_key("Joseph Mason", None)
+    old = {"name_match": {"is_name_potential_match": True}}
+    new = {"name_match": {"is_name_potential_match": False}}
+
+    first.add("http://a/page", near_duplicates.minhash(WIRE_STORY), subject, "v1", old)
+    other_subject = near_duplicates.subject_key("Ann Lee", None)
+    first.add("http://a/page", near_duplicates.minhash(WIRE_STORY), other_subject, "v1", old)
+    first.add("http://a/page", near_duplicates.minhash(UNRELATED), subject, "v1", new)
+
+    for index in (first, second):
+        # Copies of the old text find nothing; copies of the new text get the new outputs.
+        assert index.find(near_duplicates.minhash(SYNDICATED), subject, "http://b/copy", "v1") is None
+        found = index.find(near_duplicates.minhash("Reposted. " + UNRELATED), subject, "http://b/copy", "v1")
+        assert found is not None and found.url == "http://a/page" and found.outputs == new
+    assert first.stats() == {"articles": 1, "subject_results": 1}
+    assert len(second) == 1
+    first.close()
+    second.close()
@@ -0,0 +1,294 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from models.combined import CombinedExtractionResult
+from models.decision import FinalScreeningDecision
+from models.dob_age import DobAgeMatchResult
+from models.inputs import ScreeningInput
+from models.name_match import NameMatchResult
+from models.sentiment import SentimentResult
+from pipeline import agent_runner, article_stage, orchestrator
+
+NAME_RESULT = NameMatchResult(
+    subject_name_normalized="joseph mason",
+    article_primary_names=["Joseph Mason"],
+    is_name_potential_match=True,
+    confidence=0.9,
+    reasoning="Named in the article body.",
+)
+DOB_RESULT = DobAgeMatchResult(confidence=0.5, reasoning="No age clues.")
+SENTIMENT_RESULT = SentimentResult(
+    overall_sentiment="negative",
+    is_adverse_media=True,
+    adverse_categories=["fraud"],
+    key_positives=[],
+    key_negatives=["Convicted of bank fraud"],
+    reasoning="Convicted of fraud.",
+)
+
+ARTICLE_TEXT = "Joseph Mason, 47, was convicted of nine counts of bank fraud."
+
+CANNED_OUTPUTS = {
+    "article_metadata_agent": orchestrator._degraded_placeholder("metadata", "canned"),
+    "person_extraction_agent": orchestrator._degraded_placeholder("people", "canned"),
+    "context_extraction_agent": orchestrator._degraded_placeholder("context", "canned"),
+    "name_match_agent": NAME_RESULT,
+    "dob_age_agent": DOB_RESULT,
+    "sentiment_agent": SENTIMENT_RESULT,
+    "final_decision_agent": FinalScreeningDecision(
+        is_subject_match=True,
+        match_confidence=0.9,
+        overall_risk_label="high",
+        decision="high_risk_escalate",
+        human_readable_summary="Subject convicted of bank fraud.",
+        audit_notes="- canned",
+    ),
+}
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(monkeypatch):
+    monkeypatch.setattr(agent_runner, "get_agent_cache", lambda: None)
+    stage_cache = article_stage.ArticleStageCache()
+    monkeypatch.setattr(orchestrator, "get_article_stage_cache", lambda: stage_cache)
+    return stage_cache
+
+
+def make_fake_run(delays=None, failures=None):
+    delays = delays or {}
+    failures = failures or {}
+    calls = []
+
+    async def fake_run(agent, prompt, **kwargs):
+        calls.append(agent.name)
+        await asyncio.sleep(delays.get(agent.name, 0.01))
+        if agent.name in failures:
+            raise failures[agent.name]
+        return SimpleNamespace(final_output=CANNED_OUTPUTS[agent.name])
+
+    fake_run.calls = calls
+    return fake_run
+
+
+def test_specialists_run_concurrently(monkeypatch):
+    fake_run = make_fake_run(delays={agent.name: 0.2 for agent in orchestrator.SPECIALIST_AGENTS.values()})
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        result = await orchestrator.run_specialist_agents("prompt")
+        return result, asyncio.get_running_loop().time() - started
+
+    (outputs, degraded), elapsed = asyncio.run(scenario())
+
+    assert set(outputs) == set(orchestrator.SPECIALIST_AGENTS)
+    assert degraded == {}
+    assert elapsed < 0.6
+
+
+def test_non_critical_timeout_degrades(monkeypatch):
+    fake_run = make_fake_run(
+        delays={"person_extraction_agent": 5},
+        failures={"context_extraction_agent": RuntimeError("boom")},
+    )
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+
+    outputs, degraded = asyncio.run(orchestrator.run_specialist_agents("prompt", timeout=0.2))
+
+    assert set(degraded) == {"people", "context"}
+    assert degraded["people"] == "timed out after 0.2s"
+    assert "boom" in degraded["context"]
+    assert outputs["people"].reasoning.startswith("Unavailable:")
+    assert outputs["name_match"] is NAME_RESULT
+
+
+def test_critical_failure_cancels_remaining(monkeypatch):
+    fake_run = make_fake_run(
+        delays={"sentiment_agent": 0.05, "article_metadata_agent": 5},
+        failures={"sentiment_agent": RuntimeError("provider down")},
+    )
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        with pytest.raises(RuntimeError, match="provider down"):
+            await orchestrator.run_specialist_agents("prompt", timeout=10)
+        return asyncio.get_running_loop().time() - started
+
+    assert asyncio.run(scenario()) < 1
+
+
+def test_article_stage_shared_across_subjects(monkeypatch, isolated_caches):
+    fake_run = make_fake_run(delays={"article_metadata_agent": 0.1})
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+    subjects = ["Joseph Mason", "Joe Mason", "J. Mason"]
+
+    async def scenario():
+        return await asyncio.gather(
+            *(
+                orchestrator.screen_article(ScreeningInput(name, None, "http://a/1", ARTICLE_TEXT))
+                for name in subjects
+            )
+        )
+
+    results = asyncio.run(scenario())
+    later = asyncio.run(
+        orchestrator.screen_article(ScreeningInput("Jo Mason", None, "http://a/1", ARTICLE_TEXT))
+    )
+
+    article_agent_names = {agent.name for agent in orchestrator.ARTICLE_AGENTS.values()}
+    article_calls = [name for name in fake_run.calls if name in article_agent_names]
+    assert len(article_calls) == 3
+    assert fake_run.calls.count("name_match_agent") == 4
+    assert all(r["details"]["metadata"] == later["details"]["metadata"] for r in results)
+    assert isolated_caches.stats() == {"hits": 1, "shared_inflight": 2, "runs": 1, "entries": 1}
+
+
+def test_article_stage_cancelled_when_last_waiter_leaves():
+    cache = article_stage.ArticleStageCache()
+    started = asyncio.Event()
+    cancelled = []
+
+    async def slow_stage():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return {}, {}
+
+    async def scenario():
+        waiters = [asyncio.create_task(cache.get_or_run("k", slow_stage)) for _ in range(2)]
+        await started.wait()
+        waiters[0].cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled  # one waiter still interested
+        waiters[1].cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(scenario())
+    assert cancelled == [True]
+
+
+def test_prefilter_skips_agents_when_subject_absent(monkeypatch):
+    fake_run = make_fake_run()
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+
+    result = asyncio.run(
+        orchestrator.screen_article(ScreeningInput("Jane Smith", None, "http://a/1", ARTICLE_TEXT))
+    )
+
+    assert fake_run.calls == []
+    assert result["decision"] == "discard_as_not_relevant"
+    assert result["overall_risk_label"] == "no_match"
+    assert result["details"]["prefilter"]["skipped_agents"] is True
+    assert result["details"]["name_match"]["is_name_potential_match"] is False
+    assert "pre-filter" in result["audit_notes"]
+
+
+def test_clear_cases_skip_decision_agent(monkeypatch):
+    fake_run = make_fake_run()
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+
+    result = asyncio.run(
+        orchestrator.screen_article(ScreeningInput("Joseph Mason", None, "http://a/1", ARTICLE_TEXT))
+    )
+
+    assert "final_decision_agent" not in fake_run.calls
+    assert result["decision"] == "high_risk_escalate"
+    assert result["details"]["decision_source"] == {"engine": "rules", "rule": "clear_match_adverse"}
+
+
+def test_ambiguous_cases_use_decision_agent(monkeypatch):
+    weak_name = NAME_RESULT.model_copy(update={"confidence": 0.5})
+    not_adverse = SENTIMENT_RESULT.model_copy(update={"is_adverse_media": False, "adverse_categories": []})
+    monkeypatch.setitem(CANNED_OUTPUTS, "name_match_agent", weak_name)
+    monkeypatch.setitem(CANNED_OUTPUTS, "sentiment_agent", not_adverse)
+    fake_run = make_fake_run()
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+
+    result = asyncio.run(
+        orchestrator.screen_article(ScreeningInput("Joseph Mason", None, "http://a/1", ARTICLE_TEXT))
+    )
+
+    assert fake_run.calls[-1] == "final_decision_agent"
+    assert result["details"]["decision_source"] == {"engine": "llm", "rule": None}
+
+
+def test_batch_fetches_each_url_once_and_isolates_failures(monkeypatch):
+    from pipeline import batch
+
+    fetched = []
+
+    async def fake_fetch(url, max_chars=16000):
+        fetched.append(url)
+        if "broken" in url:
+            raise RuntimeError("404 Not Found")
+        return f"Article text for {url}"
+
+    async def fake_screen(screening_input, mode=None):
+        if screening_input.subject_name == "Bad Subject":
+            raise RuntimeError("agent exploded")
+        return {"decision": "needs_manual_review", "details": {"article_text": screening_input.article_text}}
+
+    monkeypatch.setattr(batch, "fetch_article_text_async", fake_fetch)
+    monkeypatch.setattr(batch, "screen_article", fake_screen)
+
+    response = asyncio.run(
+        batch.run_batch_screening(
+            [("Joseph Mason", None), ("Bad Subject", "1970-01-01")],
+            ["http://a/1", "http://broken/2", "http://a/1"],
+            max_concurrency=2,
+        )
+    )
+
+    assert sorted(fetched) == ["http://a/1", "http://broken/2"]
+    results = response["results"]
+    assert list(results) == ["0:0", "0:1", "0:2", "1:0", "1:1", "1:2"]
+    assert results["0:0"]["status"] == "ok"
+    assert "article_text" not in results["0:0"]["result"]["details"]
+    assert "Article fetch failed" in results["0:1"]["error"]
+    assert "agent exploded" in results["1:0"]["error"]
+    assert response["summary"] == {
+        "pairs": 6,
+        "succeeded": 2,
+        "failed": 4,
+        "articles": 2,
+        "articles_failed": 1,
+    }
+
+
+def test_combined_mode_makes_one_extraction_call(monkeypatch):
+    combined = CombinedExtractionResult(
+        **{
+            key: CANNED_OUTPUTS[agent.name]
+            for key, agent in orchestrator.SPECIALIST_AGENTS.items()
+        }
+    )
+    monkeypatch.setitem(CANNED_OUTPUTS, "combined_extraction_agent", combined)
+    fake_run = make_fake_run()
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+
+    multi = asyncio.run(
+        orchestrator.screen_article(ScreeningInput("Joseph Mason", None, "http://a/1", ARTICLE_TEXT), "multi_agent")
+    )
+    fake_run.calls.clear()
+    result = asyncio.run(
+        orchestrator.screen_article(ScreeningInput("Joseph Mason", None, "http://a/2", ARTICLE_TEXT), "combined")
+    )
+
+    assert fake_run.calls == ["combined_extraction_agent"]
+    assert result["details"]["pipeline_mode"] == "combined"
+    assert set(result["details"]) == set(multi["details"])
+    for key in orchestrator.SPECIALIST_AGENTS:
+        assert result["details"][key] == multi["details"][key]
+    assert result["decision"] == multi["decision"]
+
+
+def test_unknown_pipeline_mode_rejected():
+    with pytest.raises(ValueError, match="Unknown pipeline mode"):
+        asyncio.run(orchestrator.screen_article(ScreeningInput("Joseph Mason", None, "http://a/1", ARTICLE_TEXT), "fast"))
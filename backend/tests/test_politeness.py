@@ -0,0 +1,144 @@
+import asyncio
+import functools
+import threading
+import time
+
+import httpx
+import pytest
+
+from scraping import fetcher, politeness
+from tests.conftest import LocalHTTPServer
+
+PAGE = b"<html><body><main><p>Joseph Mason was convicted of fraud.</p></main></body></html>"
+
+
+def page_route(delay=0.0, log=None, gauge=None):
+    def route(handler):
+        started = time.monotonic()
+        if gauge is not None:
+            gauge.enter()
+        time.sleep(delay)
+        if gauge is not None:
+            gauge.leave()
+        if log is not None:
+            log.append((handler.path, started, time.monotonic()))
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, PAGE
+
+    return route
+
+
+class ConcurrencyGauge:
+    def __init__(self):
+        self.current = self.peak = 0
+        self._lock = threading.Lock()
+
+    def enter(self):
+        with self._lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def leave(self):
+        with self._lock:
+            self.current -= 1
+
+
+def run(coro_factory):
+    async def scenario():
+        try:
+            return await coro_factory()
+        finally:
+            await fetcher.close_http_client()
+
+    return asyncio.run(scenario())
+
+
+@pytest.fixture
+def configure_scheduler(monkeypatch):
+    def configure(**kwargs):
+        monkeypatch.setattr(fetcher, "FetchScheduler", functools.partial(politeness.FetchScheduler, **kwargs))
+
+    return configure
+
+
+def test_robots_txt_cached_disallow_and_crawl_delay(http_server, configure_scheduler):
+    configure_scheduler(min_interval=0)
+    log = []
+    http_server.routes["/robots.txt"] = lambda handler: (
+        200,
+        {"Content-Type": "text/plain"},
+        b"User-agent: *\nDisallow: /private\nCrawl-delay: 1\n",
+    )
+    for path in ("/a", "/b", "/private"):
+        http_server.routes[path] = page_route(log=log)
+
+    async def scenario():
+        with pytest.raises(politeness.DisallowedByRobotsError):
+            await fetcher.download(http_server.url("/private"))
+        await asyncio.gather(fetcher.download(http_server.url("/a")), fetcher.download(http_server.url("/b")))
+
+    run(scenario)
+
+    assert http_server.hits("/robots.txt") == 1
+    assert http_server.hits("/private") == 0
+    starts = sorted(started for _, started, _ in log)
+    assert starts[1] - starts[0] >= 0.95
+
+
+def test_per_host_cap_and_spacing(http_server, configure_scheduler):
+    configure_scheduler(per_host_concurrency=2, min_interval=0.1)
+    gauge, log = ConcurrencyGauge(), []
+    http_server.routes["/robots.txt"] = lambda handler: (404, {}, b"")
+    for n in range(6):
+        http_server.routes[f"/{n}"] = page_route(delay=0.2, log=log, gauge=gauge)
+
+    run(lambda: asyncio.gather(*(fetcher.download(http_server.url(f"/{n}")) for n in range(6))))
+
+    starts = sorted(started for _, started, _ in log)
+    assert gauge.peak == 2
+    assert all(b - a >= 0.09 for a, b in zip(starts, starts[1:]))
+
+
+def test_throttled_host_backs_off_and_retries(http_server, configure_scheduler):
+    configure_scheduler(min_interval=0, backoff_base=0.1)
+    http_server.routes["/robots.txt"] = lambda handler: (404, {}, b"")
+    responses = iter([(429, {"Retry-After": "0.3"}, b"slow down")])
+    http_server.routes["/flaky"] = lambda handler: next(responses, None) or page_route()(handler)
+    http_server.routes["/down"] = lambda handler: (503, {"Content-Type": "text/plain"}, b"busy")
+
+    async def scenario():
+        started = time.monotonic()
+        download = await fetcher.download(http_server.url("/flaky"))
+        elapsed = time.monotonic() - started
+        recovered = fetcher.get_fetch_scheduler().host(http_server.url("/")).backoff
+        with pytest.raises(httpx.HTTPStatusError):
+            await fetcher.download(http_server.url("/down"))
+        return download, elapsed, recovered, fetcher.get_fetch_scheduler().host(http_server.url("/")).backoff
+
+    download, elapsed, recovered, backoff = run(scenario)
+
+    assert download.status_code == 200
+    assert elapsed >= 0.3
+    assert recovered == 0
+    assert http_server.hits("/down") == fetcher.FETCH_THROTTLE_RETRIES + 1
+    assert backoff == pytest.approx(0.4)  # 0.1 doubled on each of the three refusals
+
+
+def test_slow_host_does_not_starve_others(http_server, configure_scheduler):
+    configure_scheduler(max_concurrency=2, per_host_concurrency=1, min_interval=0)
+    other = LocalHTTPServer().start()
+    try:
+        slow_log, fast_log = [], []
+        for server in (http_server, other):
+            server.routes["/robots.txt"] = lambda handler: (404, {}, b"")
+        for n in range(4):
+            http_server.routes[f"/slow/{n}"] = page_route(delay=0.2, log=slow_log)
+            other.routes[f"/fast/{n}"] = page_route(log=fast_log)
+
+        urls = [http_server.url(f"/slow/{n}") for n in range(4)] + [other.url(f"/fast/{n}") for n in range(4)]
+        started = time.monotonic()
+        run(lambda: asyncio.gather(*(fetcher.download(url) for url in urls)))
+    finally:
+        other.stop()
+
+    assert max(finished for _, _, finished in fast_log) - started < 0.2 + 0.15
+    assert max(finished for _, _, finished in slow_log) - started >= 0.8
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from benchmarks import replay
+from pipeline import article_stage, orchestrator
+from scraping import fetcher
+
+CASE = {
+    "subject_names": ["Joseph Mason"],
+    "dob_value": None,
+    "article_link": "https://www.bbc.co.uk/news/articles/cdeg8enengxo",
+}
+
+
+@pytest.fixture
+def harness(monkeypatch):
+    stage_cache = article_stage.ArticleStageCache()
+    monkeypatch.setattr(orchestrator, "get_article_stage_cache", lambda: stage_cache)
+    corpus = replay.PageCorpus()
+    provider = replay.ReplayModelProvider(latency_seconds=0.01)
+    replay.install(corpus, provider)
+    yield corpus, provider
+    replay.uninstall()
+
+
+def screen(name, dob, url, mode=None):
+    async def scenario():
+        try:
+            return await orchestrator.run_screening(name, dob, url, mode)
+        finally:
+            await fetcher.close_http_client()
+
+    return asyncio.run(scenario())
+
+
+def test_recorded_pages_cover_dataset():
+    corpus = replay.PageCorpus()
+
+    assert all(corpus.body(case["article_link"]) for case in replay.load_dataset())
+
+
+def test_replayed_screening_through_agents_sdk(harness):
+    corpus, provider = harness
+
+    result = screen(CASE["subject_names"][0], CASE["dob_value"], CASE["article_link"])
+
+    assert corpus.requests == [CASE["article_link"]]
+    assert {call.output_type for call in provider.calls} == {
+        agent.output_type.__name__ for agent in orchestrator.SPECIALIST_AGENTS.values()
+    }
+    assert result["decision"] == "high_risk_escalate"
+    assert result["details"]["name_match"]["is_name_potential_match"] is True
+    assert "Joseph Mason" in result["details"]["article_text"]
+
+
+def test_replay_is_deterministic_and_unknown_prompts_get_placeholders(harness):
+    _, provider = harness
+
+    combined = screen("Joseph Mason", None, CASE["article_link"], "combined")
+    multi = screen("Joseph Mason", None, CASE["article_link"], "multi_agent")
+    unknown = provider.outputs.respond("SentimentResult", "Full name: Nobody\nArticle URL:\n- http://x/1")
+
+    for key in orchestrator.SPECIALIST_AGENTS:
+        assert combined["details"][key] == multi["details"][key]
+    assert unknown["reasoning"].startswith("Replay:")
+    assert provider.latency_for("NameMatchResult", "p", 10) == provider.latency_for("NameMatchResult", "p", 10)
@@ -0,0 +1,61 @@
+import asyncio
+
+from agents.models import _openai_shared
+from fastapi.testclient import TestClient
+
+import main
+import resources
+from pipeline import agent_cache, governor, jobs, near_duplicates
+from scraping import fetcher
+from utils import result_store
+
+
+def test_lifespan_opens_warm_resources_and_closes_them(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(agent_cache, "AGENT_CACHE_PATH", str(tmp_path / "agent_results.sqlite3"))
+    monkeypatch.setattr(near_duplicates, "NEAR_DUPLICATE_DB_PATH", str(tmp_path / "near_duplicates.sqlite3"))
+    monkeypatch.setattr(result_store, "RESULTS_DB_PATH", str(tmp_path / "results.sqlite3"))
+    monkeypatch.setattr(jobs, "JOBS_DB_PATH", str(tmp_path / "jobs.sqlite3"))
+    for module, name in (
+        (agent_cache, "_agent_cache"),
+        (near_duplicates, "_index"),
+        (result_store, "_result_store"),
+        (jobs, "_job_pool"),
+    ):
+        monkeypatch.setattr(module, name, None)
+    monkeypatch.setattr(resources, "API_WORKERS", 2)
+
+    with TestClient(main.app) as client:
+        assert client.get("/api/health").json() == {"status": "ok"}
+        model_client = _openai_shared.get_default_openai_client()
+        assert model_client is not None and model_client.api_key == "sk-test"
+        assert agent_cache._agent_cache is not None and near_duplicates._index is not None
+        assert result_store._result_store is not None
+        assert fetcher._client is not None and fetcher._clean_executor is not None
+        # Two workers: each admits half the account's concurrency.
+        assert governor.get_governor().max_concurrency == resources.LLM_MAX_CONCURRENCY // 2
+        assert jobs._job_pool._tasks
+
+    assert _openai_shared.get_default_openai_client() is None
+    assert model_client.is_closed()
+    assert agent_cache._agent_cache is None and near_duplicates._index is None and result_store._result_store is None
+    assert fetcher._client is None and fetcher._clean_executor is None
+    assert not jobs._job_pool._tasks
+
+
+def test_open_resources_reports_timings(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(resources, "_open_stores", lambda: None)
+    monkeypatch.setattr(resources, "_close_stores", lambda: None)
+    monkeypatch.setattr(resources, "get_job_pool", lambda: None)
+
+    async def scenario():
+        try:
+            return await resources.open_resources()
+        finally:
+            await resources.close_resources()
+
+    timings = asyncio.run(scenario())
+
+    assert set(timings) == {"http_client", "model_client", "governor", "stores", "jobs"}
+    assert _openai_shared.get_default_openai_client() is None  # no key: calls fail as they did before
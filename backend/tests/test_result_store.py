@@ -0,0 +1,139 @@
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from utils import save_test_result
+from utils.result_store import ResultStore
+
+
+def snapshot(subject: str, decision: str, risk: str, text: str = "Full article text.") -> dict:
+    return {
+        "title": f"{subject} case",
+        "input": {"subject_names": [subject], "article_link": f"http://a/{subject}"},
+        "output": {
+            "decision": decision,
+            "overall_risk_label": risk,
+            "is_subject_match": risk != "no_match",
+            "details": {"name_match": {"is_name_potential_match": True}, "article_text": text},
+        },
+    }
+
+
+@pytest.fixture
+def legacy_dir(tmp_path):
+    results = tmp_path / "results"
+    results.mkdir()
+    (results / "jane_smith.json").write_text(json.dumps([snapshot("Jane Smith", "discard_as_not_relevant", "no_match")]))
+    (results / "joseph_mason.json").write_text(
+        json.dumps(
+            [
+                snapshot("Joseph Mason", "high_risk_escalate", "high"),
+                snapshot("Joseph Mason", "needs_manual_review", "medium"),
+                snapshot("Joseph Mason", "high_risk_escalate", "high"),
+            ]
+        )
+    )
+    (results / "broken.json").write_text("{not json")
+    return results
+
+
+@pytest.fixture
+def store(tmp_path, legacy_dir):
+    store = ResultStore(tmp_path / "results.sqlite3")
+    store.import_snapshots(legacy_dir)
+    yield store
+    store.close()
+
+
+def test_import_keeps_positions_and_is_idempotent(store, legacy_dir):
+    assert store.count() == 4
+    assert store.import_snapshots(legacy_dir) == 0
+    assert store.legacy_imported()
+
+    record = store.get("joseph_mason", 1)
+    assert record["source_file"] == "joseph_mason.json"
+    assert record["output"]["decision"] == "needs_manual_review"
+    assert [r["subject_slug"] for r in store.all()] == ["jane_smith"] + ["joseph_mason"] * 3
+
+
+def test_append_numbers_records_per_subject(store):
+    started = time.time()
+
+    assert store.append("jane_smith", snapshot("Jane Smith", "high_risk_escalate", "high")) == 1
+    assert store.append("new_subject", snapshot("New Subject", "needs_manual_review", "medium")) == 0
+
+    recent = store.query(since=started)
+    assert recent["total"] == 2
+    assert {(r["subject_slug"], r["record_index"]) for r in recent["results"]} == {("jane_smith", 1), ("new_subject", 0)}
+
+
+def test_filters_pagination_and_summary(store):
+    page = store.query(decision="high_risk_escalate", subject="joseph_mason", offset=1, limit=1)
+    assert page["total"] == 2
+    assert [r["record_index"] for r in page["results"]] == [2]
+    assert store.query(overall_risk_label="medium")["results"][0]["record_index"] == 1
+    assert store.query(decision="high_risk_escalate", overall_risk_label="no_match")["total"] == 0
+
+    summary = store.query(subject="jane_smith")["results"][0]
+    full = store.query(subject="jane_smith", include_article_text=True)["results"][0]
+    assert "article_text" not in summary["output"]["details"]
+    assert summary["output"]["details"]["name_match"] == {"is_name_potential_match": True}
+    assert full["output"]["details"]["article_text"] == "Full article text."
+
+
+def _append_many(path, worker, count):
+    store = ResultStore(path)
+    for n in range(count):
+        store.append("shared_subject", snapshot("Shared Subject", "needs_manual_review", "medium", f"{worker}-{n}"))
+    store.close()
+
+
+def test_concurrent_writers_with_separate_connections(tmp_path):
+    path = tmp_path / "results.sqlite3"
+    ResultStore(path).close()
+    workers = [threading.Thread(target=_append_many, args=(path, worker, 25)) for worker in range(4)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join(timeout=60)
+
+    store = ResultStore(path)
+    records = store.all()
+    assert [r["record_index"] for r in records] == list(range(100))
+    assert len({r["output"]["details"]["article_text"] for r in records}) == 100
+
+
+def test_save_result_appends_to_store(monkeypatch, store):
+    monkeypatch.setattr(save_test_result, "get_result_store", lambda: store)
+    case = {"title": "Jane again", "subject_names": ["Jane Smith"], "article_link": "http://a/2"}
+
+    save_test_result.save_result(case, {"decision": "discard_as_not_relevant", "overall_risk_label": "no_match"})
+
+    record = store.get("jane_smith", 1)
+    assert record["title"] == "Jane again"
+    assert record["input"] == case
+
+
+def test_tests_endpoint(monkeypatch, store):
+    monkeypatch.setattr(main, "get_result_store", lambda: store)
+    client = TestClient(main.app)
+
+    page = client.get("/api/tests", params={"overall_risk_label": "high", "limit": 1}).json()
+    assert page["total"] == 2 and page["limit"] == 1
+    assert "article_text" not in page["results"][0]["output"]["details"]
+
+    record = client.get("/api/tests/joseph_mason/1").json()
+    assert record["output"]["details"]["article_text"] == "Full article text."
+    assert client.get("/api/tests/joseph_mason/9").status_code == 404
+    assert client.get("/api/tests", params={"limit": 0}).status_code == 422
+
+    matches = client.get("/api/tests", params={"is_subject_match": "true", "search": "MASON"}).json()
+    assert [r["record_index"] for r in matches["results"]] == [0, 1, 2]
+    assert client.get("/api/tests", params={"is_subject_match": "false"}).json()["results"][0]["subject_slug"] == (
+        "jane_smith"
+    )
+    assert client.get("/api/tests", params={"search": "100%_"}).json()["total"] == 0
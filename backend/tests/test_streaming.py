@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+from pipeline import agent_runner, orchestrator
+from pipeline.streaming import stream_screening
+from tests.test_orchestrator import ARTICLE_TEXT, isolated_caches, make_fake_run  # noqa: F401
+
+
+async def fake_fetch(url, max_chars=None):
+    return ARTICLE_TEXT
+
+
+def collect(gen_factory, stop_after=None):
+    async def scenario():
+        events = []
+        gen = gen_factory()
+        try:
+            async for event, data in gen:
+                events.append((event, data))
+                if stop_after and stop_after(event, data):
+                    break
+        finally:
+            await gen.aclose()
+        return events
+
+    return asyncio.run(scenario())
+
+
+def test_stream_emits_article_agents_then_result(monkeypatch, isolated_caches):
+    monkeypatch.setattr(orchestrator, "fetch_article_text_async", fake_fetch)
+    fake_run = make_fake_run(delays={"name_match_agent": 0.01, "sentiment_agent": 0.1})
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+
+    events = collect(lambda: stream_screening("Joseph Mason", None, "http://a/1"))
+
+    names = [event for event, _ in events]
+    assert names[0] == "article"
+    assert names[-1] == "result"
+    agent_keys = [data["key"] for event, data in events if event == "agent"]
+    assert sorted(agent_keys) == sorted(orchestrator.SPECIALIST_AGENTS)
+    assert agent_keys.index("name_match") < agent_keys.index("sentiment")
+    assert events[-1][1]["decision"] == "high_risk_escalate"
+
+
+def test_closing_stream_cancels_remaining_agents(monkeypatch, isolated_caches):
+    monkeypatch.setattr(orchestrator, "fetch_article_text_async", fake_fetch)
+    fake_run = make_fake_run(delays={"sentiment_agent": 5, "article_metadata_agent": 5})
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+    cancelled = []
+    original = agent_runner.Runner.run
+
+    async def tracking_run(agent, prompt, **kwargs):
+        try:
+            return await original(agent, prompt, **kwargs)
+        except asyncio.CancelledError:
+            cancelled.append(agent.name)
+            raise
+
+    monkeypatch.setattr(agent_runner.Runner, "run", tracking_run)
+
+    started = time.perf_counter()
+    events = collect(
+        lambda: stream_screening("Joseph Mason", None, "http://a/1"),
+        stop_after=lambda event, data: event == "agent",
+    )
+    elapsed = time.perf_counter() - started
+
+    assert events[-1][0] == "agent"
+    assert elapsed < 2
+    assert {"sentiment_agent", "article_metadata_agent"} <= set(cancelled)
+
+
+def test_stream_endpoint_sends_server_sent_events(monkeypatch, isolated_caches):
+    monkeypatch.setattr(orchestrator, "fetch_article_text_async", fake_fetch)
+    monkeypatch.setattr(agent_runner.Runner, "run", make_fake_run())
+
+    response = TestClient(main.app).post(
+        "/api/run_screening/stream", json={"name": "Joseph Mason", "url": "http://a/1"}
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    blocks = [block for block in response.text.split("\n\n") if block]
+    assert blocks[0].startswith("event: article\ndata: ")
+    assert blocks[-1].startswith("event: result\ndata: ")
+    assert sum(block.startswith("event: agent") for block in blocks) == 6
@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from models.inputs import ScreeningInput
+from pipeline import agent_runner, article_stage, orchestrator
+from pipeline.windowing import GAP_MARKER, estimate_tokens, select_context, truncate_context
+from tests.test_orchestrator import CANNED_OUTPUTS
+
+LEAD = "Regional news roundup. The council met on Tuesday to discuss bus routes and parking."
+FILLER = " ".join(
+    f"Paragraph {i} covers the weather, local sport results and a new bakery opening in the high street."
+    for i in range(400)
+)
+MENTION = "Joseph Mason, 47, was jailed for fraud after laundering money through shell companies."
+LONG_ARTICLE = f"{LEAD} {FILLER} {MENTION} {FILLER}"
+
+
+def test_short_article_unchanged():
+    window = select_context("Joseph Mason was fined.", "Joseph Mason", token_budget=100)
+
+    assert window.text == "Joseph Mason was fined."
+    assert not window.windowed
+
+
+def test_deep_mention_kept_within_budget():
+    window = select_context(LONG_ARTICLE, "Joseph Mason", "1978-03-02", token_budget=300)
+
+    assert MENTION in window.text
+    assert window.text.startswith(LEAD)
+    assert GAP_MARKER in window.text
+    assert estimate_tokens(window.text) <= 300
+    report = window.report()
+    assert report["tokens_after"] < report["tokens_before"] / 10
+    # the old fixed-size prefix would have cut the mention off
+    assert MENTION not in truncate_context(LONG_ARTICLE, 300 * 4).text
+
+
+def test_subject_free_window_prefers_adverse_passages():
+    window = select_context(LONG_ARTICLE, token_budget=300)
+
+    assert "laundering money" in window.text
+
+
+@pytest.mark.parametrize(
+    "article",
+    [
+        "\n".join(f"Line {i} lists a parish notice about bins and parking" for i in range(400))
+        + "\nJoseph Mason was jailed for fraud\n"
+        + "\n".join(f"Line {i} lists a parish notice about bins and parking" for i in range(400)),
+        "地方ニュースの概要です。" * 1000 + "Joseph Mason は詐欺で有罪となった。" + "天気は晴れです。" * 1000,
+        " ".join(f"item{i}" for i in range(5000)) + " Joseph Mason fraud " + " ".join(f"item{i}" for i in range(5000)),
+    ],
+    ids=["lines", "cjk", "one-run"],
+)
+def test_unpunctuated_article_is_windowed_not_dropped(article):
+    window = select_context(article, "Joseph Mason", token_budget=500)
+
+    assert "Joseph Mason" in window.text
+    assert 0 < window.passages_selected < window.passages_total
+    assert estimate_tokens(window.text) <= 500
+
+
+def test_windowing_disabled_sends_the_baseline_prefix(monkeypatch):
+    monkeypatch.setattr(orchestrator, "ARTICLE_WINDOWING_ENABLED", False)
+
+    window = orchestrator.build_context_window(LONG_ARTICLE, "Joseph Mason")
+
+    assert window.text == LONG_ARTICLE[:16000]
+    assert window.passages_selected == 0
+
+
+def test_agents_receive_windowed_prompt(monkeypatch):
+    monkeypatch.setattr(agent_runner, "get_agent_cache", lambda: None)
+    monkeypatch.setattr(orchestrator, "get_article_stage_cache", lambda: article_stage.ArticleStageCache())
+    prompts = {}
+
+    async def fake_run(agent, prompt, **kwargs):
+        prompts[agent.name] = prompt
+        return SimpleNamespace(final_output=CANNED_OUTPUTS[agent.name])
+
+    monkeypatch.setattr(agent_runner.Runner, "run", fake_run)
+
+    result = asyncio.run(
+        orchestrator.screen_article(ScreeningInput("Joseph Mason", None, "http://a/1", LONG_ARTICLE))
+    )
+
+    assert MENTION in prompts["name_match_agent"]
+    assert len(prompts["name_match_agent"]) < len(LONG_ARTICLE) / 4
+    assert len(prompts["article_metadata_agent"]) < len(LONG_ARTICLE) / 4
+    assert LONG_ARTICLE.startswith(result["details"]["article_text"])
+    assert len(result["details"]["article_text"]) == 16000 < result["details"]["article_chars"] == len(LONG_ARTICLE)
+    assert result["details"]["context_window"]["passages_selected"] < result["details"]["context_window"]["passages_total"]
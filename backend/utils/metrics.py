@@ -0,0 +1,247 @@
+"""
+In-process pipeline metrics rendered in the Prometheus text format
+(GET /api/metrics).
+
+Stages are timed with stage_timer(); agent calls with record_agent_call().
+A screening that runs inside collect_timings() also gets its own stage and
+agent durations back for the response's optional `timings` block.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            # Per-bucket (non-cumulative) counts, then sum and count.
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 3))
+            series[bisect_left(self.buckets, value)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return int(series[-1]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, float("inf")), series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {_format_value(cumulative)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+# A collector returns extra samples at render time: (name, type, help, [(labels, value)]).
+Collector = Callable[[], List[Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]]]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+        self.collectors: List[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Collector) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            samples = metric.render()
+            if samples:
+                lines.extend(metric.header() + samples)
+        for collector in self.collectors:
+            for name, kind, documentation, samples in collector():
+                if not samples:
+                    continue
+                lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"])
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.register(
+    Histogram("aml_stage_duration_seconds", "Wall-clock time per pipeline stage.", ("stage",))
+)
+STAGE_ERRORS = REGISTRY.register(
+    Counter("aml_stage_errors_total", "Pipeline stages that raised, by exception type.", ("stage", "error"))
+)
+IN_FLIGHT = REGISTRY.register(Gauge("aml_in_flight", "Operations currently running, by stage.", ("stage",)))
+AGENT_SECONDS = REGISTRY.register(
+    Histogram("aml_agent_duration_seconds", "Agent call latency (model calls only).", ("agent", "model"))
+)
+AGENT_CALLS = REGISTRY.register(
+    Counter(
+        "aml_agent_calls_total",
+        "Agent calls by outcome (ok, cached, timeout, error).",
+        ("agent", "model", "outcome"),
+    )
+)
+AGENT_TOKENS = REGISTRY.register(
+    Counter("aml_agent_tokens_total", "Model tokens used, by agent, model and direction.", ("agent", "model", "direction"))
+)
+
+_timings: ContextVar[Optional[Dict[str, Dict[str, float]]]] = ContextVar("aml_timings", default=None)
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, Dict[str, float]]]:
+    """Collect this screening's stage and agent durations (seconds) into the yielded dict."""
+    timings: Dict[str, Dict[str, float]] = {"stages": {}, "agents": {}}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def add_timings(collected: Dict[str, Dict[str, float]]) -> None:
+    """Add durations collected elsewhere (work shared between screenings) to this screening's timings."""
+    for group, durations in collected.items():
+        for name, seconds in durations.items():
+            _record_timing(group, name, seconds)
+
+
+def _record_timing(group: str, name: str, seconds: float) -> None:
+    timings = _timings.get()
+    if timings is not None:
+        timings[group][name] = round(timings[group].get(name, 0.0) + seconds, 4)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """Time a pipeline stage into aml_stage_duration_seconds; count errors and in-flight work."""
+    started = time.perf_counter()
+    IN_FLIGHT.inc(stage=stage)
+    try:
+        yield
+    except BaseException as exc:
+        STAGE_ERRORS.inc(stage=stage, error=type(exc).__name__)
+        raise
+    finally:
+        IN_FLIGHT.dec(stage=stage)
+        seconds = time.perf_counter() - started
+        STAGE_SECONDS.observe(seconds, stage=stage)
+        _record_timing("stages", stage, seconds)
+
+
+def record_agent_call(
+    agent: str,
+    model: str,
+    outcome: str,
+    seconds: Optional[float] = None,
+    input_tokens: int = 0,
+    output_tokens: int = 0,
+) -> None:
+    AGENT_CALLS.inc(agent=agent, model=model, outcome=outcome)
+    if seconds is not None:
+        AGENT_SECONDS.observe(seconds, agent=agent, model=model)
+        _record_timing("agents", agent, seconds)
+    if input_tokens:
+        AGENT_TOKENS.inc(input_tokens, agent=agent, model=model, direction="input")
+    if output_tokens:
+        AGENT_TOKENS.inc(output_tokens, agent=agent, model=model, direction="output")
@@ -0,0 +1,287 @@
+"""
+Append-only store for screening result snapshots (SQLite, WAL).
+
+Replaces the read-modify-write tests/results/<subject>.json arrays. Rows
+are only ever inserted, each in its own short transaction, so parallel
+test workers and the API can write and read at the same time.
+
+One-time import of the legacy JSON snapshots:
+
+    cd backend
+    python -m utils.result_store import [--dir tests/results]
+"""
+import argparse
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import RESULTS_DB_PATH, RESULTS_PAGE_SIZE
+
+logger = logging.getLogger("aml.result_store")
+
+LEGACY_RESULTS_DIR = Path(__file__).resolve().parent.parent / "tests" / "results"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    subject_slug TEXT NOT NULL,
+    record_index INTEGER NOT NULL,
+    decision TEXT,
+    overall_risk_label TEXT,
+    created_at REAL NOT NULL,
+    import_key TEXT UNIQUE,
+    record_json TEXT NOT NULL,
+    summary_json TEXT NOT NULL,
+    UNIQUE (subject_slug, record_index)
+);
+CREATE INDEX IF NOT EXISTS idx_results_decision ON results (decision, subject_slug, record_index);
+CREATE INDEX IF NOT EXISTS idx_results_risk ON results (overall_risk_label, subject_slug, record_index);
+CREATE INDEX IF NOT EXISTS idx_results_created ON results (created_at);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def summarize(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """The entry without details.article_text (shallow copies; the entry is not modified)."""
+    output = entry.get("output")
+    if not isinstance(output, dict) or "article_text" not in (output.get("details") or {}):
+        return entry
+    details = {key: value for key, value in output["details"].items() if key != "article_text"}
+    return {**entry, "output": {**output, "details": details}}
+
+
+def _row_to_record(subject_slug: str, record_index: int, entry_json: str) -> Dict[str, Any]:
+    return {
+        "subject_slug": subject_slug,
+        "source_file": f"{subject_slug}.json",
+        "record_index": record_index,
+        **json.loads(entry_json),
+    }
+
+
+class ResultStore:
+    """
+    Screening snapshots keyed by (subject_slug, record_index).
+
+    record_index numbers a subject's results in insertion order, matching
+    the position they had in the legacy per-subject JSON arrays. Queries
+    filter on subject, decision, risk label and creation time through
+    indexes (match flag and free-text search read the stored summary), and
+    page summaries (without article_text) by default.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; appends open their own BEGIN IMMEDIATE transaction.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def append(
+        self,
+        subject_slug: str,
+        entry: Dict[str, Any],
+        created_at: Optional[float] = None,
+        import_key: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Insert one snapshot and return its record_index. With an import_key
+        that was already imported, nothing is written and None is returned.
+        """
+        output = entry.get("output") if isinstance(entry.get("output"), dict) else {}
+        record_json = json.dumps(entry, default=str)
+        summary_json = json.dumps(summarize(entry), default=str)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if import_key is not None and self._conn.execute(
+                    "SELECT 1 FROM results WHERE import_key = ?", (import_key,)
+                ).fetchone():
+                    self._conn.execute("COMMIT")
+                    return None
+                (record_index,) = self._conn.execute(
+                    "SELECT COALESCE(MAX(record_index) + 1, 0) FROM results WHERE subject_slug = ?",
+                    (subject_slug,),
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT INTO results (subject_slug, record_index, decision, overall_risk_label, created_at, "
+                    "import_key, record_json, summary_json) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        subject_slug,
+                        record_index,
+                        output.get("decision"),
+                        output.get("overall_risk_label"),
+                        time.time() if created_at is None else created_at,
+                        import_key,
+                        record_json,
+                        summary_json,
+                    ),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return record_index
+
+    def get(self, subject_slug: str, record_index: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record_json FROM results WHERE subject_slug = ? AND record_index = ?",
+                (subject_slug, record_index),
+            ).fetchone()
+        return _row_to_record(subject_slug, record_index, row[0]) if row else None
+
+    def all(self, include_article_text: bool = True) -> List[Dict[str, Any]]:
+        column = "record_json" if include_article_text else "summary_json"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT subject_slug, record_index, {column} FROM results ORDER BY subject_slug, record_index"
+            ).fetchall()
+        return [_row_to_record(*row) for row in rows]
+
+    def query(
+        self,
+        decision: Optional[str] = None,
+        overall_risk_label: Optional[str] = None,
+        subject: Optional[str] = None,
+        since: Optional[float] = None,
+        is_subject_match: Optional[bool] = None,
+        search: Optional[str] = None,
+        offset: int = 0,
+        limit: int = RESULTS_PAGE_SIZE,
+        include_article_text: bool = False,
+    ) -> Dict[str, Any]:
+        """One page of records matching every given filter, ordered by subject then record_index."""
+        clauses, params = [], []
+        for column, value in (
+            ("subject_slug", subject),
+            ("decision", decision),
+            ("overall_risk_label", overall_risk_label),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if is_subject_match is not None:
+            clauses.append("COALESCE(json_extract(summary_json, '$.output.is_subject_match'), 0) = ?")
+            params.append(int(is_subject_match))
+        if search:
+            pattern = "%" + search.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            clauses.append(
+                "(LOWER(json_extract(summary_json, '$.title')) LIKE ? ESCAPE '\\' "
+                "OR LOWER(json_extract(summary_json, '$.input.subject_names')) LIKE ? ESCAPE '\\')"
+            )
+            params.extend((pattern, pattern))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        column = "record_json" if include_article_text else "summary_json"
+        with self._lock:
+            (total,) = self._conn.execute(f"SELECT COUNT(*) FROM results {where}", params).fetchone()
+            rows = self._conn.execute(
+                f"SELECT subject_slug, record_index, {column} FROM results {where} "
+                "ORDER BY subject_slug, record_index LIMIT ? OFFSET ?",
+                (*params, limit, offset),
+            ).fetchall()
+        return {
+            "results": [_row_to_record(*row) for row in rows],
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+        }
+
+    def count(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()
+        return count
+
+    def import_snapshots(self, results_dir: Path = LEGACY_RESULTS_DIR) -> int:
+        """
+        Import legacy tests/results/*.json arrays, keeping each entry's
+        position as its record_index. Safe to re-run: entries already
+        imported (by file and position) are skipped. Returns rows added.
+        """
+        results_dir = Path(results_dir)
+        added = 0
+        for file_path in sorted(results_dir.glob("*.json")) if results_dir.exists() else []:
+            try:
+                with file_path.open("r") as f:
+                    payload = json.load(f)
+            except (OSError, json.JSONDecodeError) as exc:
+                logger.warning(f"Skipping unreadable snapshot {file_path.name}: {exc}")
+                continue
+            if not isinstance(payload, list):
+                continue
+            mtime = file_path.stat().st_mtime
+            for idx, entry in enumerate(payload):
+                if not isinstance(entry, dict):
+                    continue
+                key = f"{file_path.name}#{idx}"
+                if self.append(file_path.stem, entry, created_at=mtime, import_key=key) is not None:
+                    added += 1
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO store_meta (key, value) VALUES ('legacy_import', ?)", (str(time.time()),)
+            )
+        logger.info(f"Imported {added} snapshots from {results_dir}")
+        return added
+
+    def legacy_imported(self) -> bool:
+        with self._lock:
+            return (
+                self._conn.execute("SELECT 1 FROM store_meta WHERE key = 'legacy_import'").fetchone() is not None
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_result_store: Optional[ResultStore] = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """Process-wide result store; the legacy JSON snapshots are imported the first time it is opened."""
+    global _result_store
+    with _result_store_lock:
+        if _result_store is None:
+            store = ResultStore(Path(RESULTS_DB_PATH))
+            if not store.legacy_imported():
+                store.import_snapshots()
+            _result_store = store
+    return _result_store
+
+
+def close_result_store() -> None:
+    global _result_store
+    with _result_store_lock:
+        if _result_store is not None:
+            _result_store.close()
+            _result_store = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Screening result store maintenance.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    importer = subcommands.add_parser("import", help="Import legacy tests/results/*.json snapshots.")
+    importer.add_argument("--dir", type=Path, default=LEGACY_RESULTS_DIR)
+    importer.add_argument("--db", type=Path, default=Path(RESULTS_DB_PATH))
+    args = parser.parse_args()
+
+    store = ResultStore(args.db)
+    added = store.import_snapshots(args.dir)
+    print(f"imported {added} new snapshots into {args.db} ({store.count()} total)")
+
+
+if __name__ == "__main__":
+    main()
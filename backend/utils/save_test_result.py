@@ -1,7 +1,7 @@
-import json
-import os
 import re
 
+from utils.result_store import get_result_store
+
 
 def slugify(text: str) -> str:
     text = text.lower()
@@ -11,11 +11,8 @@ def slugify(text: str) -> str:
 
 def save_result(case: dict, output: dict):
     """
-    Saves results grouped by subject name:
-
-        tests/results/<subject>.json
-
-    Each file will contain a list of test runs for that subject.
+    Appends one test run to the result store, grouped by subject name
+    (subject slug + per-subject record index).
     """
 
     # Determine main subject
@@ -23,32 +20,11 @@ def save_result(case: dict, output: dict):
     subject_name = subjects[0] if subjects else "unknown_subject"
     subject_slug = slugify(subject_name)
 
-    # File path
-    folder = os.path.join("tests", "results")
-    os.makedirs(folder, exist_ok=True)
-
-    filepath = os.path.join(folder, f"{subject_slug}.json")
-
-    # Load existing file or start new array
-    if os.path.exists(filepath):
-        with open(filepath, "r") as f:
-            try:
-                existing = json.load(f)
-            except json.JSONDecodeError:
-                existing = []
-    else:
-        existing = []
-
-    # Append new entry
     entry = {
         "title": case["title"],
         "input": case,
         "output": output
     }
-    existing.append(entry)
-
-    # Save back to file
-    with open(filepath, "w") as f:
-        json.dump(existing, f, indent=2)
+    record_index = get_result_store().append(subject_slug, entry)
 
-    print(f"[saved] {filepath}")
+    print(f"[saved] {subject_slug}#{record_index}")
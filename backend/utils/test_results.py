@@ -1,38 +1,11 @@
-import json
-from pathlib import Path
 from typing import Any, Dict, List
 
-
-RESULTS_DIR = Path(__file__).resolve().parent.parent / "tests" / "results"
+from utils.result_store import get_result_store
 
 
 def load_all_test_results() -> List[Dict[str, Any]]:
     """
-    Load every cached screening snapshot stored in tests/results/*.json.
+    Load every stored screening snapshot (see utils.result_store).
     Returns a flat list so the UI can render cards per test case.
     """
-
-    if not RESULTS_DIR.exists():
-        return []
-
-    aggregated: List[Dict[str, Any]] = []
-    for file_path in sorted(RESULTS_DIR.glob("*.json")):
-        try:
-            with file_path.open("r") as f:
-                payload = json.load(f)
-        except json.JSONDecodeError:
-            continue
-
-        if not isinstance(payload, list):
-            continue
-
-        for idx, entry in enumerate(payload):
-            aggregated.append(
-                {
-                    "subject_slug": file_path.stem,
-                    "source_file": file_path.name,
-                    "record_index": idx,
-                    **entry,
-                }
-            )
-    return aggregated
+    return get_result_store().all()
@@ -8,7 +8,7 @@ import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
-import { runScreeningRequest } from "@/lib/api";
+import { streamScreeningRequest } from "@/lib/api";
 import { ScreeningResult } from "@/types/screening";
 
 export default function ScreeningPage() {
@@ -17,6 +17,7 @@ export default function ScreeningPage() {
   const [url, setUrl] = useState("");
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [progress, setProgress] = useState<string | null>(null);
   const router = useRouter();
 
   async function handleSubmit(event: React.FormEvent<HTMLFormElement>) {
@@ -27,19 +28,30 @@ export default function ScreeningPage() {
     }
     setLoading(true);
     setError(null);
+    setProgress("Fetching article...");
     try {
-      const response = await runScreeningRequest({
-        name,
-        url,
-        dob: dob || undefined,
-      });
-      
+      let completed = 0;
+      const response = await streamScreeningRequest(
+        { name, url, dob: dob || undefined },
+        (update) => {
+          if (update.event === "article") {
+            setProgress("Article fetched, running agents...");
+          } else if (update.event === "agent") {
+            completed += 1;
+            setProgress(`${completed}/6 agents complete (${update.data.key})`);
+          } else if (update.event === "prefilter") {
+            setProgress("Subject not mentioned in article");
+          }
+        }
+      );
+
       // Store result in session storage and navigate to analysis page
       sessionStorage.setItem('screening_result', JSON.stringify(response));
       router.push(`/analysis/${Date.now()}`);
     } catch (err) {
       setError(err instanceof Error ? err.message : "Failed to run screening");
       setLoading(false);
+      setProgress(null);
     }
   }
 
@@ -126,7 +138,7 @@ export default function ScreeningPage() {
                     {loading ? (
                       <span className="flex items-center justify-center gap-2">
                         <Loader2 className="h-5 w-5 animate-spin" />
-                        Processing Screening...
+                        {progress ?? "Processing Screening..."}
                       </span>
                     ) : (
                       "Run AML Screening"
@@ -1,6 +1,6 @@
 "use client";
 
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import { Loader2 } from "lucide-react";
 
@@ -9,7 +9,7 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from "@
 import { Badge } from "@/components/ui/badge";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
-import { fetchTestResults } from "@/lib/api";
+import { fetchTestResult, fetchTestResults } from "@/lib/api";
 import { TestCaseRecord } from "@/types/screening";
 
 const riskOptions = [
@@ -35,82 +35,78 @@ const riskVariant: Record<string, "success" | "warning" | "danger" | "secondary"
 
 export default function TestsPage() {
   const [records, setRecords] = useState<TestCaseRecord[]>([]);
+  const [total, setTotal] = useState(0);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [selectedRecord, setSelectedRecord] = useState<TestCaseRecord | null>(null);
   const [query, setQuery] = useState("");
+  const [search, setSearch] = useState("");
   const [riskFilter, setRiskFilter] = useState("all");
   const [matchFilter, setMatchFilter] = useState("all");
-  const [edgeFilter, setEdgeFilter] = useState("all");
   const [currentPage, setCurrentPage] = useState(1);
   const [itemsPerPage] = useState(8);
   const router = useRouter();
 
-  function handleViewAnalysis(record: TestCaseRecord) {
-    // Store result in session storage and navigate to analysis page
-    sessionStorage.setItem('screening_result', JSON.stringify(record.output));
+  async function handleViewAnalysis(record: TestCaseRecord) {
+    // Load the full record (with article text), store it in session storage and navigate to analysis page
+    let output = record.output;
+    try {
+      output = (await fetchTestResult(record.subject_slug, record.record_index)).output;
+    } catch {
+      // Fall back to the summary if the full record can't be loaded
+    }
+    sessionStorage.setItem('screening_result', JSON.stringify(output));
     router.push(`/analysis/${record.source_file}-${record.record_index}`);
   }
 
+  // Debounce typing so each keystroke doesn't fetch a page
+  useEffect(() => {
+    const timer = setTimeout(() => setSearch(query.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [query]);
+
+  // Reset to page 1 when filters change
+  useEffect(() => {
+    setCurrentPage(1);
+  }, [search, riskFilter, matchFilter]);
+
+  // The server filters and pages; only the visible page is downloaded
   useEffect(() => {
+    let cancelled = false;
     async function load() {
+      setLoading(true);
       try {
-        const data = await fetchTestResults();
-        setRecords(data);
-        if (data.length > 0) {
-          setSelectedRecord(data[0]);
-        }
+        const page = await fetchTestResults({
+          offset: (currentPage - 1) * itemsPerPage,
+          limit: itemsPerPage,
+          overallRiskLabel: riskFilter === "all" ? undefined : riskFilter,
+          isSubjectMatch: matchFilter === "all" ? undefined : matchFilter === "matched",
+          search: search || undefined,
+        });
+        if (cancelled) return;
+        setRecords(page.results);
+        setTotal(page.total);
+        setError(null);
+        setSelectedRecord((current) => current ?? page.results[0] ?? null);
       } catch (err) {
-        setError(err instanceof Error ? err.message : "Failed to load tests");
+        if (!cancelled) setError(err instanceof Error ? err.message : "Failed to load tests");
       } finally {
-        setLoading(false);
+        if (!cancelled) setLoading(false);
       }
     }
     load();
-  }, []);
-
-  const edgeOptions = useMemo(() => {
-    const values = Array.from(
-      new Set(records.map((r) => r.input.edge_case_reason).filter(Boolean) as string[])
-    );
-    return [{ value: "all", label: "All edge cases" }, ...values.map((value) => ({ value, label: value }))];
-  }, [records]);
-
-  const filtered = useMemo(() => {
-    const results = records.filter((record) => {
-      if (query) {
-        const haystack = `${record.title} ${record.input.subject_names?.join(" ")}`.toLowerCase();
-        if (!haystack.includes(query.toLowerCase())) {
-          return false;
-        }
-      }
-      if (riskFilter !== "all" && record.output.overall_risk_label !== riskFilter) {
-        return false;
-      }
-      if (matchFilter === "matched" && !record.output.is_subject_match) {
-        return false;
-      }
-      if (matchFilter === "not_matched" && record.output.is_subject_match) {
-        return false;
-      }
-      if (edgeFilter !== "all" && record.input.edge_case_reason !== edgeFilter) {
-        return false;
-      }
-      return true;
-    });
-    
-    // Reset to page 1 when filters change
-    setCurrentPage(1);
-    
-    return results;
-  }, [records, query, riskFilter, matchFilter, edgeFilter]);
+    return () => {
+      cancelled = true;
+    };
+  }, [currentPage, itemsPerPage, search, riskFilter, matchFilter]);
 
-  const paginatedRecords = useMemo(() => {
-    const startIndex = (currentPage - 1) * itemsPerPage;
-    return filtered.slice(startIndex, startIndex + itemsPerPage);
-  }, [filtered, currentPage, itemsPerPage]);
-
-  const totalPages = Math.ceil(filtered.length / itemsPerPage);
+  const totalPages = Math.ceil(total / itemsPerPage);
+  // Page buttons around the current page; Previous/Next reach the rest
+  const firstShown = Math.max(1, Math.min(currentPage - 2, totalPages - 4));
+  const shownPages = Array.from(
+    { length: Math.min(5, totalPages) },
+    (_, i) => firstShown + i
+  );
 
   return (
     <div className="min-h-screen bg-gray-50">
@@ -168,9 +164,9 @@ export default function TestsPage() {
                     </SelectContent>
                   </Select>
                 </div>
-                {filtered.length > 0 && (
+                {total > 0 && (
                   <div className="text-xs text-gray-500 mt-2">
-                    Showing {((currentPage - 1) * itemsPerPage) + 1}-{Math.min(currentPage * itemsPerPage, filtered.length)} of {filtered.length} test{filtered.length !== 1 ? 's' : ''}
+                    Showing {((currentPage - 1) * itemsPerPage) + 1}-{Math.min(currentPage * itemsPerPage, total)} of {total} test{total !== 1 ? 's' : ''}
                   </div>
                 )}
               </CardContent>
@@ -193,7 +189,7 @@ export default function TestsPage() {
                     <p className="text-red-600 text-center">{error}</p>
                   </CardContent>
                 </Card>
-              ) : filtered.length === 0 ? (
+              ) : records.length === 0 ? (
                 <Card className="border-0 shadow-sm">
                   <CardContent className="py-8">
                     <p className="text-gray-500 text-center">No tests match your current filters.</p>
@@ -202,11 +198,12 @@ export default function TestsPage() {
               ) : (
                 <>
                   <div className="space-y-3">
-                    {paginatedRecords.map((record) => (
+                    {records.map((record) => (
                   <Card
                     key={`${record.source_file}-${record.record_index}`}
                     className={`cursor-pointer transition-all duration-200 border-0 shadow-sm hover:shadow-md ${
-                      selectedRecord === record 
+                      selectedRecord?.subject_slug === record.subject_slug &&
+                      selectedRecord?.record_index === record.record_index
                         ? "ring-2 ring-gray-300 bg-gray-50 shadow-md" 
                         : "hover:bg-white"
                     }`}
@@ -276,7 +273,7 @@ export default function TestsPage() {
                       </Button>
                       
                       <div className="flex items-center gap-2">
-                        {Array.from({ length: totalPages }, (_, i) => i + 1).map((page) => (
+                        {shownPages.map((page) => (
                           <Button
                             key={page}
                             variant={currentPage === page ? "default" : "ghost"}
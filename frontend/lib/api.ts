@@ -31,8 +31,87 @@ export async function runScreeningRequest(
   return handleResponse<ScreeningResult>(response);
 }
 
-export async function fetchTestResults(): Promise<TestCaseRecord[]> {
-  const response = await fetch(`${API_BASE}/tests`, { cache: "no-store" });
-  const payload = await handleResponse<{ results: TestCaseRecord[] }>(response);
-  return payload.results ?? [];
+export type ScreeningStreamEvent =
+  | { event: "article"; data: { url: string; article_chars: number } }
+  | { event: "prefilter"; data: Record<string, unknown> }
+  | { event: "context"; data: Record<string, number> }
+  | {
+      event: "agent";
+      data: { key: string; result: Record<string, unknown>; degraded: string | null };
+    }
+  | { event: "result"; data: ScreeningResult }
+  | { event: "error"; data: { detail: string } };
+
+export async function streamScreeningRequest(
+  payload: ScreeningPayload,
+  onEvent: (event: ScreeningStreamEvent) => void,
+  signal?: AbortSignal
+): Promise<ScreeningResult> {
+  const response = await fetch(`${API_BASE}/run_screening/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(payload),
+    signal,
+  });
+  if (!response.ok || !response.body) {
+    const message = await response.text();
+    throw new Error(message || "Request failed");
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf("\n\n");
+
+      const event = block.match(/^event: (.*)$/m)?.[1];
+      const data = block.match(/^data: (.*)$/m)?.[1];
+      if (!event || data === undefined) continue;
+      const parsed = { event, data: JSON.parse(data) } as ScreeningStreamEvent;
+      if (parsed.event === "error") throw new Error(parsed.data.detail);
+      onEvent(parsed);
+      if (parsed.event === "result") return parsed.data;
+    }
+  }
+  throw new Error("Screening stream ended without a result");
+}
+
+export interface TestResultsPage {
+  results: TestCaseRecord[];
+  total: number;
+  offset: number;
+  limit: number;
+}
+
+export interface TestResultsQuery {
+  offset?: number;
+  limit?: number;
+  overallRiskLabel?: string;
+  isSubjectMatch?: boolean;
+  search?: string;
+  since?: number;
+}
+
+// One page of summaries (no details.article_text); use fetchTestResult for the full record.
+export async function fetchTestResults(query: TestResultsQuery = {}): Promise<TestResultsPage> {
+  const params = new URLSearchParams();
+  if (query.offset !== undefined) params.set("offset", String(query.offset));
+  if (query.limit !== undefined) params.set("limit", String(query.limit));
+  if (query.overallRiskLabel) params.set("overall_risk_label", query.overallRiskLabel);
+  if (query.isSubjectMatch !== undefined) params.set("is_subject_match", String(query.isSubjectMatch));
+  if (query.search) params.set("search", query.search);
+  if (query.since !== undefined) params.set("since", String(query.since));
+  const response = await fetch(`${API_BASE}/tests?${params}`, { cache: "no-store" });
+  return handleResponse<TestResultsPage>(response);
+}
+
+export async function fetchTestResult(subjectSlug: string, recordIndex: number): Promise<TestCaseRecord> {
+  const response = await fetch(`${API_BASE}/tests/${subjectSlug}/${recordIndex}`, { cache: "no-store" });
+  return handleResponse<TestCaseRecord>(response);
 }
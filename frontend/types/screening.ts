@@ -59,6 +59,11 @@ export interface ScreeningDetails {
   dob_age: DobAgeDetails;
   sentiment: SentimentDetails;
   article_text?: string;
+  article_chars?: number; // full length, present when article_text was cut
+  degraded?: Record<string, string>;
+  decision_source?: { engine: "rules" | "llm" | "prefilter"; rule: string | null };
+  pipeline_mode?: "multi_agent" | "combined";
+  context_window?: { tokens_before: number; tokens_after: number; passages_total: number; passages_selected: number };
 }
 
 export interface ScreeningResult {
@@ -69,6 +74,11 @@ export interface ScreeningResult {
   human_readable_summary: string;
   audit_notes: string;
   details: ScreeningDetails;
+  // Present when the request set include_timings: seconds per stage and per agent call.
+  timings?: {
+    stages: Record<string, number>;
+    agents: Record<string, number>;
+  };
 }
 
 export interface TestCaseInput {